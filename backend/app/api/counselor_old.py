@@ -2,12 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 import json
-import requests
 from app.database import get_db
 from app.models import User, UserProfile, ChatMessage, TodoItem, ShortlistedUniversity, University
 from app.schemas import ChatMessageCreate, ChatMessageResponse
 from app.auth_utils import get_current_user
 from app.config import get_settings
+from app.services.context_snapshot import get_user_context_snapshot
+from app.services.counselor_llm import generate_llm_response
 import logging
 
 # Set up logging
@@ -52,49 +53,6 @@ PREDEFINED_QUESTIONS = {
     }
 }
 
-def query_huggingface_api(prompt: str) -> str:
-    """Query Hugging Face Mistral API for AI responses"""
-    try:
-        hf_token = settings.huggingface_token
-        if not hf_token:
-            logger.error("Hugging Face token not configured")
-            return "I'm unable to process your request at the moment. Please try again later."
-        
-        headers = {"Authorization": f"Bearer {hf_token}"}
-        api_url = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.1"
-        
-        payload = {
-            "inputs": prompt,
-            "parameters": {
-                "max_new_tokens": 500,
-                "temperature": 0.7,
-                "top_p": 0.9,
-            }
-        }
-        
-        response = requests.post(api_url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        if isinstance(result, list) and len(result) > 0:
-            generated_text = result[0].get("generated_text", "")
-            # Remove the prompt from the generated text
-            if generated_text.startswith(prompt):
-                generated_text = generated_text[len(prompt):].strip()
-            return generated_text if generated_text else "I couldn't generate a response. Please try again."
-        
-        return "I couldn't generate a response. Please try again."
-    
-    except requests.exceptions.Timeout:
-        logger.error("Hugging Face API timeout")
-        return "The request took too long. Please try again."
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Hugging Face API error: {str(e)}")
-        return "I'm having trouble processing your request. Please try again."
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        return "An unexpected error occurred. Please try again."
-
 def generate_profile_response(user: User, profile: UserProfile, db: Session, question_type: str) -> str:
     """Generate personalized response based on user's profile and question type"""
     
@@ -539,92 +497,8 @@ Your {profile.intended_degree} program in {profile.field_of_study} intake year {
 
 def get_user_context(user: User, db: Session) -> str:
     """Build context about the user for the AI counselor"""
-    
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-    
-    if not profile or not profile.onboarding_completed:
-        return "User has not completed onboarding yet."
-    
-    context = f"""
-User Profile:
-- Name: {user.full_name}
-- Current Education: {profile.current_education_level} in {profile.degree_major}
-- Graduation Year: {profile.graduation_year}
-- GPA: {profile.gpa_percentage if profile.gpa_percentage else 'Not provided'}
-- Intended Degree: {profile.intended_degree} in {profile.field_of_study}
-- Target Intake: {profile.target_intake_year}
-- Preferred Countries: {profile.preferred_countries}
-- Budget: ${profile.budget_min} - ${profile.budget_max} per year
-- Funding Plan: {profile.funding_plan.value if profile.funding_plan else 'Not specified'}
-
-Exam Status:
-- IELTS/TOEFL: {profile.ielts_toefl_status.value} (Score: {profile.ielts_toefl_score if profile.ielts_toefl_score else 'N/A'})
-- GRE/GMAT: {profile.gre_gmat_status.value} (Score: {profile.gre_gmat_score if profile.gre_gmat_score else 'N/A'})
-- SOP: {profile.sop_status.value}
-
-Profile Strength:
-- Academic: {profile.academic_strength.value if profile.academic_strength else 'N/A'}
-- Exams: {profile.exam_strength.value if profile.exam_strength else 'N/A'}
-- Overall: {profile.overall_strength.value if profile.overall_strength else 'N/A'}
-
-Current Stage: {profile.current_stage.value}
-"""
-    
-    # Add shortlisted universities
-    shortlisted = db.query(ShortlistedUniversity).filter(
-        ShortlistedUniversity.user_id == user.id
-    ).all()
-    
-    if shortlisted:
-        context += "\n\nShortlisted Universities:\n"
-        for s in shortlisted:
-            locked = " (LOCKED)" if s.is_locked else ""
-            context += f"- {s.university.name} ({s.category.value}){locked}\n"
-    
-    # Add pending todos
-    todos = db.query(TodoItem).filter(
-        TodoItem.user_id == user.id,
-        TodoItem.is_completed == False
-    ).limit(5).all()
-    
-    if todos:
-        context += "\n\nPending Tasks:\n"
-        for todo in todos:
-            context += f"- {todo.title} ({todo.priority} priority)\n"
-    
-    return context
-
-def get_system_prompt() -> str:
-    """System prompt for the AI counselor"""
-    return """You are an expert study abroad counselor AI assistant. Your role is to:
-
-1. Guide students through their study abroad journey
-2. Provide personalized university recommendations based on their profile
-3. Explain why specific universities fit their profile
-4. Identify risks and opportunities
-5. Create actionable tasks and to-do items
-6. Answer questions about the application process
-7. Help students understand their profile strengths and weaknesses
-
-When recommending universities:
-- Categorize them as Dream (reach), Target (match), or Safe (safety)
-- Explain WHY each university fits their profile
-- Highlight specific risks (cost, competition, requirements)
-- Be honest about acceptance chances
-
-When suggesting action items:
-- Be specific and actionable
-- Set realistic priorities
-- Consider the student's current stage
-
-Always be:
-- Encouraging but realistic
-- Data-driven in your recommendations
-- Clear about risks and trade-offs
-- Supportive of the student's goals
-
-If asked to shortlist a university or add a task, respond with a structured JSON action in your response.
-"""
+    # Served from the materialized snapshot, rebuilt on read when the user's data changed
+    return get_user_context_snapshot(db, user)
 
 @router.post("/chat", response_model=ChatMessageResponse)
 async def chat_with_counselor(
@@ -674,8 +548,11 @@ async def chat_with_counselor(
         elif any(word in user_input for word in ['visa', 'document', 'documentation', 'passport']):
             question_type = "visa"
         
+        # Free-form questions go to the LLM when it is configured
+        if not question_type and settings.huggingface_token:
+            response_text = generate_llm_response(current_user, profile, db, message_data.message, intent=question_type)
         # If no question type matched, show available options
-        if not question_type:
+        elif not question_type:
             response_text = """Hello! I'm your AI Counselor. I can help you with these topics:
 
  **Profile Assessment** - Analyze your strengths and weaknesses
@@ -1,17 +1,22 @@
+from collections import defaultdict
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models import User, UserProfile, TodoItem, ShortlistedUniversity, UniversityDocument
-from app.schemas import DashboardResponse, UserResponse, ProfileResponse, TodoResponse, ShortlistedUniversityResponse, CommittedUniversityData, UniversityDocumentResponse
+from typing import List, Optional
+from app.models import User, UserProfile, TodoItem, ShortlistedUniversity, University, UniversityDocument
+from app.schemas import DashboardResponse
+from app.serializers import serialize_user, serialize_profile, serialize_todo, serialize_shortlisted, serialize_document
 from app.auth_utils import get_current_user
+from app.read_routing import get_read_db
+from app.etags import conditional_get, etag_headers, USER_DATA, CATALOG
 
 router = APIRouter()
 
 @router.get("/", response_model=DashboardResponse)
 async def get_dashboard(
+    etag: Optional[str] = Depends(conditional_get(USER_DATA, CATALOG)),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Get user profile
     profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
@@ -24,59 +29,43 @@ async def get_dashboard(
         TodoItem.is_completed == False
     ).order_by(TodoItem.created_at.desc()).all()
     
-    # Get shortlisted universities
-    shortlisted = db.query(ShortlistedUniversity).filter(
+    # Get shortlisted universities together with their university rows
+    shortlisted = db.query(ShortlistedUniversity, University).join(
+        University, University.id == ShortlistedUniversity.university_id
+    ).filter(
         ShortlistedUniversity.user_id == current_user.id
-    ).all()
+    ).order_by(ShortlistedUniversity.id).all()
     
-    # Get locked universities with their documents and tasks
-    locked_universities = db.query(ShortlistedUniversity).filter(
-        ShortlistedUniversity.user_id == current_user.id,
-        ShortlistedUniversity.is_locked == True
-    ).all()
+    locked_universities = [(s, u) for s, u in shortlisted if s.is_locked]
     
-    # Convert all ORM objects to Pydantic models for response
-    user_response = UserResponse.model_validate(current_user)
-    profile_response = ProfileResponse.model_validate(profile)
-    todos_response = [TodoResponse.model_validate(todo) for todo in todos]
-    shortlisted_response = [ShortlistedUniversityResponse.model_validate(uni) for uni in shortlisted]
-    
-    # Build committed universities data with tasks and documents
-    committed_unis = []
-    for locked_uni in locked_universities:
-        # Get tasks for this specific university by matching university name in task title
-        university_name = locked_uni.university.name
-        uni_tasks = db.query(TodoItem).filter(
-            TodoItem.user_id == current_user.id,
-            TodoItem.is_completed == False,
-            TodoItem.title.contains(university_name)
-        ).all()
-        
-        # Get documents for this university
+    # Documents for all locked universities in one query
+    documents_by_shortlist = defaultdict(list)
+    if locked_universities:
         documents = db.query(UniversityDocument).filter(
             UniversityDocument.user_id == current_user.id,
-            UniversityDocument.shortlisted_university_id == locked_uni.id
-        ).all()
-        
-        # Convert ORM objects to Pydantic models
-        locked_uni_response = ShortlistedUniversityResponse.model_validate(locked_uni)
-        tasks_response = [TodoResponse.model_validate(task) for task in uni_tasks]
-        documents_response = [UniversityDocumentResponse.model_validate(doc) for doc in documents]
-        
-        committed_unis.append(CommittedUniversityData(
-            shortlisted_university=locked_uni_response,
-            tasks=tasks_response,
-            documents=documents_response
-        ))
+            UniversityDocument.shortlisted_university_id.in_([s.id for s, _ in locked_universities])
+        ).order_by(UniversityDocument.id).all()
+        for document in documents:
+            documents_by_shortlist[document.shortlisted_university_id].append(serialize_document(document))
     
-    # Count locked universities
-    locked_count = len(locked_universities)
+    todos_response = [serialize_todo(todo) for todo in todos]
+    shortlisted_response = {s.id: serialize_shortlisted(s, u) for s, u in shortlisted}
+    
+    # Tasks for a committed university are the incomplete todos naming it
+    committed_unis = []
+    for locked_uni, university in locked_universities:
+        committed_unis.append({
+            "shortlisted_university": shortlisted_response[locked_uni.id],
+            "tasks": [t for t, todo in zip(todos_response, todos) if university.name in todo.title],
+            "documents": documents_by_shortlist[locked_uni.id]
+        })
     
-    return DashboardResponse(
-        user=user_response,
-        profile=profile_response,
-        todos=todos_response,
-        shortlisted_universities=shortlisted_response,
-        locked_universities_count=locked_count,
-        committed_universities=committed_unis
-    )
+    # Plain dicts matching DashboardResponse, sent without re-validation
+    return ORJSONResponse({
+        "user": serialize_user(current_user),
+        "profile": serialize_profile(profile),
+        "todos": todos_response,
+        "shortlisted_universities": list(shortlisted_response.values()),
+        "locked_universities_count": profile.locked_count,
+        "committed_universities": committed_unis
+    }, headers=etag_headers(etag))
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from threading import Lock
+from app.auth_utils import require_admin
+from app.config import get_settings
+from app.profiling import profile_for, request_profiles
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+settings = get_settings()
+
+# One worker-wide profile at a time
+_profile_lock = Lock()
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(5, ge=1, le=100),
+    include_idle: bool = False
+):
+    """Sample every thread of this worker for N seconds; returns collapsed stacks for flamegraph tools"""
+    if seconds > settings.profile_max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.profile_max_seconds}")
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+    try:
+        # Sleep in a thread so the event loop keeps serving the traffic being profiled
+        sampler = await run_in_threadpool(profile_for, seconds, interval_ms / 1000, include_idle)
+    finally:
+        _profile_lock.release()
+    
+    return PlainTextResponse(sampler.collapsed(), headers={
+        "X-Profile-Samples": str(sampler.samples),
+        "X-Profile-Duration-Ms": f"{sampler.duration * 1000:.0f}"
+    })
+
+@router.get("/profile/requests")
+async def list_request_profiles():
+    """Recent per-request profiles (requests sent with X-Profile: 1), newest first"""
+    return request_profiles.list()
+
+@router.get("/profile/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(profile_id: str):
+    profile = request_profiles.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile["collapsed"])
@@ -2,57 +2,18 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 import json
 from app.database import get_db
-from app.models import User, UserProfile, UserStage, ProfileStrength, TodoItem
+from app.models import User, UserProfile, UserStage, TodoItem
 from app.schemas import OnboardingData, ProfileResponse
 from app.auth_utils import get_current_user
+from app.read_routing import get_read_db
+from app.services.outbox import enqueue, outbox_handler
+from app.services.profile_counters import adjust_counters
+from app.services.profile_strength import apply_profile_strength
+from app.services.user_events import notify_user_change, PROFILE, TODOS
 
 router = APIRouter()
 
-def calculate_profile_strength(profile: UserProfile) -> dict:
-    """Calculate profile strength based on various factors"""
-    
-    # Academic strength
-    if profile.gpa_percentage:
-        if profile.gpa_percentage >= 3.5:
-            academic_strength = ProfileStrength.STRONG
-        elif profile.gpa_percentage >= 3.0:
-            academic_strength = ProfileStrength.AVERAGE
-        else:
-            academic_strength = ProfileStrength.WEAK
-    else:
-        academic_strength = ProfileStrength.AVERAGE
-    
-    # Exam strength
-    exam_completed = 0
-    if profile.ielts_toefl_status.value == "completed":
-        exam_completed += 1
-    if profile.gre_gmat_status.value == "completed":
-        exam_completed += 1
-    
-    if exam_completed == 2:
-        exam_strength = ProfileStrength.STRONG
-    elif exam_completed == 1:
-        exam_strength = ProfileStrength.AVERAGE
-    else:
-        exam_strength = ProfileStrength.WEAK
-    
-    # Overall strength
-    strengths = [academic_strength, exam_strength]
-    strong_count = sum(1 for s in strengths if s == ProfileStrength.STRONG)
-    weak_count = sum(1 for s in strengths if s == ProfileStrength.WEAK)
-    
-    if strong_count >= 2:
-        overall_strength = ProfileStrength.STRONG
-    elif weak_count >= 2:
-        overall_strength = ProfileStrength.WEAK
-    else:
-        overall_strength = ProfileStrength.AVERAGE
-    
-    return {
-        "academic_strength": academic_strength,
-        "exam_strength": exam_strength,
-        "overall_strength": overall_strength
-    }
+INITIAL_TODOS = "initial_todos"
 
 def generate_initial_todos(user_id: int, profile: UserProfile, db: Session):
     """Generate initial AI-powered to-do items based on profile"""
@@ -100,8 +61,26 @@ def generate_initial_todos(user_id: int, profile: UserProfile, db: Session):
         ai_generated=True
     ))
     
+    # Onboarding can be completed again; todos it created before, open or done, are not repeated
+    existing_titles = {
+        title for (title,) in db.query(TodoItem.title).filter(
+            TodoItem.user_id == user_id,
+            TodoItem.ai_generated == True,
+            TodoItem.title.in_([todo.title for todo in todos])
+        )
+    }
+    todos = [todo for todo in todos if todo.title not in existing_titles]
+    
     for todo in todos:
         db.add(todo)
+    adjust_counters(db, user_id, open_todos_count=len(todos))
+
+@outbox_handler(INITIAL_TODOS)
+def create_initial_todos(db: Session, user_id: int, payload: dict):
+    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    if profile:
+        generate_initial_todos(user_id, profile, db)
+        notify_user_change(db, user_id, TODOS)
 
 @router.post("/complete", response_model=ProfileResponse)
 async def complete_onboarding(
@@ -133,19 +112,16 @@ async def complete_onboarding(
     profile.sop_status = onboarding_data.sop_status
     
     # Calculate profile strength
-    strengths = calculate_profile_strength(profile)
-    profile.academic_strength = strengths["academic_strength"]
-    profile.exam_strength = strengths["exam_strength"]
-    profile.overall_strength = strengths["overall_strength"]
+    apply_profile_strength(profile)
     
     # Mark onboarding as completed and move to next stage
     profile.onboarding_completed = True
     profile.current_stage = UserStage.DISCOVERING_UNIVERSITIES
+    notify_user_change(db, current_user.id, PROFILE)
     
-    db.commit()
-    
-    # Generate initial to-do items
-    generate_initial_todos(current_user.id, profile, db)
+    # Initial to-do items, from the outbox worker or right here when there is none.
+    # The dedupe key spares the worker a repeat event; the handler itself skips existing todos.
+    enqueue(db, INITIAL_TODOS, {}, user_id=current_user.id, dedupe_key=f"{INITIAL_TODOS}:{current_user.id}")
     db.commit()
     
     db.refresh(profile)
@@ -154,7 +130,7 @@ async def complete_onboarding(
 @router.get("/status", response_model=ProfileResponse)
 async def get_onboarding_status(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
     
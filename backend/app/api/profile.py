@@ -2,62 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 import json
 from app.database import get_db
-from app.models import User, UserProfile, ProfileStrength, UserStage
+from app.models import User, UserProfile, UserStage
 from app.schemas import ProfileResponse, ProfileUpdate
 from app.auth_utils import get_current_user
+from app.read_routing import get_read_db
+from app.services.profile_strength import apply_profile_strength
+from app.services.user_events import notify_user_change, PROFILE
 
 router = APIRouter()
 
-def recalculate_profile_strength(profile: UserProfile) -> dict:
-    """Recalculate profile strength when profile is updated"""
-    
-    # Academic strength
-    if profile.gpa_percentage:
-        if profile.gpa_percentage >= 3.5:
-            academic_strength = ProfileStrength.STRONG
-        elif profile.gpa_percentage >= 3.0:
-            academic_strength = ProfileStrength.AVERAGE
-        else:
-            academic_strength = ProfileStrength.WEAK
-    else:
-        academic_strength = ProfileStrength.AVERAGE
-    
-    # Exam strength
-    exam_completed = 0
-    if profile.ielts_toefl_status and profile.ielts_toefl_status.value == "completed":
-        exam_completed += 1
-    if profile.gre_gmat_status and profile.gre_gmat_status.value == "completed":
-        exam_completed += 1
-    
-    if exam_completed == 2:
-        exam_strength = ProfileStrength.STRONG
-    elif exam_completed == 1:
-        exam_strength = ProfileStrength.AVERAGE
-    else:
-        exam_strength = ProfileStrength.WEAK
-    
-    # Overall strength
-    strengths = [academic_strength, exam_strength]
-    strong_count = sum(1 for s in strengths if s == ProfileStrength.STRONG)
-    weak_count = sum(1 for s in strengths if s == ProfileStrength.WEAK)
-    
-    if strong_count >= 2:
-        overall_strength = ProfileStrength.STRONG
-    elif weak_count >= 2:
-        overall_strength = ProfileStrength.WEAK
-    else:
-        overall_strength = ProfileStrength.AVERAGE
-    
-    return {
-        "academic_strength": academic_strength,
-        "exam_strength": exam_strength,
-        "overall_strength": overall_strength
-    }
-
 @router.get("/", response_model=ProfileResponse)
 async def get_profile(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
     
@@ -92,11 +49,9 @@ async def update_profile(
         profile.current_stage = UserStage.DISCOVERING_UNIVERSITIES
     
     # Recalculate profile strength
-    strengths = recalculate_profile_strength(profile)
-    profile.academic_strength = strengths["academic_strength"]
-    profile.exam_strength = strengths["exam_strength"]
-    profile.overall_strength = strengths["overall_strength"]
+    apply_profile_strength(profile)
     
+    notify_user_change(db, current_user.id, PROFILE)
     db.commit()
     db.refresh(profile)
     
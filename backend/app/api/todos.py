@@ -1,27 +1,134 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import case, delete, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.models import User, UserProfile, TodoItem
-from app.schemas import TodoCreate, TodoUpdate, TodoResponse
+from app.schemas import (
+    TodoCreate, TodoUpdate, TodoResponse, TodoSummaryResponse, TodoBulkSelection, TodoBulkUpdate,
+    TodoBulkUpdateResponse, TodoBulkDeleteResponse
+)
+from app.serializers import serialize_todo
 from app.auth_utils import get_current_user
+from app.read_routing import get_read_db
+from app.services.profile_counters import adjust_counters, repair_user_counters
+from app.services.todo_list import InvalidCursor, SORT_CREATED, SORTS, get_todo_page, todo_conditions, todo_summary
+from app.services.user_events import notify_user_change, TODOS
 from datetime import datetime
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+
 @router.get("/", response_model=List[TodoResponse])
 async def get_todos(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    include_completed: bool = False
+    db: Session = Depends(get_read_db),
+    include_completed: bool = False,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    ai_generated: Optional[bool] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    sort: str = Query(SORT_CREATED, description=f"One of: {', '.join(SORTS)}"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None
 ):
-    query = db.query(TodoItem).filter(TodoItem.user_id == current_user.id)
+    """Todos newest first, or by due date (undated last) with sort=due.
+    
+    Without limit or cursor the whole list is returned, as clients written before
+    pagination expect. With either, pages of limit (default 100) todos are returned;
+    pass the X-Next-Cursor header value as cursor to load the next page.
+    """
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORTS)}")
+    
+    if limit is None and cursor:
+        limit = DEFAULT_PAGE_SIZE
+    
+    try:
+        todos, next_cursor = get_todo_page(
+            db, current_user.id, limit=limit, cursor=cursor, sort=sort,
+            include_completed=include_completed, category=category, priority=priority,
+            ai_generated=ai_generated, due_after=due_after, due_before=due_before
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if not include_completed:
-        query = query.filter(TodoItem.is_completed == False)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return ORJSONResponse([serialize_todo(todo) for todo in todos], headers=headers)
+
+@router.get("/summary", response_model=TodoSummaryResponse)
+async def get_todo_summary(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Open todos that are overdue, due within the next 7 days, or undated"""
+    return todo_summary(db, current_user.id)
+
+def bulk_conditions(selection: TodoBulkSelection, user_id: int) -> list:
+    todo_filter = selection.filter.model_dump(exclude_none=True) if selection.filter else {}
+    if not selection.ids and not todo_filter:
+        raise HTTPException(status_code=400, detail="Select todos with ids or a filter")
+    
+    conditions = todo_conditions(user_id, **todo_filter)
+    if selection.ids:
+        conditions.append(TodoItem.id.in_(selection.ids))
+    return conditions
+
+@router.patch("/bulk", response_model=TodoBulkUpdateResponse)
+async def bulk_update_todos(
+    todo_update: TodoBulkUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Apply the same change to every selected todo in one UPDATE ... RETURNING"""
+    conditions = bulk_conditions(todo_update, current_user.id)
+    changes = todo_update.model_dump(include={"is_completed", "priority", "category"}, exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    
+    values = dict(changes)
+    if todo_update.is_completed:
+        # Todos that were already done keep their completion time
+        values["completed_at"] = case((TodoItem.is_completed == True, TodoItem.completed_at), else_=datetime.utcnow())
+    
+    todos = db.scalars(
+        update(TodoItem).where(*conditions).values(**values).returning(TodoItem),
+        execution_options={"synchronize_session": False}
+    ).all()
+    
+    if todos:
+        if "is_completed" in changes:
+            # RETURNING only has the new values, so recount open todos under the profile row lock
+            repair_user_counters(db, current_user.id)
+        notify_user_change(db, current_user.id, TODOS)
+    response = {"updated": len(todos), "todos": [serialize_todo(todo) for todo in todos]}
+    db.commit()
+    
+    return ORJSONResponse(response)
+
+@router.delete("/bulk", response_model=TodoBulkDeleteResponse)
+async def bulk_delete_todos(
+    selection: TodoBulkSelection,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete every selected todo in one DELETE ... RETURNING"""
+    conditions = bulk_conditions(selection, current_user.id)
+    
+    rows = db.execute(
+        delete(TodoItem).where(*conditions).returning(TodoItem.id, TodoItem.is_completed),
+        execution_options={"synchronize_session": False}
+    ).all()
+    
+    if rows:
+        adjust_counters(db, current_user.id, open_todos_count=-sum(1 for _, is_completed in rows if is_completed is False))
+        notify_user_change(db, current_user.id, TODOS)
+    db.commit()
     
-    todos = query.order_by(TodoItem.created_at.desc()).all()
-    return todos
+    return {"deleted": len(rows), "ids": sorted(todo_id for todo_id, _ in rows)}
 
 @router.post("/", response_model=TodoResponse)
 async def create_todo(
@@ -40,6 +147,8 @@ async def create_todo(
     )
     
     db.add(new_todo)
+    adjust_counters(db, current_user.id, open_todos_count=1)
+    notify_user_change(db, current_user.id, TODOS)
     db.commit()
     db.refresh(new_todo)
     
@@ -61,6 +170,8 @@ async def update_todo(
         raise HTTPException(status_code=404, detail="Todo not found")
     
     if todo_update.is_completed is not None:
+        was_open = todo.is_completed is False
+        adjust_counters(db, current_user.id, open_todos_count=int(not todo_update.is_completed) - int(was_open))
         todo.is_completed = todo_update.is_completed
         if todo_update.is_completed:
             todo.completed_at = datetime.utcnow()
@@ -72,6 +183,7 @@ async def update_todo(
     if todo_update.priority:
         todo.priority = todo_update.priority
     
+    notify_user_change(db, current_user.id, TODOS)
     db.commit()
     db.refresh(todo)
     
@@ -91,7 +203,10 @@ async def delete_todo(
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
     
+    if todo.is_completed is False:
+        adjust_counters(db, current_user.id, open_todos_count=-1)
     db.delete(todo)
+    notify_user_change(db, current_user.id, TODOS)
     db.commit()
     
     return {"message": "Todo deleted successfully"}
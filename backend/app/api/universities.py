@@ -1,20 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import hashlib
 import json
 from datetime import datetime, timedelta
 from app.database import get_db
 from app.models import User, UserProfile, University, ShortlistedUniversity, UniversityCategory, UserStage, TodoItem, UniversityDocument, DocumentType, DocumentStatus
-from app.schemas import UniversityResponse, ShortlistedUniversityCreate, ShortlistedUniversityResponse
+from app.schemas import UniversityResponse, ShortlistedUniversityCreate, ShortlistedUniversityResponse, UniversityIdsRequest, RecommendationResponse
 from app.auth_utils import get_current_user
+from app.read_routing import get_read_db
+from app.etags import conditional_get, etag_headers, USER_DATA, CATALOG
+from app.serializers import serialize_universities, serialize_university, serialize_shortlisted
+from app.services.recommendations import score_universities, get_recommendation_page, refresh_recommendations_for_universities
+from app.services.data_versions import bump_versions
+from app.services.outbox import enqueue, outbox_handler
+from app.services.profile_counters import adjust_counters, shortlist_deltas
+from app.services.user_events import notify_user_change, PROFILE, SHORTLIST, TODOS, DOCUMENTS
 from app.services.university_service import import_universities_from_api, search_universities_api
 
 router = APIRouter()
 
-def generate_application_tasks(db: Session, user_id: int, university: University, profile: UserProfile):
-    """Generate application-specific tasks when a university is locked"""
+APPLICATION_PACKAGE = "application_package"
+
+def application_task_templates(university: University, profile: UserProfile) -> List[dict]:
+    """Application-specific tasks created when a university is locked"""
     
-    tasks = [
+    return [
         {
             "title": f"Research {university.name} application deadlines",
             "description": f"Find and note all deadlines for {university.name} including application, financial aid, and scholarship deadlines.",
@@ -66,80 +79,97 @@ def generate_application_tasks(db: Session, user_id: int, university: University
         }
     ]
     
-    # Add tasks to database
-    for task_data in tasks:
-        # Check if similar task already exists
-        existing = db.query(TodoItem).filter(
+REQUIRED_DOCUMENTS = [
+    {
+        "type": DocumentType.SOP,
+        "status": DocumentStatus.DRAFTING,
+        "due_days": 14
+    },
+    {
+        "type": DocumentType.RECOMMENDATION_LETTER,
+        "status": DocumentStatus.PENDING,
+        "due_days": 21
+    },
+    {
+        "type": DocumentType.RESUME,
+        "status": DocumentStatus.READY,
+        "due_days": None
+    },
+    {
+        "type": DocumentType.TRANSCRIPTS,
+        "status": DocumentStatus.READY,
+        "due_days": None
+    }
+]
+
+def create_application_tasks(db: Session, user_id: int, profile: UserProfile, universities: List[University]) -> int:
+    """Insert the missing application tasks for several universities with one lookup and one insert"""
+    tasks = [task for university in universities for task in application_task_templates(university, profile)]
+    if not tasks:
+        return 0
+    
+    # One query for every open task that already has one of these titles
+    existing_titles = {
+        title for (title,) in db.query(TodoItem.title).filter(
             TodoItem.user_id == user_id,
-            TodoItem.title == task_data["title"],
+            TodoItem.title.in_([task["title"] for task in tasks]),
             TodoItem.is_completed == False
-        ).first()
-        
-        if not existing:
-            due_date = datetime.utcnow() + timedelta(days=task_data["due_days"])
-            todo = TodoItem(
-                user_id=user_id,
-                title=task_data["title"],
-                description=task_data["description"],
-                priority=task_data["priority"],
-                category=task_data["category"],
-                due_date=due_date,
-                ai_generated=True
-            )
-            db.add(todo)
-    
-    # Commit tasks immediately
-    db.flush()
-
-def initialize_required_documents(db: Session, user_id: int, shortlisted_university_id: int):
-    """Initialize required documents for a locked university"""
-    
-    documents = [
-        {
-            "type": DocumentType.SOP,
-            "status": DocumentStatus.DRAFTING,
-            "due_days": 14
-        },
-        {
-            "type": DocumentType.RECOMMENDATION_LETTER,
-            "status": DocumentStatus.PENDING,
-            "due_days": 21
-        },
-        {
-            "type": DocumentType.RESUME,
-            "status": DocumentStatus.READY,
-            "due_days": None
-        },
-        {
-            "type": DocumentType.TRANSCRIPTS,
-            "status": DocumentStatus.READY,
-            "due_days": None
-        }
-    ]
-    
-    for doc_data in documents:
-        # Check if document already exists
-        existing = db.query(UniversityDocument).filter(
-            UniversityDocument.user_id == user_id,
-            UniversityDocument.shortlisted_university_id == shortlisted_university_id,
-            UniversityDocument.document_type == doc_data["type"]
-        ).first()
-        
-        if not existing:
-            due_date = None
-            if doc_data["due_days"]:
-                due_date = datetime.utcnow() + timedelta(days=doc_data["due_days"])
-            
-            doc = UniversityDocument(
-                user_id=user_id,
-                shortlisted_university_id=shortlisted_university_id,
-                document_type=doc_data["type"],
-                status=doc_data["status"],
-                due_date=due_date
-            )
-            db.add(doc)
+        )
+    }
     
-    db.flush()
+    now = datetime.utcnow()
+    rows = []
+    for task_data in tasks:
+        if task_data["title"] in existing_titles:
+            continue
+        existing_titles.add(task_data["title"])
+        rows.append({
+            "user_id": user_id,
+            "title": task_data["title"],
+            "description": task_data["description"],
+            "priority": task_data["priority"],
+            "category": task_data["category"],
+            "due_date": now + timedelta(days=task_data["due_days"]),
+            "is_completed": False,
+            "ai_generated": True,
+            "created_at": now
+        })
+    
+    if rows:
+        db.execute(insert(TodoItem), rows)
+    return len(rows)
+
+def create_required_documents(db: Session, user_id: int, shortlisted_university_ids: List[int]) -> int:
+    """Insert the missing required documents for several locked universities in one statement"""
+    if not shortlisted_university_ids:
+        return 0
+    
+    existing = set(db.query(
+        UniversityDocument.shortlisted_university_id, UniversityDocument.document_type
+    ).filter(
+        UniversityDocument.user_id == user_id,
+        UniversityDocument.shortlisted_university_id.in_(shortlisted_university_ids)
+    ))
+    
+    now = datetime.utcnow()
+    rows = []
+    for shortlisted_university_id in shortlisted_university_ids:
+        for doc_data in REQUIRED_DOCUMENTS:
+            if (shortlisted_university_id, doc_data["type"]) in existing:
+                continue
+            rows.append({
+                "user_id": user_id,
+                "shortlisted_university_id": shortlisted_university_id,
+                "document_type": doc_data["type"],
+                "status": doc_data["status"],
+                "due_date": now + timedelta(days=doc_data["due_days"]) if doc_data["due_days"] else None,
+                "created_at": now,
+                "updated_at": now
+            })
+    
+    if rows:
+        db.execute(insert(UniversityDocument), rows)
+    return len(rows)
 
 def seed_universities(db: Session):
     """Seed database with sample universities"""
@@ -293,63 +323,35 @@ def seed_universities(db: Session):
         },
     ]
     
-    for uni_data in universities_data:
-        university = University(**uni_data)
-        db.add(university)
+    universities = [University(**uni_data) for uni_data in universities_data]
+    db.add_all(universities)
+    db.flush()
     
+    # Score the new catalog entries for every onboarded user
+    refresh_recommendations_for_universities(db, [u.id for u in universities])
+    bump_versions(db, CATALOG)
     db.commit()
 
-def categorize_university(profile: UserProfile, university: University) -> str:
-    """Categorize university as Dream, Target, or Safe based on profile"""
-    
-    requirements = json.loads(university.requirements)
-    user_gpa = profile.gpa_percentage or 3.0
-    user_gre = profile.gre_gmat_score or 300
-    
-    required_gpa = requirements.get("gpa", 3.0)
-    required_gre = requirements.get("gre", 300)
-    
-    # Calculate fit score
-    gpa_diff = user_gpa - required_gpa
-    gre_diff = user_gre - required_gre
-    
-    if university.acceptance_rate < 10 or gpa_diff < -0.2 or gre_diff < -10:
-        return "dream"
-    elif gpa_diff > 0.3 or gre_diff > 20:
-        return "safe"
-    else:
-        return "target"
-
-def calculate_acceptance_chance(profile: UserProfile, university: University) -> str:
-    """Calculate acceptance chance"""
-    
-    requirements = json.loads(university.requirements)
-    user_gpa = profile.gpa_percentage or 3.0
-    user_gre = profile.gre_gmat_score or 300
-    
-    required_gpa = requirements.get("gpa", 3.0)
-    required_gre = requirements.get("gre", 300)
+def describe_fit(profile: UserProfile, university: University, category: str, acceptance_chance: str, cost_level: str) -> dict:
+    """fit_reason and risk_factors text for a shortlisted university"""
+    fit_reason = f"This university matches your {profile.field_of_study} interests and is located in {university.country}. "
+    fit_reason += f"Your academic profile is well-suited for this {category} university."
     
-    meets_requirements = user_gpa >= required_gpa and user_gre >= required_gre
+    risk_factors = ""
+    if acceptance_chance == "Low":
+        risk_factors += "Highly competitive admission. "
+    if cost_level == "High":
+        risk_factors += "Tuition exceeds your budget range. "
+    if not risk_factors:
+        risk_factors = "No major risks identified."
     
-    if university.acceptance_rate < 10:
-        return "Low" if not meets_requirements else "Medium"
-    elif university.acceptance_rate < 30:
-        return "Medium" if not meets_requirements else "High"
-    else:
-        return "High"
+    return {"fit_reason": fit_reason, "risk_factors": risk_factors}
 
-def calculate_cost_level(profile: UserProfile, university: University) -> str:
-    """Calculate cost level relative to budget"""
-    
-    avg_fee = (university.tuition_fee_min + university.tuition_fee_max) / 2
-    
-    if avg_fee > profile.budget_max:
-        return "High"
-    elif avg_fee < profile.budget_min:
-        return "Low"
-    else:
-        return "Medium"
+def advance_stage_after_shortlist(db: Session, user_id: int, profile: UserProfile, previous_count: int, inserted: int):
+    """Move to FINALIZING_UNIVERSITIES when the first universities are shortlisted"""
+    if previous_count == 0 and inserted > 0 and profile.current_stage == UserStage.DISCOVERING_UNIVERSITIES:
+        profile.current_stage = UserStage.FINALIZING_UNIVERSITIES
+        notify_user_change(db, user_id, PROFILE)
 
 @router.get("/seed")
 async def seed_universities_route(db: Session = Depends(get_db)):
@@ -359,11 +361,12 @@ async def seed_universities_route(db: Session = Depends(get_db)):
 
 @router.get("/search", response_model=List[UniversityResponse])
 async def search_universities(
+    etag: Optional[str] = Depends(conditional_get(CATALOG)),
     country: Optional[str] = None,
     name: Optional[str] = None,
     min_ranking: Optional[int] = None,
     max_ranking: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Search all universities in database"""
@@ -379,7 +382,7 @@ async def search_universities(
         query = query.filter(University.ranking <= max_ranking)
     
     universities = query.all()
-    return universities
+    return ORJSONResponse(serialize_universities(universities), headers=etag_headers(etag))
 
 @router.get("/import-real")
 async def import_real_universities_get(db: Session = Depends(get_db)):
@@ -431,43 +434,110 @@ async def search_from_api(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to search universities: {str(e)}")
 
+def get_onboarded_profile(db: Session, user_id: int) -> UserProfile:
+    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    if not profile or not profile.onboarding_completed:
+        raise HTTPException(status_code=400, detail="Please complete onboarding first")
+    return profile
+
 @router.get("/recommendations", response_model=List[UniversityResponse])
 async def get_recommendations(
+    etag: Optional[str] = Depends(conditional_get(USER_DATA, CATALOG)),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     country: Optional[str] = None,
-    field: Optional[str] = None
+    field: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500)
 ):
-    # Check if onboarding is completed
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    
-    if not profile or not profile.onboarding_completed:
-        raise HTTPException(status_code=400, detail="Please complete onboarding first")
-    
-    # Build query
-    query = db.query(University)
+    """Recommended universities, best fit first, from the user's materialized list"""
+    profile = get_onboarded_profile(db, current_user.id)
+    page = get_recommendation_page(db, profile, offset=offset, limit=limit, country=country, field=field)
+    return ORJSONResponse(serialize_universities(university for _, university in page), headers=etag_headers(etag))
+
+@router.get("/recommendations/ranked", response_model=List[RecommendationResponse])
+async def get_ranked_recommendations(
+    etag: Optional[str] = Depends(conditional_get(USER_DATA, CATALOG)),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    country: Optional[str] = None,
+    field: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Recommendations with their score, category and acceptance chance"""
+    profile = get_onboarded_profile(db, current_user.id)
+    page = get_recommendation_page(db, profile, offset=offset, limit=limit, country=country, field=field)
+    return ORJSONResponse([
+        {
+            "university_id": recommendation.university_id,
+            "score": recommendation.score,
+            "category": recommendation.category.value,
+            "acceptance_chance": recommendation.acceptance_chance,
+            "university": serialize_university(university)
+        }
+        for recommendation, university in page
+    ], headers=etag_headers(etag))
+
+@router.post("/shortlist/batch", response_model=List[ShortlistedUniversityResponse])
+async def shortlist_universities_batch(
+    request: UniversityIdsRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Shortlist many universities at once; category and insights are computed per university"""
+    university_ids = list(dict.fromkeys(request.university_ids))
+    
+    universities = db.query(University).filter(University.id.in_(university_ids)).all()
+    found = {university.id for university in universities}
+    missing = [university_id for university_id in university_ids if university_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Universities not found: {missing}")
+    
+    # Requested universities that are already shortlisted are skipped
+    already = {
+        university_id for (university_id,) in db.query(ShortlistedUniversity.university_id).filter(
+            ShortlistedUniversity.user_id == current_user.id,
+            ShortlistedUniversity.university_id.in_(university_ids)
+        )
+    }
     
-    # Filter by preferred countries
-    if profile.preferred_countries:
-        countries = json.loads(profile.preferred_countries)
-        query = query.filter(University.country.in_(countries))
+    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    previous_count = profile.shortlisted_count
     
-    # Filter by country if provided
-    if country:
-        query = query.filter(University.country == country)
+    universities = [university for university in universities if university.id not in already]
+    scores = score_universities(profile, universities)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": current_user.id,
+            "university_id": university.id,
+            "category": UniversityCategory[score["category"].upper()],
+            "is_locked": False,
+            "acceptance_chance": score["acceptance_chance"],
+            "cost_level": score["cost_level"],
+            "created_at": now,
+            **describe_fit(profile, university, **score)
+        }
+        for university, score in zip(universities, scores)
+    ]
     
-    # Filter by field if provided
-    if field:
-        query = query.filter(University.fields_offered.contains(field))
+    shortlisted = []
+    if rows:
+        shortlisted = db.scalars(
+            insert(ShortlistedUniversity).returning(ShortlistedUniversity, sort_by_parameter_order=True),
+            rows
+        ).all()
+        adjust_counters(db, current_user.id, **shortlist_deltas(row["category"] for row in rows))
+        notify_user_change(db, current_user.id, SHORTLIST)
     
-    # Filter by budget
-    query = query.filter(
-        University.tuition_fee_min <= profile.budget_max * 1.2  # 20% flexibility
-    )
+    advance_stage_after_shortlist(db, current_user.id, profile, previous_count, len(rows))
     
-    universities = query.all()
+    # Serialize before commit expires the rows, which would reload each one afterwards
+    response = [ShortlistedUniversityResponse.model_validate(item) for item in shortlisted]
+    db.commit()
     
-    return universities
+    return response
 
 @router.post("/shortlist", response_model=ShortlistedUniversityResponse)
 async def shortlist_university(
@@ -475,13 +545,12 @@ async def shortlist_university(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Check if already shortlisted
-    existing = db.query(ShortlistedUniversity).filter(
+    already = db.query(ShortlistedUniversity.id).filter(
         ShortlistedUniversity.user_id == current_user.id,
         ShortlistedUniversity.university_id == shortlist_data.university_id
     ).first()
     
-    if existing:
+    if already:
         raise HTTPException(status_code=400, detail="University already shortlisted")
     
     # Get university and profile
@@ -490,60 +559,134 @@ async def shortlist_university(
         raise HTTPException(status_code=404, detail="University not found")
     
     profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    previous_count = profile.shortlisted_count
     
     # Generate AI insights
-    category = categorize_university(profile, university)
-    acceptance_chance = calculate_acceptance_chance(profile, university)
-    cost_level = calculate_cost_level(profile, university)
-    
-    fit_reason = f"This university matches your {profile.field_of_study} interests and is located in {university.country}. "
-    fit_reason += f"Your academic profile is well-suited for this {category} university."
-    
-    risk_factors = ""
-    if acceptance_chance == "Low":
-        risk_factors += "Highly competitive admission. "
-    if cost_level == "High":
-        risk_factors += "Tuition exceeds your budget range. "
-    if not risk_factors:
-        risk_factors = "No major risks identified."
+    score = score_universities(profile, [university])[0]
     
     # Create shortlisted university
     shortlisted = ShortlistedUniversity(
         user_id=current_user.id,
         university_id=shortlist_data.university_id,
         category=UniversityCategory[shortlist_data.category.upper()],
-        fit_reason=fit_reason,
-        risk_factors=risk_factors,
-        acceptance_chance=acceptance_chance,
-        cost_level=cost_level
+        acceptance_chance=score["acceptance_chance"],
+        cost_level=score["cost_level"],
+        **describe_fit(profile, university, **score)
     )
     
     db.add(shortlisted)
-    db.commit()
-    db.refresh(shortlisted)
+    adjust_counters(db, current_user.id, **shortlist_deltas([shortlisted.category]))
+    notify_user_change(db, current_user.id, SHORTLIST)
     
-    # Update user stage progression
     # If this is their first shortlist, move to FINALIZING_UNIVERSITIES stage
-    shortlist_count = db.query(ShortlistedUniversity).filter(
-        ShortlistedUniversity.user_id == current_user.id
-    ).count()
-    
-    if shortlist_count == 1 and profile.current_stage == UserStage.DISCOVERING_UNIVERSITIES:
-        profile.current_stage = UserStage.FINALIZING_UNIVERSITIES
-        db.commit()
+    advance_stage_after_shortlist(db, current_user.id, profile, previous_count, 1)
+    db.commit()
+    db.refresh(shortlisted)
     
     return shortlisted
 
 @router.get("/shortlisted", response_model=List[ShortlistedUniversityResponse])
 async def get_shortlisted(
+    etag: Optional[str] = Depends(conditional_get(USER_DATA, CATALOG)),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    shortlisted = db.query(ShortlistedUniversity).filter(
+    shortlisted = db.query(ShortlistedUniversity, University).join(
+        University, University.id == ShortlistedUniversity.university_id
+    ).filter(
         ShortlistedUniversity.user_id == current_user.id
+    ).order_by(ShortlistedUniversity.id).all()
+    
+    return ORJSONResponse([serialize_shortlisted(s, university) for s, university in shortlisted], headers=etag_headers(etag))
+
+def lock_shortlisted_universities(db: Session, user_id: int, profile: UserProfile, locked: list) -> dict:
+    """Lock (ShortlistedUniversity, University) pairs and create their application packages"""
+    now = datetime.utcnow()
+    newly_locked = 0
+    for shortlisted, _ in locked:
+        newly_locked += not shortlisted.is_locked
+        shortlisted.is_locked = True
+        shortlisted.locked_at = now
+    
+    # Update user stage
+    if profile.current_stage != UserStage.PREPARING_APPLICATIONS:
+        profile.current_stage = UserStage.PREPARING_APPLICATIONS
+    
+    adjust_counters(db, user_id, locked_count=newly_locked)
+    notify_user_change(db, user_id, PROFILE, SHORTLIST)
+    
+    # Autoflush is off; without this the inline handler would not see the new locks and create nothing
+    db.flush()
+    
+    # Tasks and documents are built by the outbox worker, or right here when there is none.
+    # The key only depends on what is locked, so a retried request cannot build the package twice.
+    shortlisted_ids = [shortlisted.id for shortlisted, _ in locked]
+    digest = hashlib.sha1(",".join(map(str, sorted(shortlisted_ids))).encode()).hexdigest()
+    result = enqueue(db, APPLICATION_PACKAGE, {"shortlisted_ids": shortlisted_ids},
+                     user_id=user_id, dedupe_key=f"{APPLICATION_PACKAGE}:{user_id}:{digest}")
+    return result or {"tasks_generated": None, "documents_created": None}
+
+@outbox_handler(APPLICATION_PACKAGE)
+def create_application_package(db: Session, user_id: int, payload: dict) -> dict:
+    """Application tasks and required documents for newly locked universities"""
+    # Universities unlocked again before this ran get nothing
+    locked = db.query(ShortlistedUniversity, University).join(
+        University, University.id == ShortlistedUniversity.university_id
+    ).filter(
+        ShortlistedUniversity.user_id == user_id,
+        ShortlistedUniversity.id.in_(payload["shortlisted_ids"]),
+        ShortlistedUniversity.is_locked == True
     ).all()
+    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    if not locked or not profile:
+        return {"tasks_generated": 0, "documents_created": 0}
     
-    return shortlisted
+    tasks_generated = create_application_tasks(db, user_id, profile, [university for _, university in locked])
+    documents_created = create_required_documents(db, user_id, [shortlisted.id for shortlisted, _ in locked])
+    
+    # New tasks are open and no required document starts out uploaded
+    adjust_counters(db, user_id, open_todos_count=tasks_generated, pending_documents_count=documents_created)
+    notify_user_change(db, user_id, TODOS, DOCUMENTS)
+    return {"tasks_generated": tasks_generated, "documents_created": documents_created}
+
+def lock_message(count: int, tasks_generated: Optional[int]) -> str:
+    locked = "University locked" if count == 1 else f"{count} universities locked"
+    if tasks_generated is None:
+        return f"{locked} successfully! Application tasks are being added to your to-do list."
+    return f"{locked} successfully! {tasks_generated} application tasks have been added to your to-do list."
+
+def load_shortlisted_with_universities(db: Session, user_id: int, university_ids: List[int]) -> list:
+    return db.query(ShortlistedUniversity, University).join(
+        University, University.id == ShortlistedUniversity.university_id
+    ).filter(
+        ShortlistedUniversity.user_id == user_id,
+        ShortlistedUniversity.university_id.in_(university_ids)
+    ).all()
+
+@router.post("/lock/batch")
+async def lock_universities_batch(
+    request: UniversityIdsRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Lock several shortlisted universities in a single transaction"""
+    university_ids = list(dict.fromkeys(request.university_ids))
+    locked = load_shortlisted_with_universities(db, current_user.id, university_ids)
+    
+    found = {university.id for _, university in locked}
+    missing = [university_id for university_id in university_ids if university_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Universities not shortlisted: {missing}")
+    
+    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    result = lock_shortlisted_universities(db, current_user.id, profile, locked)
+    db.commit()
+    
+    return {
+        "message": lock_message(len(locked), result["tasks_generated"]),
+        "university_ids": university_ids,
+        **result
+    }
 
 @router.post("/lock/{university_id}")
 async def lock_university(
@@ -551,39 +694,22 @@ async def lock_university(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Find shortlisted university
-    shortlisted = db.query(ShortlistedUniversity).filter(
-        ShortlistedUniversity.user_id == current_user.id,
-        ShortlistedUniversity.university_id == university_id
-    ).first()
+    # Find shortlisted university together with the university itself
+    locked = load_shortlisted_with_universities(db, current_user.id, [university_id])
     
-    if not shortlisted:
+    if not locked:
         raise HTTPException(status_code=404, detail="University not shortlisted")
     
-    # Get university and profile
-    university = db.query(University).filter(University.id == university_id).first()
     profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
     
-    # Lock university
-    shortlisted.is_locked = True
-    shortlisted.locked_at = datetime.utcnow()
-    
-    # Update user stage
-    if profile.current_stage != UserStage.PREPARING_APPLICATIONS:
-        profile.current_stage = UserStage.PREPARING_APPLICATIONS
-    
-    # Generate application-specific tasks
-    generate_application_tasks(db, current_user.id, university, profile)
-    
-    # Initialize required documents
-    initialize_required_documents(db, current_user.id, shortlisted.id)
-    
+    # Lock university, generate tasks and initialize required documents
+    result = lock_shortlisted_universities(db, current_user.id, profile, locked)
     db.commit()
     
     return {
-        "message": f"University locked successfully! {7} application tasks have been added to your to-do list.",
+        "message": lock_message(1, result["tasks_generated"]),
         "university_id": university_id,
-        "tasks_generated": 7
+        "tasks_generated": result["tasks_generated"]
     }
 
 @router.post("/unlock/{university_id}")
@@ -602,20 +728,17 @@ async def unlock_university(
         raise HTTPException(status_code=404, detail="University not shortlisted")
     
     # Unlock university
+    if shortlisted.is_locked:
+        adjust_counters(db, current_user.id, locked_count=-1)
     shortlisted.is_locked = False
     shortlisted.locked_at = None
     
-    # Check if there are any other locked universities
-    other_locked = db.query(ShortlistedUniversity).filter(
-        ShortlistedUniversity.user_id == current_user.id,
-        ShortlistedUniversity.is_locked == True
-    ).first()
-    
     # Update user stage: if no other locked universities, revert to FINALIZING
     profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    if profile and not other_locked:
-        profile.current_stage = UserStage.FINALIZING
+    if profile and profile.locked_count == 0:
+        profile.current_stage = UserStage.FINALIZING_UNIVERSITIES
     
+    notify_user_change(db, current_user.id, PROFILE, SHORTLIST)
     db.commit()
     
     return {"message": "University unlocked successfully", "university_id": university_id}
@@ -634,22 +757,32 @@ async def remove_shortlist(
     if not shortlisted:
         raise HTTPException(status_code=404, detail="University not shortlisted")
     
-    # Delete associated tasks for this university
+    deltas = shortlist_deltas([shortlisted.category], sign=-1)
+    if shortlisted.is_locked:
+        deltas["locked_count"] = -1
+    
+    # Delete associated tasks for this university, the open ones first to count them
     university = db.query(University).filter(University.id == university_id).first()
     if university:
-        db.query(TodoItem).filter(
+        tasks = db.query(TodoItem).filter(
             TodoItem.user_id == current_user.id,
             TodoItem.title.like(f'%{university.name}%')
-        ).delete()
+        )
+        deltas["open_todos_count"] = -tasks.filter(TodoItem.is_completed == False).delete()
+        tasks.delete()
 
-    # Delete associated documents for this shortlist
-    db.query(UniversityDocument).filter(
+    # Delete associated documents for this shortlist, the pending ones first
+    documents = db.query(UniversityDocument).filter(
         UniversityDocument.user_id == current_user.id,
         UniversityDocument.shortlisted_university_id == shortlisted.id
-    ).delete()
+    )
+    deltas["pending_documents_count"] = -documents.filter(UniversityDocument.status != DocumentStatus.UPLOADED).delete()
+    documents.delete()
     
     # Delete the shortlist entry
     db.delete(shortlisted)
+    adjust_counters(db, current_user.id, **deltas)
+    notify_user_change(db, current_user.id, SHORTLIST, TODOS, DOCUMENTS)
     db.commit()
     
     return {"message": "University removed from shortlist"}
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List
 
 class Settings(BaseSettings):
     database_url: str
@@ -8,6 +9,83 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     gemini_api_key: str
     use_sqlite: str = "false"
+    huggingface_token: str = ""
+    
+    # Connection pooling per worker process: queue (direct to Postgres), external (small pool
+    # behind PgBouncer / Neon's -pooler endpoint, no overflow) or null (no pooling in the app)
+    db_pool_mode: str = "queue"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle_seconds: int = 3600
+    # Pooled connections idle longer than this are pinged at checkout (0: never)
+    db_ping_idle_seconds: float = 60.0
+    
+    # USE_SQLITE: WAL, tuned pragmas, one writer connection plus a pool of readers per process
+    # (false: a plain engine with SQLite's defaults)
+    sqlite_tuned: bool = True
+    sqlite_readers: int = 8
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_mib: int = 16
+    sqlite_mmap_mib: int = 256
+    
+    # Read replica for read-only endpoints (Postgres or, for local testing, another SQLite file);
+    # a user's reads stay on the primary for this long after they write
+    database_replica_url: str = ""
+    replica_sticky_seconds: float = 5.0
+    
+    # Semantic response cache for LLM counselor answers
+    counselor_cache_enabled: bool = True
+    counselor_cache_max_entries: int = 2000
+    counselor_cache_ttl_seconds: int = 86400
+    counselor_cache_similarity_threshold: float = 0.68
+    
+    # Chat persistence: batch turns across users from a background thread
+    chat_write_behind: bool = False
+    chat_write_behind_batch_size: int = 200
+    chat_write_behind_interval_ms: int = 50
+    
+    # Transactional outbox: with a worker, side effects (application packages, initial todos) are
+    # left to outbox_worker.py; without one they run inside the request as before
+    outbox_worker: bool = False
+    outbox_batch_size: int = 100
+    outbox_max_attempts: int = 8
+    outbox_poll_seconds: float = 1.0
+    outbox_retention_days: int = 7
+    
+    # Deadline reminders (remind_deadlines.py): hours before a todo/document is due, how far ahead
+    # deadlines are held in memory, and how often new rows are picked up
+    reminder_lead_hours: List[float] = [24.0, 0.0]
+    reminder_horizon_minutes: int = 60
+    reminder_poll_seconds: float = 30.0
+    reminder_batch_size: int = 1000
+    
+    # Chat messages older than this move to compressed monthly archives
+    chat_archive_after_days: int = 90
+    
+    # Counselor WebSocket channel
+    ws_heartbeat_interval_seconds: float = 20.0
+    ws_send_queue_size: int = 64
+    ws_history_size: int = 20
+    
+    # Responses smaller than this are sent uncompressed
+    compression_minimum_size: int = 1024
+    
+    # SQL instrumentation: X-DB-* headers and /debug/sql-stats when enabled
+    sql_debug: bool = False
+    sql_n_plus_one_threshold: int = 5
+    
+    # /metrics; with several workers set METRICS_DIR to a shared, per-deploy directory
+    metrics_enabled: bool = True
+    metrics_dir: str = ""
+    metrics_flush_interval_seconds: float = 5.0
+    
+    # Operator endpoints under /debug (profiling) are disabled unless this is set
+    admin_token: str = ""
+    profile_max_seconds: int = 60
+    
+    # Compact in-memory university catalog for recommendation scoring (built before fork with gunicorn.conf.py)
+    catalog_cache: bool = True
     
     class Config:
         env_file = ".env"
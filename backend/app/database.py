@@ -1,42 +1,367 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.selectable import CompoundSelect, Select, TextualSelect
+from sqlalchemy.pool import NullPool, QueuePool
 from app.config import get_settings
+from app.metrics import DB_DISCONNECTS, DB_POOL_WAIT, DB_POOL_TIMEOUTS, register_pool_collector
 import os
 from dotenv import load_dotenv
 
 # Load .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class TimedPoolMixin:
+    """Reports how long checkouts take: waiting for a free pooled connection, or connecting"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedNullPool(TimedPoolMixin, NullPool):
+    pass
+
+
+POOL_MODES = ("queue", "external", "null")
+
+
+def pool_options(mode: str, pool_size: int = 5, max_overflow: int = 10, pool_timeout: float = 30.0,
+                 pool_recycle: int = 3600) -> dict:
+    """create_engine() keyword arguments for a pooling mode.
+    
+    queue: a persistent pool per process, talking to Postgres directly.
+    external: a small persistent pool without overflow in front of a transaction-mode
+        pooler (PgBouncer, Neon's -pooler endpoint), which absorbs bursts.
+    null: no pooling in the process; every checkout connects through the external pooler.
+    """
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown pool mode {mode!r}; expected one of {', '.join(POOL_MODES)}")
+    if mode == "null":
+        return {"poolclass": TimedNullPool}
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": 0 if mode == "external" else max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+    }
+
+
+def pooler_connect_args(database_url: str) -> dict:
+    """Disable server-side prepared statements, which break behind a transaction-mode pooler"""
+    if make_url(database_url).get_driver_name() == "psycopg":
+        return {"prepare_threshold": None}
+    # psycopg2 (the default driver) never prepares statements server-side
+    return {}
+
+
+def install_reconnect_handling(engine, ping_idle_seconds: float):
+    """Error-driven reconnects instead of pool_pre_ping's round trip on every checkout.
+    
+    A disconnect error invalidates the whole pool, so every other connection
+    opened before the failure (e.g. before Neon suspended) is replaced on its next
+    checkout. Connections that sat idle for longer than ping_idle_seconds are
+    pinged once at checkout; under steady traffic nothing is pinged.
+    """
+    @event.listens_for(engine.pool, "checkin")
+    def _record_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+    
+    @event.listens_for(engine.pool, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if not ping_idle_seconds or checked_in_at is None or time.monotonic() - checked_in_at < ping_idle_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            # The pool discards this connection and retries the checkout with a new one
+            raise exc.DisconnectionError(f"Idle connection failed ping: {e}") from e
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+    
+    @event.listens_for(engine, "handle_error")
+    def _count_disconnects(context):
+        if context.is_disconnect:
+            DB_DISCONNECTS.inc()
+            logger.warning(f"Database connection lost, invalidating pool: {context.original_exception}")
+
+
+def sqlite_pragmas(busy_timeout_ms: int = 5000, cache_mib: int = 16, mmap_mib: int = 256) -> list:
+    """Per-connection settings of the tuned SQLite mode"""
+    return [
+        # First, so that the statements below also wait for locks instead of failing
+        f"PRAGMA busy_timeout={int(busy_timeout_ms)}",
+        # WAL: readers never block the writer and the writer never blocks readers.
+        # Persistent in the database file; the other pragmas are per connection.
+        "PRAGMA journal_mode=WAL",
+        # With WAL, NORMAL only syncs at checkpoints: a power loss can drop the
+        # last commits but never corrupts the database
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA cache_size=-{int(cache_mib) * 1024}",  # negative: KiB
+        f"PRAGMA mmap_size={int(mmap_mib) * 2 ** 20}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def create_sqlite_engines(database_url: str, readers: int = 8, pool_timeout: float = 30.0, **pragma_options):
+    """Writer and reader engines on one SQLite file.
+    
+    The writer engine has a single connection, so writers in this process queue
+    in its pool (visible as pool wait) instead of spinning on SQLITE_BUSY. Its
+    transactions start with BEGIN IMMEDIATE: the write lock is taken up front,
+    waiting up to busy_timeout for writers in other processes, rather than failing
+    when a read transaction tries to upgrade. The reader engine is a pool of
+    query_only connections whose statements each see the latest commit.
+    """
+    pragmas = sqlite_pragmas(**pragma_options)
+    writer = create_engine(database_url, connect_args={"check_same_thread": False}, poolclass=TimedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=pool_timeout)
+    
+    @event.listens_for(writer, "connect")
+    def _configure_writer(dbapi_connection, connection_record):
+        # Let SQLAlchemy's begin event issue BEGIN instead of the sqlite3 module
+        dbapi_connection.isolation_level = None
+        for pragma in pragmas:
+            dbapi_connection.execute(pragma)
+    
+    @event.listens_for(writer, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    
+    return writer, create_sqlite_reader_engine(database_url, readers, pool_timeout, **pragma_options)
+
+
+def create_sqlite_reader_engine(database_url: str, readers: int = 8, pool_timeout: float = 30.0, **pragma_options):
+    """Pool of query_only connections to a SQLite file (that another connection keeps in WAL mode)"""
+    pragmas = [pragma for pragma in sqlite_pragmas(**pragma_options) if "journal_mode" not in pragma]
+    reader = create_engine(database_url, connect_args={"check_same_thread": False}, poolclass=TimedQueuePool,
+                           pool_size=readers, max_overflow=0, pool_timeout=pool_timeout)
+    
+    @event.listens_for(reader, "connect")
+    def _configure_reader(dbapi_connection, connection_record):
+        for pragma in pragmas:
+            dbapi_connection.execute(pragma)
+        dbapi_connection.execute("PRAGMA query_only=ON")
+    
+    return reader
+
+
+class RoutingSession(Session):
+    """Session over a writer engine (bind) and an optional reader engine.
+    
+    Reads go to the reader until the transaction writes; from then until commit
+    or rollback every statement uses the writer, so the session reads its own
+    uncommitted changes. When the reader may lag behind the writer (a replica,
+    reader_lags=True), the session stays on the writer until it is closed, so it
+    also reads what it committed. Without a reader it is a plain Session.
+    
+    Only SELECTs count as reads; any other statement, including text() DML such
+    as WITH ... UPDATE, is sent to the writer.
+    """
+    
+    def __init__(self, *args, reader=None, reader_lags: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reader = reader
+        self.reader_lags = reader_lags
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind = super().get_bind(mapper=mapper, clause=clause, **kw)
+        reader = self.reader
+        if reader is None or self.info.get("writing"):
+            return bind
+        if self._flushing or not is_read_statement(clause):
+            self.info["writing"] = True
+            return bind
+        return reader
+
+
+def is_read_statement(clause) -> bool:
+    """Whether a statement may run on a read-only connection"""
+    if clause is None:
+        # session.connection() without a statement, e.g. to read connection info
+        return True
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().upper().startswith("SELECT")
+    return isinstance(clause, (Select, CompoundSelect, TextualSelect))
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _end_writing(session, transaction):
+    if transaction.parent is None and not session.reader_lags:
+        session.info.pop("writing", None)
+
+
 # Check if we should use SQLite FIRST, before loading settings
 use_sqlite = os.getenv("USE_SQLITE", "false").lower() == "true"
 
-if use_sqlite:
-    # Use local SQLite for development
-    database_url = "sqlite:///./study_abroad.db"
-    engine = create_engine(
-        database_url,
-        connect_args={"check_same_thread": False}
-    )
-else:
+_engine = None
+_reader_engine = None
+_replica_engine = None
+_engine_lock = threading.Lock()
+
+
+def _create_engine():
+    global _reader_engine
+    if use_sqlite:
+        # Use local SQLite for development
+        database_url = "sqlite:///./study_abroad.db"
+        settings = get_settings()
+        if not settings.sqlite_tuned:
+            return create_engine(
+                database_url,
+                connect_args={"check_same_thread": False},
+                poolclass=TimedQueuePool
+            )
+        engine, _reader_engine = create_sqlite_engines(
+            database_url,
+            readers=settings.sqlite_readers,
+            pool_timeout=settings.db_pool_timeout,
+            busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+            cache_mib=settings.sqlite_cache_mib,
+            mmap_mib=settings.sqlite_mmap_mib,
+        )
+        register_pool_collector(_reader_engine, "reader")
+        return engine
+    
     # Load settings and use PostgreSQL for production
     settings = get_settings()
     database_url = settings.database_url
     
-    # Optimized for Neon (serverless PostgreSQL)
+    connect_args = pooler_connect_args(database_url) if settings.db_pool_mode != "queue" else {}
     engine = create_engine(
         database_url,
-        pool_pre_ping=True,        # Check connection health
-        pool_size=5,                # Connection pool
-        max_overflow=10,            # Extra connections if needed
-        pool_recycle=3600,          # Recycle connections every hour
-        echo=False                  # Set to True for debugging
+        connect_args=connect_args,
+        echo=False,                 # Set to True for debugging
+        **pool_options(
+            settings.db_pool_mode,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
     )
+    if settings.db_pool_mode != "null":
+        install_reconnect_handling(engine, settings.db_ping_idle_seconds)
+    return engine
+
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _create_replica_engine():
+    settings = get_settings()
+    replica_url = settings.database_replica_url
+    if not replica_url:
+        return None
+    if make_url(replica_url).get_backend_name() == "sqlite":
+        return create_sqlite_reader_engine(
+            replica_url,
+            readers=settings.sqlite_readers,
+            pool_timeout=settings.db_pool_timeout,
+            busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+            cache_mib=settings.sqlite_cache_mib,
+            mmap_mib=settings.sqlite_mmap_mib,
+        )
+    
+    engine = create_engine(
+        replica_url,
+        connect_args=pooler_connect_args(replica_url) if settings.db_pool_mode != "queue" else {},
+        **pool_options(
+            settings.db_pool_mode,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+    )
+    if settings.db_pool_mode != "null":
+        install_reconnect_handling(engine, settings.db_ping_idle_seconds)
+    return engine
+
+
+def get_engine():
+    """The process-wide (writer) engine, created on first use (no connection is opened here)"""
+    global _engine, _replica_engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = _create_engine()
+                register_pool_collector(engine)
+                SessionLocal.configure(bind=engine, reader=_reader_engine)
+                _replica_engine = _create_replica_engine()
+                if _replica_engine is not None:
+                    register_pool_collector(_replica_engine, "replica")
+                    ReadSessionLocal.configure(bind=engine, reader=_replica_engine, reader_lags=True)
+                else:
+                    ReadSessionLocal.configure(bind=engine, reader=_reader_engine)
+                _engine = engine
+    return _engine
+
+
+def get_replica_engine():
+    """The read replica engine (DATABASE_REPLICA_URL), or None when not configured"""
+    get_engine()
+    return _replica_engine
+
+
+def dispose_engine():
+    """Close pooled connections; the engine stays usable and reconnects on demand"""
+    for engine in (_engine, _reader_engine, _replica_engine):
+        if engine is not None:
+            engine.dispose()
+
+
+def __getattr__(name):
+    # `from app.database import engine` keeps working and creates the engine on demand
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazySessionMaker(sessionmaker):
+    """sessionmaker that creates the engine the first time a session is opened"""
+    
+    def __call__(self, **local_kw):
+        if _engine is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionMaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+# Sessions that read from the replica when one is configured (app/read_routing.py)
+ReadSessionLocal = LazySessionMaker(class_=RoutingSession, autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
+
+def create_tables():
+    """Create missing tables directly from the models; for SQLite development and throwaway databases.
+    Shared databases are managed with Alembic (`alembic upgrade head`)."""
+    Base.metadata.create_all(bind=get_engine())
+
+
 def get_db():
     db = SessionLocal()
     try:
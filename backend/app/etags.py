@@ -0,0 +1,88 @@
+"""
+ETag / 304 support for read endpoints backed by data_versions counters.
+
+Declare the dependency before get_current_user so that a matching
+If-None-Match is answered before the user and the response data are loaded:
+
+    etag: Optional[str] = Depends(conditional_get(USER_DATA, CATALOG))
+
+and send the tag back with etag_headers(etag).
+"""
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from app.read_routing import get_read_db, request_user_id
+from app.services.data_versions import CATALOG, user_scope, chat_scope, get_versions
+
+USER_DATA = "user"
+CHAT = "chat"
+
+# Bump when a response format changes so clients drop tags from before a deploy
+ETAG_FORMAT_VERSION = 1
+
+# Suffixes added by CompressionMiddleware to tags of compressed responses
+_ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def _scope_name(kind: str, user_id: int) -> str:
+    if kind == USER_DATA:
+        return user_scope(user_id)
+    if kind == CHAT:
+        return chat_scope(user_id)
+    return CATALOG
+
+
+def _normalize(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The client's tag that matches etag (encoding suffix included), or None"""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    current = _normalize(etag)
+    for tag in if_none_match.split(","):
+        if _normalize(tag) == current:
+            tag = tag.strip()
+            return tag[2:] if tag.startswith("W/") else tag
+    return None
+
+
+def conditional_get(*kinds: str):
+    """Dependency returning the current ETag, or raising 304 when the client's copy is current"""
+    def dependency(request: Request, db: Session = Depends(get_read_db)) -> Optional[str]:
+        user_id = request_user_id(request)
+        if user_id is None:
+            # Tokens issued before user ids were embedded: serve normally, without a tag
+            return None
+
+        scopes = [_scope_name(kind, user_id) for kind in kinds]
+        versions = get_versions(db, scopes)
+        etag = '"v{}-u{}-{}"'.format(
+            ETAG_FORMAT_VERSION, user_id, "-".join(str(versions[scope]) for scope in scopes)
+        )
+
+        matched = matching_etag(request.headers.get("if-none-match"), etag)
+        if matched:
+            # Echo the client's tag so a cached compressed variant stays valid
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(matched))
+        return etag
+    return dependency
+
+
+def etag_headers(etag: Optional[str]) -> Dict[str, str]:
+    if not etag:
+        return {}
+    # Per-user data: browsers may keep it, but must revalidate before reuse
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
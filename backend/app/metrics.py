@@ -0,0 +1,428 @@
+"""
+In-process metrics rendered in the Prometheus text format at /metrics.
+
+Counters, gauges and histograms live in this process. Values that already
+exist elsewhere (cache hit counts, pool state, queue depths) are read at
+scrape time by collectors instead of being mirrored.
+
+With several gunicorn workers each process only sees its own requests. When
+METRICS_DIR is set, every worker writes its samples to METRICS_DIR/<pid>.json
+every few seconds and whichever worker serves /metrics merges all files:
+counters and histograms are summed (a dead worker's totals are kept), gauges
+are summed over live workers only. Point METRICS_DIR at a directory that is
+emptied on deploy.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+UPSTREAM_DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+# (family, sample name, labels, value)
+Sample = Tuple[str, str, Dict[str, str], float]
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative, running = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            cumulative.append((_format_bound(bound), running))
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+
+def histogram_samples(name: str, labels: Dict[str, str], snapshot: dict) -> List[Sample]:
+    samples = [(name, f"{name}_bucket", dict(labels, le=le), count) for le, count in snapshot["buckets"]]
+    samples.append((name, f"{name}_sum", labels, snapshot["sum"]))
+    samples.append((name, f"{name}_count", labels, snapshot["count"]))
+    return samples
+
+
+class Metric:
+    def __init__(self, name: str, kind: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        samples = []
+        for key, value in items:
+            labels = dict(zip(self.labelnames, key))
+            if self.kind == HISTOGRAM:
+                with self._lock:
+                    snapshot = value.snapshot()
+                samples.extend(histogram_samples(self.name, labels, snapshot))
+            else:
+                samples.append((self.name, self.name, labels, value))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        # Called at scrape time; yield (family, kind, help, sample name, labels, value)
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    def metric(self, name: str, kind: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()) -> Metric:
+        if name not in self._metrics:
+            self._metrics[name] = Metric(name, kind, help, labelnames, buckets)
+        return self._metrics[name]
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]):
+        self._collectors.append(collector)
+        return collector
+
+    def snapshot(self) -> dict:
+        families: Dict[str, Tuple[str, str]] = {}
+        samples: List[Sample] = []
+        for metric in self._metrics.values():
+            families[metric.name] = (metric.kind, metric.help)
+            samples.extend(metric.samples())
+        for collector in self._collectors:
+            try:
+                for family, kind, help, sample_name, labels, value in collector():
+                    families.setdefault(family, (kind, help))
+                    samples.append((family, sample_name, labels, value))
+            except Exception as e:
+                logger.error(f"Metrics collector {collector.__name__} failed: {str(e)}")
+        return {"pid": os.getpid(), "time": time.time(), "families": families, "samples": samples}
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.metric(
+    "http_requests_total", COUNTER, "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_DURATION = REGISTRY.metric(
+    "http_request_duration_seconds", HISTOGRAM, "HTTP request latency by route template",
+    ("method", "route"), REQUEST_DURATION_BUCKETS)
+HTTP_IN_FLIGHT = REGISTRY.metric(
+    "http_requests_in_flight", GAUGE, "HTTP requests currently being served")
+DB_POOL_WAIT = REGISTRY.metric(
+    "db_pool_checkout_wait_seconds", HISTOGRAM, "Time spent getting a connection (pool wait, or connecting when unpooled)",
+    buckets=POOL_WAIT_BUCKETS)
+DB_POOL_TIMEOUTS = REGISTRY.metric(
+    "db_pool_checkout_timeouts_total", COUNTER, "Checkouts that gave up after pool_timeout")
+DB_DISCONNECTS = REGISTRY.metric(
+    "db_disconnects_total", COUNTER, "Statements that failed on a lost connection (the pool is then invalidated)")
+DB_READ_ROUTING = REGISTRY.metric(
+    "db_read_routing_total", COUNTER, "Read-only requests by the database they read from", ("target",))
+REMINDERS = REGISTRY.metric(
+    "deadline_reminders_total", COUNTER, "Reminders that came due, by item kind and whether an event was written",
+    ("kind", "result"))
+REMINDERS_SCHEDULED = REGISTRY.metric(
+    "deadline_reminders_scheduled", GAUGE, "Upcoming reminders held by the deadline scheduler")
+OUTBOX_EVENTS = REGISTRY.metric(
+    "outbox_events_total", COUNTER, "Outbox events by topic and outcome (enqueued, duplicate, processed, retried, dead)",
+    ("topic", "result"))
+OUTBOX_HANDLER_DURATION = REGISTRY.metric(
+    "outbox_handler_duration_seconds", HISTOGRAM, "Time spent running an outbox event's handler",
+    ("topic",), REQUEST_DURATION_BUCKETS)
+OUTBOX_WAITING = REGISTRY.metric(
+    "outbox_waiting_events", GAUGE, "Unprocessed outbox events that will still be attempted")
+OUTBOX_DEAD = REGISTRY.metric(
+    "outbox_dead_events", GAUGE, "Outbox events that failed every attempt")
+OUTBOX_LAG = REGISTRY.metric(
+    "outbox_drain_lag_seconds", GAUGE, "Age of the oldest outbox event not yet processed")
+UPSTREAM_DURATION = REGISTRY.metric(
+    "upstream_request_duration_seconds", HISTOGRAM, "Latency of calls to external APIs",
+    ("upstream", "operation"), UPSTREAM_DURATION_BUCKETS)
+UPSTREAM_ERRORS = REGISTRY.metric(
+    "upstream_errors_total", COUNTER, "Failed calls to external APIs by exception type",
+    ("upstream", "operation", "error"))
+
+
+@contextmanager
+def track_upstream(upstream: str, operation: str):
+    """Time a call to an external API and count it as an error if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(upstream=upstream, operation=operation, error=type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_DURATION.observe(time.perf_counter() - start, upstream=upstream, operation=operation)
+
+
+def register_pool_collector(engine, name: str = "primary"):
+    """Expose size/checked-out/overflow gauges for a QueuePool-backed engine"""
+    @REGISTRY.register_collector
+    def collect_pool():
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            return
+        labels = {"pool": name}
+        yield ("db_pool_size", GAUGE, "Configured pool size", "db_pool_size", labels, pool.size())
+        yield ("db_pool_checked_out", GAUGE, "Connections currently checked out",
+               "db_pool_checked_out", labels, pool.checkedout())
+        yield ("db_pool_overflow", GAUGE, "Connections open beyond pool_size (negative: unused pool slots)",
+               "db_pool_overflow", labels, pool.overflow())
+
+
+def process_memory(pid="self") -> Dict[str, int]:
+    """Resident memory of a process in bytes from /proc (Linux); empty elsewhere.
+
+    rss counts pages shared copy-on-write with the master and other workers in
+    full; pss splits them between the processes sharing them; private is what
+    this process alone holds.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if rest.strip().endswith("kB"):
+                    fields[key] = int(rest.split()[0]) * 1024
+    except (OSError, ValueError):
+        return {}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+@REGISTRY.register_collector
+def collect_process_memory():
+    # Labelled by pid so the merged view keeps one series per live worker
+    for kind, value in process_memory().items():
+        yield ("process_memory_bytes", GAUGE, "Resident memory of this worker by kind (rss, pss, private, shared)",
+               "process_memory_bytes", {"pid": str(os.getpid()), "kind": kind}, value)
+
+
+def _cache_samples(cache: str, hits: float, misses: float) -> Iterable[tuple]:
+    yield ("cache_hits_total", COUNTER, "Cache hits by cache", "cache_hits_total", {"cache": cache}, hits)
+    yield ("cache_misses_total", COUNTER, "Cache misses by cache", "cache_misses_total", {"cache": cache}, misses)
+
+
+@REGISTRY.register_collector
+def collect_app_metrics():
+    # Imported here so that loading app.metrics never pulls in the application modules
+    from app.middleware.sql_stats import route_stats
+    from app.serializers import _parse_json_text
+    from app.services.catalog import catalog_stats
+    from app.services.chat_persistence import _write_behind
+    from app.services.context_snapshot import snapshot_stats
+    from app.services.notifications import registry
+    from app.services.response_cache import get_response_cache
+
+    counselor = get_response_cache().stats()
+    yield from _cache_samples("counselor_response", counselor["hits"], counselor["misses"])
+    yield ("cache_entries", GAUGE, "Entries held by cache", "cache_entries", {"cache": "counselor_response"},
+           counselor["entries"])
+
+    parsed = _parse_json_text.cache_info()
+    yield from _cache_samples("university_json", parsed.hits, parsed.misses)
+    yield ("cache_entries", GAUGE, "Entries held by cache", "cache_entries", {"cache": "university_json"},
+           parsed.currsize)
+
+    # Every snapshot read is a context build avoided
+    snapshots = snapshot_stats()
+    yield from _cache_samples("counselor_context", snapshots["reads"], snapshots["builds"])
+
+    catalog = catalog_stats()
+    yield ("catalog_universities", GAUGE, "Universities held by the in-memory compact catalog",
+           "catalog_universities", {}, catalog["universities"])
+    yield ("catalog_bytes", GAUGE, "Size of the compact catalog's column arrays",
+           "catalog_bytes", {}, catalog["bytes"])
+
+    yield ("websocket_connections", GAUGE, "Open counselor WebSocket connections",
+           "websocket_connections", {}, registry.count())
+
+    if _write_behind is not None:
+        yield ("chat_write_behind_pending", GAUGE, "Chat turns waiting to be flushed",
+               "chat_write_behind_pending", {}, _write_behind.pending())
+        yield ("chat_write_behind_rows_total", COUNTER, "Chat rows flushed or failed by the write-behind queue",
+               "chat_write_behind_rows_total", {"result": "flushed"}, _write_behind.flushed_rows)
+        yield ("chat_write_behind_rows_total", COUNTER, "Chat rows flushed or failed by the write-behind queue",
+               "chat_write_behind_rows_total", {"result": "failed"}, _write_behind.failed_rows)
+
+    for route, stats in route_stats().items():
+        method, _, path = route.partition(" ")
+        labels = {"method": method, "route": path}
+        for sample in histogram_samples("db_queries_per_request", labels, stats["queries"]):
+            yield ("db_queries_per_request", HISTOGRAM, "SQL statements per request by route") + sample[1:]
+        for sample in histogram_samples("db_time_per_request_ms", labels, stats["db_time_ms"]):
+            yield ("db_time_per_request_ms", HISTOGRAM, "Database time per request by route") + sample[1:]
+        yield ("db_n_plus_one_requests_total", COUNTER, "Requests with a likely N+1 query pattern",
+               "db_n_plus_one_requests_total", labels, stats["n_plus_one"])
+
+
+# Multi-worker aggregation
+
+def _snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"{pid}.json")
+
+
+def write_snapshot(directory: str):
+    snapshot = REGISTRY.snapshot()
+    path = _snapshot_path(directory, snapshot["pid"])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)  # readers never see a half-written file
+    return snapshot
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    families: Dict[str, Tuple[str, str]] = {}
+    totals: Dict[Tuple[str, str, tuple], float] = {}
+    for snapshot in snapshots:
+        alive = snapshot.get("pid") == os.getpid() or _pid_alive(snapshot.get("pid", 0))
+        for family, (kind, help) in snapshot["families"].items():
+            families.setdefault(family, (kind, help))
+        for family, sample_name, labels, value in snapshot["samples"]:
+            if not alive and snapshot["families"].get(family, (GAUGE,))[0] == GAUGE:
+                continue
+            key = (family, sample_name, tuple(sorted(labels.items())))
+            totals[key] = totals.get(key, 0) + value
+    samples = [(family, sample_name, dict(labels), value) for (family, sample_name, labels), value in totals.items()]
+    return {"families": families, "samples": samples}
+
+
+def collect(directory: Optional[str] = None) -> dict:
+    """This process's metrics, or all workers' when a shared directory is configured"""
+    if not directory:
+        return REGISTRY.snapshot()
+    os.makedirs(directory, exist_ok=True)
+    snapshots = [write_snapshot(directory)]
+    for filename in os.listdir(directory):
+        if not filename.endswith(".json") or filename == f"{os.getpid()}.json":
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable metrics snapshot {filename}: {str(e)}")
+    return merge_snapshots(snapshots)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_text(snapshot: dict) -> str:
+    """Prometheus text exposition format 0.0.4"""
+    by_family: Dict[str, List[Sample]] = {}
+    for sample in snapshot["samples"]:
+        by_family.setdefault(sample[0], []).append(sample)
+
+    lines = []
+    for family in sorted(by_family):
+        kind, help = snapshot["families"][family]
+        lines.append(f"# HELP {family} {help}")
+        lines.append(f"# TYPE {family} {kind}")
+        for _, sample_name, labels, value in by_family[family]:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}" if label_text
+                         else f"{sample_name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class SnapshotWriter:
+    """Background thread that keeps this worker's snapshot file fresh"""
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(self.interval)
+        # Final totals, so counters of a stopped worker stay in the sum
+        write_snapshot(self.directory)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                write_snapshot(self.directory)
+            except Exception as e:
+                logger.error(f"Writing metrics snapshot failed: {str(e)}")
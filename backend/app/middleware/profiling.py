@@ -0,0 +1,45 @@
+"""
+Per-request profiling: a request sent with "X-Profile: 1" and a valid
+"X-Admin-Token" runs under a StackSampler. The profile is kept in memory and
+its id returned in the X-Profile-Id response header; fetch it from
+/debug/profile/requests/{id}. Only installed when ADMIN_TOKEN is configured.
+"""
+import hmac
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.profiling import StackSampler, request_profiles
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, admin_token: str, interval: float = 0.001):
+        self.app = app
+        self.admin_token = admin_token
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if "x-profile" not in headers or not hmac.compare_digest(
+            headers.get("x-admin-token", ""), self.admin_token
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])["X-Profile-Id"] = profile_id
+            await send(message)
+
+        sampler = StackSampler(self.interval).start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            request_profiles.add(scope["method"], scope["path"], sampler, profile_id)
@@ -0,0 +1,172 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events record every statement executed while a request is
+in flight: how many, total database time, the slowest one and how often each
+statement shape repeats. A SELECT shape seen SQL_N_PLUS_ONE_THRESHOLD times
+in one request (the same query with different parameters) is logged as a
+likely N+1 query. Repeated INSERTs are not flagged: on SQLite a bulk insert
+with RETURNING runs one statement per row.
+
+After each request the numbers are folded into per-route histograms
+(route_stats()). With SQL_DEBUG enabled they are also sent as
+X-DB-* response headers.
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+DB_TIME_MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 1000)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# A parenthesised list of bind placeholders, e.g. an expanded IN (...) or a VALUES row
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+))*\s*\)")
+_REPEATED_ROWS_RE = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with whitespace and placeholder lists collapsed, so repeats compare equal"""
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST_RE.sub("(...)", shape)
+    return _REPEATED_ROWS_RE.sub("(...)", shape)
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "total_ms", "slowest_ms", "slowest_statement", "shapes", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter = Counter()
+        # Sync endpoints and dependencies run in worker threads
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed_ms: float):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[shape] += 1
+            if elapsed_ms > self.slowest_ms:
+                self.slowest_ms = elapsed_ms
+                self.slowest_statement = shape
+
+    def repeated_shapes(self, threshold: int) -> Dict[str, int]:
+        with self._lock:
+            return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+_current: contextvars.ContextVar[Optional[RequestQueryStats]] = contextvars.ContextVar("sql_request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._sql_stats_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_sql_stats_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+class RouteQueryStats:
+    def __init__(self):
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time_ms = Histogram(DB_TIME_MS_BUCKETS)
+        self.n_plus_one = 0
+
+
+_routes: Dict[str, RouteQueryStats] = {}
+_routes_lock = threading.Lock()
+
+
+def _record_route(route: str, stats: RequestQueryStats, suspected_n_plus_one: bool):
+    with _routes_lock:
+        entry = _routes.get(route)
+        if entry is None:
+            entry = _routes[route] = RouteQueryStats()
+        entry.queries.observe(stats.count)
+        entry.db_time_ms.observe(stats.total_ms)
+        if suspected_n_plus_one:
+            entry.n_plus_one += 1
+
+
+def route_stats() -> Dict[str, dict]:
+    """Histograms per "METHOD /path/template" since process start"""
+    with _routes_lock:
+        return {
+            route: {
+                "queries": entry.queries.snapshot(),
+                "db_time_ms": entry.db_time_ms.snapshot(),
+                "n_plus_one": entry.n_plus_one,
+            }
+            for route, entry in _routes.items()
+        }
+
+
+def reset_route_stats():
+    with _routes_lock:
+        _routes.clear()
+
+
+class SQLStatsMiddleware:
+    def __init__(self, app, debug_headers: bool = False, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.debug_headers = debug_headers
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.debug_headers:
+                headers = MutableHeaders(raw=message["headers"])
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = f"{stats.total_ms:.2f}"
+                headers["X-DB-Slowest-Ms"] = f"{stats.slowest_ms:.2f}"
+                headers["X-DB-Repeated-Statements"] = str(len(stats.repeated_shapes(2)))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            self._finish(scope, stats)
+
+    def _finish(self, scope, stats: RequestQueryStats):
+        route = scope.get("route")
+        # Group by path template; unmatched paths (404s) share one bucket
+        route_name = f"{scope['method']} {route.path}" if route is not None else f"{scope['method']} <unmatched>"
+
+        repeated = {
+            shape: count for shape, count in stats.repeated_shapes(self.n_plus_one_threshold).items()
+            if shape[:6].upper() == "SELECT"
+        }
+        for shape, count in repeated.items():
+            logger.warning(f"Possible N+1 in {route_name}: statement ran {count}x: {shape[:200]}")
+
+        _record_route(route_name, stats, bool(repeated))
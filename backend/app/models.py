@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Enum, LargeBinary, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -85,6 +85,19 @@ class UserProfile(Base):
     exam_strength = Column(Enum(ProfileStrength), nullable=True)
     overall_strength = Column(Enum(ProfileStrength), nullable=True)
     
+    # Fingerprint of the inputs the stored recommendations were computed from
+    recommendations_key = Column(String, nullable=True)
+    
+    # Counts of the user's rows, kept in step by the handlers that change them
+    # (app/services/profile_counters.py; verify_counters.py checks and repairs them)
+    shortlisted_count = Column(Integer, nullable=False, default=0, server_default="0")
+    locked_count = Column(Integer, nullable=False, default=0, server_default="0")
+    dream_count = Column(Integer, nullable=False, default=0, server_default="0")
+    target_count = Column(Integer, nullable=False, default=0, server_default="0")
+    safe_count = Column(Integer, nullable=False, default=0, server_default="0")
+    open_todos_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_documents_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -136,6 +149,14 @@ class ShortlistedUniversity(Base):
 
 class TodoItem(Base):
     __tablename__ = "todo_items"
+    __table_args__ = (
+        # Keyset pages of open todos, newest first or by due date (app/services/todo_list.py)
+        Index("ix_todo_items_user_created", "user_id", "is_completed", "created_at", "id"),
+        Index("ix_todo_items_user_due", "user_id", "is_completed", "due_date", "id"),
+        # Upcoming deadlines across all users, and recently changed rows, for the reminder scheduler
+        Index("ix_todo_items_open_due", "is_completed", "due_date", "id"),
+        Index("ix_todo_items_updated", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -151,6 +172,7 @@ class TodoItem(Base):
     ai_generated = Column(Boolean, default=False)
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
     
     # Relationship
@@ -170,6 +192,11 @@ class DocumentType(enum.Enum):
 
 class UniversityDocument(Base):
     __tablename__ = "university_documents"
+    __table_args__ = (
+        # Upcoming deadlines across all users, and recently changed rows, for the reminder scheduler
+        Index("ix_university_documents_due_date", "due_date", "id"),
+        Index("ix_university_documents_updated", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -193,6 +220,10 @@ class UniversityDocument(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Cursor pagination: WHERE user_id = ? AND id < ? ORDER BY id DESC
+        Index("ix_chat_messages_user_id_id", "user_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -208,3 +239,92 @@ class ChatMessage(Base):
     
     # Relationship
     user = relationship("User", back_populates="chat_messages")
+
+class ChatArchive(Base):
+    """Older chat messages of one user for one month, stored as a zlib-compressed JSON list"""
+    __tablename__ = "chat_archives"
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", name="uq_chat_archives_user_id_month"),
+        Index("ix_chat_archives_user_id_last_message_id", "user_id", "last_message_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    month = Column(String(7), nullable=False)  # YYYY-MM
+    
+    first_message_id = Column(Integer, nullable=False)
+    last_message_id = Column(Integer, nullable=False)
+    message_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CounselorContextSnapshot(Base):
+    """Prebuilt counselor prompt context, one row per user; each section is rebuilt when its data version moves"""
+    __tablename__ = "counselor_context_snapshots"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    
+    profile_section = Column(Text, nullable=False, default="")
+    shortlist_section = Column(Text, nullable=False, default="")
+    todos_section = Column(Text, nullable=False, default="")
+    
+    # Time spent on the last rebuild
+    build_ms = Column(Float, nullable=True)
+    # The data_versions counters (user:<id>:<kind>) each section was built from
+    profile_version = Column(Integer, nullable=False, default=0, server_default="0")
+    shortlist_version = Column(Integer, nullable=False, default=0, server_default="0")
+    todos_version = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class UserRecommendation(Base):
+    """Materialized, scored recommendation list; one row per (user, university)"""
+    __tablename__ = "user_recommendations"
+    __table_args__ = (
+        # Serves ORDER BY score DESC, university_id for one user
+        Index("ix_user_recommendations_user_id_score", "user_id", "score", "university_id"),
+    )
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    university_id = Column(Integer, ForeignKey("universities.id"), primary_key=True)
+    
+    score = Column(Float, nullable=False)
+    category = Column(Enum(UniversityCategory), nullable=False)
+    acceptance_chance = Column(String(8), nullable=False)
+    
+    university = relationship("University")
+
+class DataVersion(Base):
+    """Change counter per cache scope ("user:<id>", "chat:<id>", "catalog"), used for ETags"""
+    __tablename__ = "data_versions"
+    
+    scope = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class OutboxEvent(Base):
+    """An event for background processing, written in the transaction that produced it"""
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Same event emitted twice (e.g. after a restart) is stored once
+        UniqueConstraint("dedupe_key", name="uq_outbox_events_dedupe_key"),
+        # Unprocessed events in order: WHERE processed_at IS NULL ORDER BY id
+        Index("ix_outbox_events_processed_at_id", "processed_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    topic = Column(String(64), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    dedupe_key = Column(String(255), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    
+    # Retries: failed attempts so far, when the next one may run (NULL: now), and why the last one failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
@@ -0,0 +1,44 @@
+"""
+Read-only reference data shared by every request: the compact university
+catalog, the counselor answer templates and the country/tuition tables.
+
+With gunicorn's preload_app (gunicorn.conf.py) preload_reference_data() runs
+once in the master before the workers fork, so the workers share the pages
+copy-on-write instead of each building a private copy. Without preloading,
+each worker loads it in the lifespan hook (load_reference_data()).
+"""
+import gc
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def load_reference_data():
+    """Import the template/table modules and load the catalog; cheap when already done"""
+    import app.services.counselor_responses  # noqa: F401  compiled answer templates
+    import app.services.university_service  # noqa: F401  country and tuition tables
+    from app.database import SessionLocal
+    from app.services.catalog import get_catalog
+
+    db = SessionLocal()
+    try:
+        get_catalog(db)
+    finally:
+        db.close()
+
+
+def preload_reference_data():
+    """Build the reference data in the master process, right before fork"""
+    from app.database import dispose_engine
+
+    try:
+        load_reference_data()
+    except Exception as e:
+        # Not fatal: each worker loads what is missing in its lifespan hook
+        logger.warning(f"Preloading reference data failed, workers will load their own: {str(e)}")
+    # Pooled connections must not be shared with the forked workers
+    dispose_engine()
+    # Move everything built so far out of the collector's reach: a GC pass in a
+    # worker would otherwise write to (and so copy) every shared object's header
+    gc.freeze()
+    logger.info(f"Reference data preloaded; {gc.get_freeze_count()} objects frozen before fork")
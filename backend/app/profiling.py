@@ -0,0 +1,129 @@
+"""
+Sampling profiler for a live worker.
+
+A background thread snapshots the Python stack of every other thread with
+sys._current_frames() at a fixed interval and counts identical stacks. The
+result is rendered in the collapsed-stack format ("root;caller;callee 42" per
+line) read by flamegraph.pl, speedscope and most flamegraph viewers.
+
+Nothing runs unless a profile is requested: there are no hooks or tracing
+while the profiler is off.
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+# Leaf frames of threads that are waiting for work; dropped unless include_idle
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+}
+
+MAX_STORED_PROFILES = 20
+
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._labels: Dict[object, str] = {}
+        # Threads that only wait for the profile to finish
+        self.excluded_threads = set()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            label = self._labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        return label
+
+    def _is_idle(self, frame) -> bool:
+        return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+    def _run(self):
+        excluded = self.excluded_threads | {threading.get_ident()}
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in excluded or (not self.include_idle and self._is_idle(frame)):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+def profile_for(seconds: float, interval: float = 0.005, include_idle: bool = False) -> StackSampler:
+    """Sample this process for the given time; blocks the calling thread"""
+    sampler = StackSampler(interval, include_idle)
+    sampler.excluded_threads.add(threading.get_ident())
+    sampler.start()
+    time.sleep(seconds)
+    return sampler.stop()
+
+
+class ProfileStore:
+    """The most recent per-request profiles, by id"""
+
+    def __init__(self, max_entries: int = MAX_STORED_PROFILES):
+        self.max_entries = max_entries
+        self._profiles: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, method: str, path: str, sampler: StackSampler, profile_id: Optional[str] = None) -> str:
+        profile_id = profile_id or uuid.uuid4().hex[:12]
+        with self._lock:
+            self._profiles[profile_id] = {
+                "id": profile_id,
+                "method": method,
+                "path": path,
+                "duration_ms": round(sampler.duration * 1000, 2),
+                "samples": sampler.samples,
+                "collapsed": sampler.collapsed(),
+            }
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list:
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != "collapsed"} for p in reversed(self._profiles.values())]
+
+
+request_profiles = ProfileStore()
@@ -0,0 +1,64 @@
+"""
+Read-only endpoints on the read replica (DATABASE_REPLICA_URL).
+
+Endpoints that only read declare
+
+    db: Session = Depends(get_read_db)
+
+instead of get_db. Without a replica both are the same session. With one,
+the session reads from the replica; a write sent through it anyway goes to
+the primary, and the session then reads from the primary until it is closed.
+
+Replicas lag behind the primary, so for REPLICA_STICKY_SECONDS after a user's
+last write (the updated_at of their data_versions rows, read from the primary)
+their reads stay on the primary and they always see their own changes. The
+ETag dependency (app/etags.py) reads its versions through get_read_db too, so
+a tag never claims data newer than the body it is sent with.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.auth_utils import get_token_user_id
+from app.config import get_settings
+from app.database import ReadSessionLocal, get_db, get_replica_engine
+from app.metrics import DB_READ_ROUTING
+from app.models import DataVersion
+from app.services.data_versions import chat_scope, user_scope
+
+
+def request_user_id(request: Request) -> Optional[int]:
+    """User id from the bearer token, without a database lookup"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return get_token_user_id(token) if scheme.lower() == "bearer" else None
+
+
+def wrote_recently(db: Session, user_id: int, seconds: float) -> bool:
+    """Whether any of the user's data changed on the primary in the last `seconds`"""
+    last_write = db.query(func.max(DataVersion.updated_at)).filter(
+        DataVersion.scope.in_([user_scope(user_id), chat_scope(user_id)])
+    ).scalar()
+    return last_write is not None and last_write > datetime.utcnow() - timedelta(seconds=seconds)
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    if get_replica_engine() is None:
+        yield db
+        return
+
+    user_id = request_user_id(request)
+    sticky_seconds = get_settings().replica_sticky_seconds
+    if user_id is not None and sticky_seconds > 0 and wrote_recently(db, user_id, sticky_seconds):
+        DB_READ_ROUTING.inc(target="primary")
+        yield db
+        return
+
+    DB_READ_ROUTING.inc(target="replica")
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
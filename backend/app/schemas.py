@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -29,7 +29,7 @@ class FundingTypeEnum(str, Enum):
 class UniversityCategoryEnum(str, Enum):
     DREAM = "DREAM"
     TARGET = "TARGET"
-    SAFE = "safe"
+    SAFE = "SAFE"
 
 # User Schemas
 class UserCreate(BaseModel):
@@ -173,10 +173,20 @@ class UniversityResponse(UniversityBase):
     class Config:
         from_attributes = True
 
+class RecommendationResponse(BaseModel):
+    university_id: int
+    score: float
+    category: UniversityCategoryEnum
+    acceptance_chance: str
+    university: UniversityResponse
+
 class ShortlistedUniversityCreate(BaseModel):
     university_id: int
     category: UniversityCategoryEnum
 
+class UniversityIdsRequest(BaseModel):
+    university_ids: List[int] = Field(..., min_length=1, max_length=100)
+
 class ShortlistedUniversityResponse(BaseModel):
     id: int
     university_id: int
@@ -221,6 +231,40 @@ class TodoResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TodoFilter(BaseModel):
+    is_completed: Optional[bool] = None
+    category: Optional[str] = None
+    priority: Optional[str] = None
+    ai_generated: Optional[bool] = None
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+
+class TodoBulkSelection(BaseModel):
+    # Todos matching both the ids (when given) and the filter (when given)
+    ids: Optional[List[int]] = Field(None, max_length=1000)
+    filter: Optional[TodoFilter] = None
+
+class TodoBulkUpdate(TodoBulkSelection):
+    is_completed: Optional[bool] = None
+    priority: Optional[str] = None
+    category: Optional[str] = None
+
+class TodoBulkUpdateResponse(BaseModel):
+    updated: int
+    todos: List[TodoResponse]
+
+class TodoBulkDeleteResponse(BaseModel):
+    deleted: int
+    ids: List[int]
+
+class TodoSummaryResponse(BaseModel):
+    open: int
+    overdue: int
+    due_this_week: int  # due within the next 7 days, not yet overdue
+    no_due_date: int
+    next_due_date: Optional[datetime]
+    as_of: datetime
+
 # Chat Schemas
 class ChatMessageCreate(BaseModel):
     message: str
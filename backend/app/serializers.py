@@ -0,0 +1,157 @@
+"""
+Fast response serializers for ORM rows.
+
+The response_model schemas validate every field of data that came straight out
+of our own tables, and UniversityResponse re-parses three JSON text columns per
+university on every request. The hot read endpoints build plain dicts here
+instead and return them as ORJSONResponse, which FastAPI sends without running
+response_model validation. The output matches the corresponding schema in
+app/schemas.py field for field; keep the two in sync when a schema changes.
+"""
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+import orjson
+
+from app.models import (
+    User, UserProfile, University, ShortlistedUniversity, TodoItem, UniversityDocument
+)
+
+
+@lru_cache(maxsize=8192)
+def _parse_json_text(raw: str):
+    # University JSON columns repeat across requests; callers must not mutate the result
+    return orjson.loads(raw)
+
+
+def _json_column(raw, default):
+    if raw is None or raw == "":
+        return default
+    if not isinstance(raw, str):
+        return raw
+    return _parse_json_text(raw)
+
+
+def _enum_value(value):
+    return value.value if value is not None else None
+
+
+def serialize_user(user: User) -> dict:
+    return {
+        "id": user.id,
+        "full_name": user.full_name,
+        "email": user.email,
+        "created_at": user.created_at,
+    }
+
+
+def serialize_profile(profile: UserProfile) -> dict:
+    try:
+        countries = _json_column(profile.preferred_countries, [])
+    except orjson.JSONDecodeError:
+        countries = []
+    return {
+        "id": profile.id,
+        "onboarding_completed": profile.onboarding_completed,
+        "current_stage": _enum_value(profile.current_stage),
+        "current_education_level": profile.current_education_level,
+        "degree_major": profile.degree_major,
+        "graduation_year": profile.graduation_year,
+        "gpa_percentage": profile.gpa_percentage,
+        "intended_degree": profile.intended_degree,
+        "field_of_study": profile.field_of_study,
+        "target_intake_year": profile.target_intake_year,
+        "preferred_countries": countries or [],
+        "budget_min": profile.budget_min,
+        "budget_max": profile.budget_max,
+        "funding_plan": _enum_value(profile.funding_plan),
+        "ielts_toefl_status": _enum_value(profile.ielts_toefl_status),
+        "ielts_toefl_score": profile.ielts_toefl_score,
+        "gre_gmat_status": _enum_value(profile.gre_gmat_status),
+        "gre_gmat_score": profile.gre_gmat_score,
+        "sop_status": _enum_value(profile.sop_status),
+        "academic_strength": _enum_value(profile.academic_strength),
+        "exam_strength": _enum_value(profile.exam_strength),
+        "overall_strength": _enum_value(profile.overall_strength),
+    }
+
+
+def serialize_university(university: University) -> dict:
+    return {
+        "name": university.name,
+        "country": university.country,
+        "city": university.city,
+        "ranking": university.ranking,
+        "acceptance_rate": university.acceptance_rate,
+        "tuition_fee_min": university.tuition_fee_min,
+        "tuition_fee_max": university.tuition_fee_max,
+        "fields_offered": _json_column(university.fields_offered, None),
+        "programs": _json_column(university.programs, None),
+        "requirements": _json_column(university.requirements, None),
+        "description": university.description,
+        "website_url": university.website_url,
+        "id": university.id,
+    }
+
+
+def serialize_universities(universities: Iterable[University]) -> List[dict]:
+    return [serialize_university(university) for university in universities]
+
+
+def serialize_shortlisted(shortlisted: ShortlistedUniversity, university: Optional[University] = None) -> dict:
+    """Pass university when it was loaded alongside, to avoid the lazy relationship load"""
+    return {
+        "id": shortlisted.id,
+        "university_id": shortlisted.university_id,
+        "category": _enum_value(shortlisted.category),
+        "is_locked": bool(shortlisted.is_locked),
+        "fit_reason": shortlisted.fit_reason,
+        "risk_factors": shortlisted.risk_factors,
+        "acceptance_chance": shortlisted.acceptance_chance,
+        "cost_level": shortlisted.cost_level,
+        "created_at": shortlisted.created_at,
+        "locked_at": shortlisted.locked_at,
+        "university": serialize_university(university or shortlisted.university),
+    }
+
+
+def serialize_todo(todo: TodoItem) -> dict:
+    return {
+        "id": todo.id,
+        "title": todo.title,
+        "description": todo.description,
+        "priority": todo.priority,
+        "category": todo.category,
+        "is_completed": bool(todo.is_completed),
+        "due_date": todo.due_date,
+        "ai_generated": bool(todo.ai_generated),
+        "created_at": todo.created_at,
+    }
+
+
+def serialize_document(document: UniversityDocument) -> dict:
+    return {
+        "id": document.id,
+        "user_id": document.user_id,
+        "shortlisted_university_id": document.shortlisted_university_id,
+        "document_type": _enum_value(document.document_type),
+        "status": _enum_value(document.status),
+        "due_date": document.due_date,
+        "file_url": document.file_url,
+        "recipient_name": document.recipient_name,
+        "submission_notes": document.submission_notes,
+        "created_at": document.created_at,
+        "updated_at": document.updated_at,
+    }
+
+
+def serialize_history_message(message: dict) -> dict:
+    """History pages are already plain dicts (see chat_archive.message_to_dict)"""
+    return {
+        "id": message["id"],
+        "role": message["role"],
+        "message": message["message"],
+        "action_type": message.get("action_type"),
+        "action_metadata": message.get("action_metadata"),
+        "created_at": message["created_at"],
+    }
@@ -0,0 +1,145 @@
+"""
+Read-only, in-memory copy of the columns of the university catalog that
+recommendation scoring reads.
+
+The catalog is held column by column in typed arrays (one machine value per
+university) with repeated strings (countries, fields-offered lists) stored
+once, interned, and referenced by index. Unlike a list of ORM objects or
+dicts, reading it does not touch per-university Python objects, so it does
+not write reference counts into their memory. When it is built in the
+gunicorn master before fork (gunicorn.conf.py), the workers share its pages
+copy-on-write.
+
+The copy is tagged with the catalog data version. get_catalog() compares
+that tag with the current version (one primary key read) and rebuilds the
+copy after an import.
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from array import array
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import University
+from app.services.data_versions import CATALOG, get_versions
+
+logger = logging.getLogger(__name__)
+
+NAN = float("nan")
+
+
+class CompactCatalog:
+    __slots__ = (
+        "version", "ids", "countries", "country", "fields_texts", "fields", "ranking", "acceptance_rate",
+        "tuition_fee_min", "tuition_fee_max", "required_gpa", "required_gre", "build_ms",
+    )
+
+    def __init__(self, rows: Iterable[tuple], version: int):
+        self.version = version
+        self.ids = array("i")
+        self.country = array("H")
+        self.fields = array("I")
+        self.ranking = array("i")  # 0: unranked
+        self.acceptance_rate = array("d")
+        self.tuition_fee_min = array("d")
+        self.tuition_fee_max = array("d")
+        self.required_gpa = array("d")
+        self.required_gre = array("d")
+
+        countries, fields_texts = {}, {}
+        for university_id, country, ranking, rate, fee_min, fee_max, fields_offered, requirements in rows:
+            requirements = json.loads(requirements) if requirements else {}
+            fields_text = (fields_offered or "").lower()
+            self.ids.append(university_id)
+            self.country.append(countries.setdefault(country, len(countries)))
+            self.fields.append(fields_texts.setdefault(fields_text, len(fields_texts)))
+            self.ranking.append(ranking or 0)
+            # Same defaults as score_universities
+            self.acceptance_rate.append(rate if rate is not None else 30.0)
+            # NaN fails every comparison, like NULL in the SQL candidate filter
+            self.tuition_fee_min.append(fee_min if fee_min is not None else NAN)
+            self.tuition_fee_max.append(fee_max if fee_max is not None else NAN)
+            self.required_gpa.append(requirements.get("gpa", 3.0))
+            self.required_gre.append(requirements.get("gre", 300))
+        self.countries = tuple(sys.intern(country) for country in countries)
+        self.fields_texts = tuple(sys.intern(text) for text in fields_texts)
+        self.build_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nbytes(self) -> int:
+        """Approximate size of the column arrays"""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.ids, self.country, self.fields, self.ranking, self.acceptance_rate,
+                           self.tuition_fee_min, self.tuition_fee_max, self.required_gpa, self.required_gre)
+        )
+
+    def candidates(self, countries: Sequence[str], budget_limit: Optional[float]) -> List[int]:
+        """Row indexes passing the recommendation filters (is_candidate)"""
+        countries = set(countries)
+        wanted = {index for index, country in enumerate(self.countries) if country in countries}
+        if countries and not wanted:
+            return []
+        fee_min = self.tuition_fee_min
+        return [
+            i for i, country in enumerate(self.country)
+            if (not countries or country in wanted) and (budget_limit is None or fee_min[i] <= budget_limit)
+        ]
+
+    def fields_containing(self, field: str) -> set:
+        """Indexes of the fields-offered texts that contain field (lowercase)"""
+        if not field:
+            return set()
+        return {index for index, text in enumerate(self.fields_texts) if field in text}
+
+    @staticmethod
+    def take(column: array, indexes: List[int]) -> list:
+        return [column[i] for i in indexes]
+
+
+def load_catalog(db: Session, version: Optional[int] = None) -> CompactCatalog:
+    started = time.perf_counter()
+    if version is None:
+        version = get_versions(db, [CATALOG])[CATALOG]
+    rows = db.query(
+        University.id, University.country, University.ranking, University.acceptance_rate,
+        University.tuition_fee_min, University.tuition_fee_max, University.fields_offered, University.requirements
+    ).order_by(University.id).yield_per(5000)
+    catalog = CompactCatalog(rows, version)
+    catalog.build_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Loaded compact catalog v{version}: {len(catalog)} universities, "
+                f"{catalog.nbytes() / 1024:.0f} KiB in {catalog.build_ms:.0f} ms")
+    return catalog
+
+
+_catalog: Optional[CompactCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog(db: Session) -> Optional[CompactCatalog]:
+    """The current in-memory catalog, (re)loaded when the catalog version moved; None when disabled"""
+    global _catalog
+    if not get_settings().catalog_cache:
+        return None
+    version = get_versions(db, [CATALOG])[CATALOG]
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _catalog_lock:
+            if _catalog is None or _catalog.version != version:
+                _catalog = load_catalog(db, version)
+            catalog = _catalog
+    return catalog
+
+
+def catalog_stats() -> dict:
+    catalog = _catalog
+    if catalog is None:
+        return {"loaded": False, "universities": 0, "bytes": 0, "version": 0}
+    return {"loaded": True, "universities": len(catalog), "bytes": catalog.nbytes(), "version": catalog.version}
@@ -0,0 +1,116 @@
+"""
+Chat history storage tiers.
+
+Recent messages live in chat_messages. The archival job moves older messages
+into chat_archives, one zlib-compressed JSON blob per user per month, and
+get_history_page reads through to those blobs when a user scrolls back past
+the hot table.
+"""
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.models import ChatMessage, ChatArchive
+
+COMPRESSION_LEVEL = 6
+
+
+def message_to_dict(message: ChatMessage) -> dict:
+    return {
+        "id": message.id,
+        "role": message.role,
+        "message": message.message,
+        "action_type": message.action_type,
+        "action_metadata": message.action_metadata,
+        "created_at": message.created_at.isoformat() if message.created_at else None
+    }
+
+
+def compress_messages(messages: List[dict]) -> bytes:
+    return zlib.compress(json.dumps(messages, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_messages(payload: bytes) -> List[dict]:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def get_history_page(db: Session, user_id: int, limit: int = 50, before_id: Optional[int] = None) -> List[dict]:
+    """Newest-first page of messages older than before_id, hot table first, then archives"""
+    query = db.query(ChatMessage).filter(ChatMessage.user_id == user_id)
+    if before_id is not None:
+        query = query.filter(ChatMessage.id < before_id)
+    page = [message_to_dict(m) for m in query.order_by(ChatMessage.id.desc()).limit(limit).all()]
+
+    if len(page) >= limit:
+        return page
+
+    # Read through to the archive tier for whatever is still missing
+    cursor = page[-1]["id"] if page else before_id
+    archives = db.query(ChatArchive).filter(ChatArchive.user_id == user_id)
+    if cursor is not None:
+        archives = archives.filter(ChatArchive.first_message_id < cursor)
+
+    for archive in archives.order_by(ChatArchive.last_message_id.desc()).yield_per(4):
+        older = [m for m in decompress_messages(archive.payload) if cursor is None or m["id"] < cursor]
+        older.sort(key=lambda m: m["id"], reverse=True)
+        page.extend(older[:limit - len(page)])
+        if len(page) >= limit:
+            break
+
+    return page
+
+
+def archive_old_messages(db: Session, older_than_days: int, batch_size: int = 5000) -> int:
+    """Move messages older than the cutoff into monthly archives; returns how many moved"""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = 0
+    # Keyset paging over ix_chat_messages_user_id_id: each batch resumes where the last one
+    # stopped, so a run walks that index once instead of sorting every old message per batch
+    last_key = (0, 0)
+
+    while True:
+        batch = db.query(ChatMessage).filter(
+            tuple_(ChatMessage.user_id, ChatMessage.id) > tuple_(*last_key),
+            ChatMessage.created_at < cutoff
+        ).order_by(ChatMessage.user_id, ChatMessage.id).limit(batch_size).all()
+
+        if not batch:
+            break
+        last_key = (batch[-1].user_id, batch[-1].id)
+
+        groups = defaultdict(list)
+        for message in batch:
+            groups[(message.user_id, message.created_at.strftime("%Y-%m"))].append(message_to_dict(message))
+
+        for (user_id, month), messages in groups.items():
+            archive = db.query(ChatArchive).filter(
+                ChatArchive.user_id == user_id,
+                ChatArchive.month == month
+            ).with_for_update().first()
+
+            if archive:
+                existing = decompress_messages(archive.payload)
+                seen = {m["id"] for m in existing}
+                messages = existing + [m for m in messages if m["id"] not in seen]
+            else:
+                archive = ChatArchive(user_id=user_id, month=month)
+                db.add(archive)
+
+            messages.sort(key=lambda m: m["id"])
+            archive.payload = compress_messages(messages)
+            archive.first_message_id = messages[0]["id"]
+            archive.last_message_id = messages[-1]["id"]
+            archive.message_count = len(messages)
+
+        db.query(ChatMessage).filter(
+            ChatMessage.id.in_([m.id for m in batch])
+        ).delete(synchronize_session=False)
+        db.commit()
+        moved += len(batch)
+
+    return moved
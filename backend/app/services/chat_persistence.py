@@ -0,0 +1,221 @@
+"""
+Persistence for counselor chat turns.
+
+A turn (user message + assistant reply) is written with a single multi-row
+INSERT ... RETURNING inside one transaction, so there is no refresh round trip
+and only one commit per turn.
+
+Optionally, writes can be handed to ChatWriteBehindQueue, which batches turns
+from all users into one transaction per flush. A single FIFO queue drained by a
+single flusher thread keeps every user's messages in submission order. If a
+batch fails, its turns are retried one transaction each, so only the turns
+that fail on their own are dropped (and logged).
+"""
+import atexit
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import ChatMessage
+from app.services.data_versions import bump_versions, chat_scope
+
+logger = logging.getLogger(__name__)
+
+
+def build_chat_rows(user_id: int, messages: List[dict]) -> List[dict]:
+    """Fill in user_id and created_at for each {role, message, ...} dict"""
+    rows = []
+    for message in messages:
+        rows.append({
+            "user_id": user_id,
+            "role": message["role"],
+            "message": message["message"],
+            "action_type": message.get("action_type"),
+            "action_metadata": message.get("action_metadata"),
+            "created_at": message.get("created_at") or datetime.utcnow(),
+        })
+    return rows
+
+
+def insert_chat_rows(db: Session, rows: List[dict]) -> List[dict]:
+    """Insert rows in one statement and return them with their new ids"""
+    if not rows:
+        return []
+    result = db.execute(
+        insert(ChatMessage).returning(ChatMessage.id, sort_by_parameter_order=True),
+        rows
+    )
+    ids = result.scalars().all()
+    bump_versions(db, *(chat_scope(row["user_id"]) for row in rows))
+    return [dict(row, id=row_id) for row, row_id in zip(rows, ids)]
+
+
+def save_chat_turn(db: Session, user_id: int, messages: List[dict]) -> List[dict]:
+    """Persist all messages of a turn in a single transaction"""
+    rows = build_chat_rows(user_id, messages)
+    try:
+        saved = insert_chat_rows(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return saved
+
+
+def to_conversation_entry(row: dict) -> dict:
+    return {
+        "id": row.get("id"),
+        "role": row["role"],
+        "message": row["message"],
+        "created_at": row["created_at"]
+    }
+
+
+class ChatWriteBehindQueue:
+    """Batches chat rows across users and flushes them from a background thread"""
+
+    def __init__(self, session_factory, batch_size: int = 200, flush_interval: float = 0.05):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[List[dict]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failed_rows = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="chat-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def submit(self, user_id: int, messages: List[dict]) -> List[dict]:
+        """Queue a turn; returned rows have no id until the batch is flushed"""
+        rows = build_chat_rows(user_id, messages)
+        if self._stopped.is_set() or not self._thread:
+            # Not running (e.g. during shutdown): fall back to a direct write
+            db = self.session_factory()
+            try:
+                return save_chat_turn(db, user_id, messages)
+            finally:
+                db.close()
+        self._queue.put(rows)
+        return [dict(row, id=None) for row in rows]
+
+    def stop(self, timeout: float = 10.0):
+        """Flush everything queued so far, then stop the flusher thread"""
+        if not self._thread or self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Chat write-behind flusher did not finish within %.1fs", timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        running = True
+        while running:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            turns, row_count = [], 0
+            if first is None:
+                running = False
+            else:
+                turns.append(first)
+                row_count += len(first)
+            # Drain whatever else is queued, up to the batch size
+            while running and row_count < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                turns.append(item)
+                row_count += len(item)
+            if not running:
+                # Shutdown: take everything that is left
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item:
+                        turns.append(item)
+            if turns:
+                self._flush(turns)
+
+    def _flush(self, turns: List[List[dict]]):
+        rows = [row for turn in turns for row in turn]
+        db = self.session_factory()
+        try:
+            insert_chat_rows(db, rows)
+            db.commit()
+            self.flushed_rows += len(rows)
+            self.flushes += 1
+            return
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Chat write-behind flush of {len(rows)} rows failed, retrying turn by turn: {str(e)}")
+        finally:
+            db.close()
+
+        # One bad row must not take the other users' turns down with it
+        for turn in turns:
+            db = self.session_factory()
+            try:
+                insert_chat_rows(db, turn)
+                db.commit()
+                self.flushed_rows += len(turn)
+            except Exception as e:
+                db.rollback()
+                self.failed_rows += len(turn)
+                logger.error(
+                    f"Dropped chat turn of user {turn[0]['user_id']} "
+                    f"({len(turn)} rows, first created_at {turn[0]['created_at']}): {str(e)}",
+                    exc_info=True
+                )
+            finally:
+                db.close()
+        self.flushes += 1
+
+
+_write_behind: Optional[ChatWriteBehindQueue] = None
+
+
+def get_write_behind_queue() -> Optional[ChatWriteBehindQueue]:
+    """The shared queue when CHAT_WRITE_BEHIND is enabled, else None"""
+    global _write_behind
+    from app.config import get_settings
+    settings = get_settings()
+    if not settings.chat_write_behind:
+        return None
+    if _write_behind is None:
+        from app.database import SessionLocal
+        _write_behind = ChatWriteBehindQueue(
+            SessionLocal,
+            batch_size=settings.chat_write_behind_batch_size,
+            flush_interval=settings.chat_write_behind_interval_ms / 1000
+        )
+        _write_behind.start()
+    return _write_behind
+
+
+def shutdown_write_behind():
+    if _write_behind is not None:
+        _write_behind.stop()
@@ -0,0 +1,205 @@
+"""
+Materialized per-user counselor context.
+
+The prompt context used to be rebuilt on every chat message (profile, every
+shortlisted university with a lazy university load, pending todos). It is now
+stored in counselor_context_snapshots, each section next to the data version
+(the user:<id>:<kind> counter in data_versions) it was built from. Writes only
+bump those counters, in the same statement as the ETag counter; the next read
+rebuilds just the sections whose counter moved, in its own session, so chat
+time is usually two indexed reads and profile, shortlist and todo writes pay
+nothing extra. A todo update no longer re-renders the profile or shortlist.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import User, UserProfile, ShortlistedUniversity, University, TodoItem, CounselorContextSnapshot
+from app.services.data_versions import get_versions, section_scope
+from app.services.user_events import PROFILE, SHORTLIST, TODOS
+
+NOT_ONBOARDED = "User has not completed onboarding yet."
+
+# Change kind -> (section column, version column)
+SECTIONS = {
+    PROFILE: ("profile_section", "profile_version"),
+    SHORTLIST: ("shortlist_section", "shortlist_version"),
+    TODOS: ("todos_section", "todos_version"),
+}
+
+_stats_lock = threading.Lock()
+_stats = {
+    "reads": 0,
+    "read_ms_total": 0.0,
+    "builds": 0,
+    "sections_built": 0,
+    "build_ms_total": 0.0,
+}
+
+
+def build_profile_section(user: User, profile: UserProfile) -> str:
+    if not profile or not profile.onboarding_completed:
+        return NOT_ONBOARDED
+    
+    return f"""
+User Profile:
+- Name: {user.full_name}
+- Current Education: {profile.current_education_level} in {profile.degree_major}
+- Graduation Year: {profile.graduation_year}
+- GPA: {profile.gpa_percentage if profile.gpa_percentage else 'Not provided'}
+- Intended Degree: {profile.intended_degree} in {profile.field_of_study}
+- Target Intake: {profile.target_intake_year}
+- Preferred Countries: {profile.preferred_countries}
+- Budget: ${profile.budget_min} - ${profile.budget_max} per year
+- Funding Plan: {profile.funding_plan.value if profile.funding_plan else 'Not specified'}
+
+Exam Status:
+- IELTS/TOEFL: {profile.ielts_toefl_status.value} (Score: {profile.ielts_toefl_score if profile.ielts_toefl_score else 'N/A'})
+- GRE/GMAT: {profile.gre_gmat_status.value} (Score: {profile.gre_gmat_score if profile.gre_gmat_score else 'N/A'})
+- SOP: {profile.sop_status.value}
+
+Profile Strength:
+- Academic: {profile.academic_strength.value if profile.academic_strength else 'N/A'}
+- Exams: {profile.exam_strength.value if profile.exam_strength else 'N/A'}
+- Overall: {profile.overall_strength.value if profile.overall_strength else 'N/A'}
+
+Current Stage: {profile.current_stage.value}
+"""
+
+
+def build_shortlist_section(db: Session, user_id: int) -> str:
+    # One joined query instead of a lazy university load per row
+    rows = db.query(
+        University.name, ShortlistedUniversity.category, ShortlistedUniversity.is_locked
+    ).join(
+        University, University.id == ShortlistedUniversity.university_id
+    ).filter(
+        ShortlistedUniversity.user_id == user_id
+    ).order_by(ShortlistedUniversity.id).all()
+    
+    if not rows:
+        return ""
+    
+    section = "\n\nShortlisted Universities:\n"
+    for name, category, is_locked in rows:
+        locked = " (LOCKED)" if is_locked else ""
+        section += f"- {name} ({category.value if category else 'N/A'}){locked}\n"
+    return section
+
+
+def build_todos_section(db: Session, user_id: int) -> str:
+    todos = db.query(TodoItem.title, TodoItem.priority).filter(
+        TodoItem.user_id == user_id,
+        TodoItem.is_completed == False
+    ).limit(5).all()
+    
+    if not todos:
+        return ""
+    
+    section = "\n\nPending Tasks:\n"
+    for title, priority in todos:
+        section += f"- {title} ({priority} priority)\n"
+    return section
+
+
+def assemble_context(profile_section: str, shortlist_section: str, todos_section: str) -> str:
+    if profile_section == NOT_ONBOARDED:
+        return NOT_ONBOARDED
+    return profile_section + shortlist_section + todos_section
+
+
+def build_section(db: Session, user_id: int, kind: str) -> str:
+    if kind == PROFILE:
+        user = db.get(User, user_id)
+        profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        return build_profile_section(user, profile)
+    if kind == SHORTLIST:
+        return build_shortlist_section(db, user_id)
+    return build_todos_section(db, user_id)
+
+
+def refresh_context_snapshot(db: Session, user_id: int, versions: Dict[str, int], kinds: List[str]) -> Dict[str, str]:
+    """Rebuild the given sections of the user's snapshot and store them (within db's transaction).
+    
+    versions ({kind: counter}) must be read before the sections are built: a write
+    that lands in between then leaves the stored version behind, and the next read
+    rebuilds that section again.
+    """
+    start = time.perf_counter()
+    sections, values = {}, {}
+    for kind in kinds:
+        section, version = SECTIONS[kind]
+        sections[section] = build_section(db, user_id, kind)
+        values[version] = versions[kind]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    # Concurrent readers may rebuild the same sections; the upsert lets either win
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(CounselorContextSnapshot).values(
+        user_id=user_id, build_ms=elapsed_ms, updated_at=datetime.utcnow(), **sections, **values
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[CounselorContextSnapshot.user_id],
+        set_={column: statement.excluded[column] for column in
+              (*sections, *values, "build_ms", "updated_at")}
+    ))
+    with _stats_lock:
+        _stats["builds"] += 1
+        _stats["sections_built"] += len(kinds)
+        _stats["build_ms_total"] += elapsed_ms
+    return sections
+
+
+def get_user_context_snapshot(db: Session, user: User) -> str:
+    """Counselor context for a user; sections whose data changed since they were stored are rebuilt first"""
+    start = time.perf_counter()
+    scopes = {kind: section_scope(user.id, kind) for kind in SECTIONS}
+    counters = get_versions(db, scopes.values())
+    versions = {kind: counters[scope] for kind, scope in scopes.items()}
+    snapshot = db.query(CounselorContextSnapshot).filter(CounselorContextSnapshot.user_id == user.id).first()
+    
+    if snapshot is None:
+        sections, stale = {}, list(SECTIONS)
+    else:
+        sections = {section: getattr(snapshot, section) for section, _ in SECTIONS.values()}
+        stale = [kind for kind, (_, version) in SECTIONS.items() if getattr(snapshot, version) != versions[kind]]
+    
+    if stale:
+        # Written in a session of its own, so the caller's transaction (usually a chat turn) is left alone
+        snapshot_db = SessionLocal()
+        try:
+            sections.update(refresh_context_snapshot(snapshot_db, user.id, versions, stale))
+            snapshot_db.commit()
+        except Exception:
+            snapshot_db.rollback()
+            raise
+        finally:
+            snapshot_db.close()
+        return assemble_context(**sections)
+    
+    with _stats_lock:
+        _stats["reads"] += 1
+        _stats["read_ms_total"] += (time.perf_counter() - start) * 1000
+    return assemble_context(**sections)
+
+
+def snapshot_stats() -> dict:
+    """Average snapshot read time versus a rebuild, and the estimated time saved"""
+    with _stats_lock:
+        stats = dict(_stats)
+    avg_read = stats["read_ms_total"] / stats["reads"] if stats["reads"] else 0.0
+    avg_build = stats["build_ms_total"] / stats["builds"] if stats["builds"] else 0.0
+    return {
+        "reads": stats["reads"],
+        "avg_read_ms": round(avg_read, 3),
+        "builds": stats["builds"],
+        "sections_built": stats["sections_built"],
+        "avg_build_ms": round(avg_build, 3),
+        "estimated_saved_ms": round(max(avg_build - avg_read, 0.0) * stats["reads"], 1),
+    }
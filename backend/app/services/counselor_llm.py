@@ -0,0 +1,147 @@
+"""
+Free-form counselor answers from the Hugging Face hosted LLM.
+
+Questions that match none of the templated topics are answered by the model.
+With the semantic response cache enabled, answers are shared by every user in
+a profile bucket, so the prompt only carries the bucket's own attributes; the
+user's full counselor context (shortlist, tasks, scores) is only sent when
+caching is off and the answer stays private to that user.
+"""
+import logging
+
+import requests
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.metrics import track_upstream
+from app.models import User, UserProfile
+from app.services.context_snapshot import get_user_context_snapshot
+from app.services.response_cache import bucket_fields, get_response_cache, personal_values, profile_bucket
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Canned replies returned by query_huggingface_api when generation fails
+LLM_FALLBACK_RESPONSES = {
+    "I'm unable to process your request at the moment. Please try again later.",
+    "I couldn't generate a response. Please try again.",
+    "The request took too long. Please try again.",
+    "I'm having trouble processing your request. Please try again.",
+    "An unexpected error occurred. Please try again.",
+}
+
+
+def query_huggingface_api(prompt: str) -> str:
+    """Query Hugging Face Mistral API for AI responses"""
+    try:
+        hf_token = settings.huggingface_token
+        if not hf_token:
+            logger.error("Hugging Face token not configured")
+            return "I'm unable to process your request at the moment. Please try again later."
+
+        headers = {"Authorization": f"Bearer {hf_token}"}
+        api_url = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.1"
+
+        payload = {
+            "inputs": prompt,
+            "parameters": {
+                "max_new_tokens": 500,
+                "temperature": 0.7,
+                "top_p": 0.9,
+            }
+        }
+
+        with track_upstream("huggingface", "generate"):
+            response = requests.post(api_url, headers=headers, json=payload, timeout=30)
+            response.raise_for_status()
+
+        result = response.json()
+        if isinstance(result, list) and len(result) > 0:
+            generated_text = result[0].get("generated_text", "")
+            # Remove the prompt from the generated text
+            if generated_text.startswith(prompt):
+                generated_text = generated_text[len(prompt):].strip()
+            return generated_text if generated_text else "I couldn't generate a response. Please try again."
+
+        return "I couldn't generate a response. Please try again."
+
+    except requests.exceptions.Timeout:
+        logger.error("Hugging Face API timeout")
+        return "The request took too long. Please try again."
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Hugging Face API error: {str(e)}")
+        return "I'm having trouble processing your request. Please try again."
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return "An unexpected error occurred. Please try again."
+
+
+def get_system_prompt() -> str:
+    """System prompt for the AI counselor"""
+    return """You are an expert study abroad counselor AI assistant. Your role is to:
+
+1. Guide students through their study abroad journey
+2. Provide personalized university recommendations based on their profile
+3. Explain why specific universities fit their profile
+4. Identify risks and opportunities
+5. Create actionable tasks and to-do items
+6. Answer questions about the application process
+7. Help students understand their profile strengths and weaknesses
+
+When recommending universities:
+- Categorize them as Dream (reach), Target (match), or Safe (safety)
+- Explain WHY each university fits their profile
+- Highlight specific risks (cost, competition, requirements)
+- Be honest about acceptance chances
+
+When suggesting action items:
+- Be specific and actionable
+- Set realistic priorities
+- Consider the student's current stage
+
+Always be:
+- Encouraging but realistic
+- Data-driven in your recommendations
+- Clear about risks and trade-offs
+- Supportive of the student's goals
+
+If asked to shortlist a university or add a task, respond with a structured JSON action in your response.
+"""
+
+
+def get_shared_context(profile: UserProfile) -> str:
+    """Profile context limited to what every user in the same cache bucket shares"""
+    fields = bucket_fields(profile)
+    return f"""
+Student Profile:
+- Intended Degree: {fields['degree'] or 'Not specified'} in {fields['field'] or 'Not specified'}
+- Preferred Countries: {fields['countries'] or 'Not specified'}
+- Budget Band: {fields['budget']}
+- Overall Profile Strength: {fields['strength']}
+"""
+
+
+def generate_llm_response(user: User, profile: UserProfile, db: Session, message: str, intent: str = None) -> str:
+    """Answer a free-form question with the LLM, reusing cached answers to similar questions"""
+    cache = get_response_cache() if settings.counselor_cache_enabled else None
+    bucket = profile_bucket(profile)
+    values = personal_values(user, profile)
+
+    if cache:
+        cached = cache.lookup(intent, bucket, message, values)
+        if cached:
+            return cached
+        # A cached answer is served to the whole bucket, so it must not be built from one user's shortlist or tasks
+        context = get_shared_context(profile)
+    else:
+        context = get_user_context_snapshot(db, user)
+
+    prompt = f"{get_system_prompt()}\n{context}\n\nStudent question: {message}\n\nAnswer:"
+    response_text = query_huggingface_api(prompt)
+
+    # Only successful generations are shared; error fallbacks come back as canned strings
+    if cache and response_text and response_text not in LLM_FALLBACK_RESPONSES:
+        cache.store(intent, bucket, message, response_text, values)
+
+    return response_text
@@ -0,0 +1,69 @@
+"""
+Change counters behind the ETags of the heavy read endpoints.
+
+Every write that can change a cached response bumps the counter of its scope
+in the same transaction: user data (profile, shortlist, todos, documents),
+chat history, or the shared university catalog. User data also has one
+counter per kind, so the counselor context snapshot can tell which of its
+sections went stale. An ETag is built from the
+counters a response depends on, so a conditional request costs one primary
+key lookup instead of rebuilding and hashing the response.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models import DataVersion
+from app.services.user_events import on_user_change, PROFILE, SHORTLIST, TODOS, DOCUMENTS
+
+CATALOG = "catalog"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def section_scope(user_id: int, kind: str) -> str:
+    """Counter of one kind of user data (user_events PROFILE, SHORTLIST, ...)"""
+    return f"user:{user_id}:{kind}"
+
+
+def user_change_scopes(user_id: int, *kinds: str) -> List[str]:
+    """Scopes to bump when a user's data of the given kinds changes"""
+    return [user_scope(user_id)] + [section_scope(user_id, kind) for kind in kinds]
+
+
+def chat_scope(user_id: int) -> str:
+    return f"chat:{user_id}"
+
+
+def bump_versions(db: Session, *scopes: str):
+    """Increment each scope's counter, creating missing rows, within the current transaction"""
+    scopes = sorted(set(scopes))  # fixed order, so concurrent bumps lock rows in the same order
+    if not scopes:
+        return
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(DataVersion).values([
+        {"scope": scope, "version": 1, "updated_at": datetime.utcnow()} for scope in scopes
+    ])
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[DataVersion.scope],
+        set_={"version": DataVersion.version + 1, "updated_at": statement.excluded.updated_at}
+    ))
+
+
+def get_versions(db: Session, scopes: Iterable[str]) -> Dict[str, int]:
+    """Current counter per scope; scopes never bumped are at 0"""
+    scopes = list(scopes)
+    rows = db.query(DataVersion.scope, DataVersion.version).filter(DataVersion.scope.in_(scopes)).all()
+    versions = dict.fromkeys(scopes, 0)
+    versions.update(rows)
+    return versions
+
+
+@on_user_change(PROFILE, SHORTLIST, TODOS, DOCUMENTS)
+def _bump_user_version(db: Session, user_id: int, kinds: set):
+    bump_versions(db, *user_change_scopes(user_id, *kinds))
@@ -0,0 +1,123 @@
+"""
+Push channel from request handlers to open counselor WebSocket connections.
+
+Each connection owns a bounded outgoing queue. Chat replies wait for room in
+the queue (the reader stops consuming client messages meanwhile), while
+notifications never block the publisher: when a queue is full the oldest
+pending notification is dropped, and a connection that keeps overflowing is
+closed as too slow.
+
+The registry is per process, so notifications only reach sockets held by the
+worker that handled the write. They are a hint for the client; the counselor
+session itself revalidates against the user's data version on every turn.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, Set
+
+from sqlalchemy.orm import Session
+
+from app.services.user_events import on_user_change, PROFILE, SHORTLIST, TODOS, DOCUMENTS
+
+logger = logging.getLogger(__name__)
+
+# Drops tolerated before a connection is considered too slow to keep
+MAX_DROPPED_NOTIFICATIONS = 100
+
+
+class Connection:
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        # Outgoing frames; a deque of our own so a queued notification can be dropped from the middle
+        self.queue_size = queue_size
+        self._frames: Deque[dict] = deque()
+        self._has_frames = asyncio.Event()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self.dropped = 0
+        self.too_slow = asyncio.Event()
+
+    def full(self) -> bool:
+        # A size of 0 means unbounded, as for asyncio.Queue
+        return 0 < self.queue_size <= len(self._frames)
+
+    async def send(self, message: dict):
+        """Queue a reply, waiting for room if the client is behind"""
+        while self.full():
+            await self._has_room.wait()
+        self._push(message)
+
+    def notify(self, message: dict):
+        """Queue a notification without blocking; must run on the connection's loop"""
+        if self.full() and not self._drop_oldest_notification():
+            self.dropped += 1
+        else:
+            self._push(message)
+        if self.dropped > MAX_DROPPED_NOTIFICATIONS:
+            self.too_slow.set()
+
+    async def receive(self) -> dict:
+        """Next frame for the client, waiting until one is queued"""
+        while not self._frames:
+            await self._has_frames.wait()
+        frame = self._frames.popleft()
+        if not self._frames:
+            self._has_frames.clear()
+        self._has_room.set()
+        return frame
+
+    def _push(self, message: dict):
+        self._frames.append(message)
+        self._has_frames.set()
+        if self.full():
+            self._has_room.clear()
+
+    def _drop_oldest_notification(self) -> bool:
+        # Replies are never dropped
+        for index, item in enumerate(self._frames):
+            if item.get("type") == "notification":
+                del self._frames[index]
+                self.dropped += 1
+                self._has_room.set()
+                return True
+        return False
+
+
+class ConnectionRegistry:
+    def __init__(self):
+        self._connections: Dict[int, Set[Connection]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def add(self, connection: Connection):
+        with self._lock:
+            self._connections[connection.user_id].add(connection)
+
+    def remove(self, connection: Connection):
+        with self._lock:
+            connections = self._connections.get(connection.user_id)
+            if connections:
+                connections.discard(connection)
+                if not connections:
+                    del self._connections[connection.user_id]
+
+    def publish(self, user_id: int, message: dict):
+        """Deliver to every open connection of the user; safe from any thread"""
+        with self._lock:
+            connections = list(self._connections.get(user_id, ()))
+        for connection in connections:
+            connection.loop.call_soon_threadsafe(connection.notify, message)
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(len(c) for c in self._connections.values())
+
+
+registry = ConnectionRegistry()
+
+
+@on_user_change(PROFILE, SHORTLIST, TODOS, DOCUMENTS, after_commit=True)
+def _push_user_change(db: Session, user_id: int, kinds: set):
+    registry.publish(user_id, {"type": "notification", "kinds": sorted(kinds)})
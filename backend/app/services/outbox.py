@@ -0,0 +1,174 @@
+"""
+Transactional outbox for side effects that do not have to finish inside the
+request.
+
+A handler calls enqueue(db, topic, payload, ...) next to its domain change, so
+the event row commits or rolls back together with it. outbox_worker.py then
+drains the table: it claims a batch of due events (FOR UPDATE SKIP LOCKED on
+Postgres, so several workers never take the same rows) and runs each event's
+handler in a savepoint. Marking the event processed is part of that savepoint,
+so a handler's writes and its processed_at commit together and an event is
+never applied twice. A failing event is retried with exponential backoff
+until OUTBOX_MAX_ATTEMPTS, then left unprocessed for an operator (dead).
+
+Handlers are registered per topic with @outbox_handler and must tolerate
+running again after a failed attempt. Every event also needs a dedupe_key,
+derived from what the event is about, so that enqueueing is idempotent as well:
+a retried request enqueues the same key again and the second event is dropped.
+
+With OUTBOX_WORKER=false (the default, e.g. local development without a
+worker process) enqueue() runs the handler immediately in the caller's
+transaction instead, which is how these side effects ran before the outbox.
+"""
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.metrics import OUTBOX_EVENTS, OUTBOX_HANDLER_DURATION
+from app.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+_handlers: Dict[str, Callable[[Session, Optional[int], dict], object]] = {}
+
+
+def outbox_handler(topic: str):
+    """Register fn(db, user_id, payload) as the handler of a topic"""
+    def register(fn):
+        _handlers[topic] = fn
+        return fn
+    return register
+
+
+def _defer_to_worker() -> bool:
+    from app.config import get_settings
+    return get_settings().outbox_worker
+
+
+def enqueue(db: Session, topic: str, payload: dict, user_id: Optional[int] = None, *, dedupe_key: str):
+    """Record an event in the current transaction. Returns None when it is left for the worker,
+    or the handler's result when OUTBOX_WORKER is off and it ran right away."""
+    if not _defer_to_worker():
+        return _handlers[topic](db, user_id, payload)
+
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    result = db.execute(insert(OutboxEvent).values(
+        topic=topic,
+        user_id=user_id,
+        dedupe_key=dedupe_key,
+        payload=json.dumps(payload),
+        created_at=datetime.utcnow(),
+    ).on_conflict_do_nothing(index_elements=[OutboxEvent.dedupe_key]))
+    OUTBOX_EVENTS.inc(topic=topic, result="enqueued" if result.rowcount else "duplicate")
+    return None
+
+
+def retry_delay(attempts: int, base: float = 2.0, cap: float = 600.0) -> timedelta:
+    return timedelta(seconds=min(base ** attempts, cap))
+
+
+class OutboxWorker:
+    """Drains outbox_events in batches; drain_once() is one claim-process-commit cycle"""
+
+    def __init__(self, session_factory, batch_size: int = 100, max_attempts: int = 8):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.processed = 0
+        self.failed = 0
+
+    def _due(self, db: Session, now: datetime):
+        return db.query(OutboxEvent).filter(
+            OutboxEvent.processed_at.is_(None),
+            OutboxEvent.attempts < self.max_attempts,
+            (OutboxEvent.available_at.is_(None)) | (OutboxEvent.available_at <= now)
+        )
+
+    def drain_once(self) -> int:
+        """Process up to batch_size due events; returns how many were claimed"""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            events = self._due(db, now).order_by(OutboxEvent.id).limit(self.batch_size).with_for_update(
+                skip_locked=True
+            ).all()
+            for event in events:
+                self._process(db, event)
+            db.commit()
+            return len(events)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _process(self, db: Session, event: OutboxEvent):
+        handler = _handlers.get(event.topic)
+        started = time.perf_counter()
+        savepoint = db.begin_nested()
+        try:
+            if handler is None:
+                raise LookupError(f"No outbox handler for topic {event.topic}")
+            handler(db, event.user_id, json.loads(event.payload))
+            event.processed_at = datetime.utcnow()
+            savepoint.commit()
+        except Exception as e:
+            savepoint.rollback()
+            event.attempts += 1
+            event.last_error = f"{type(e).__name__}: {str(e)}"[:2000]
+            event.available_at = datetime.utcnow() + retry_delay(event.attempts)
+            result = "dead" if event.attempts >= self.max_attempts else "retried"
+            self.failed += 1
+            OUTBOX_EVENTS.inc(topic=event.topic, result=result)
+            logger.error(f"Outbox event {event.id} ({event.topic}) failed, attempt {event.attempts}: {str(e)}",
+                         exc_info=result == "dead")
+            return
+        finally:
+            OUTBOX_HANDLER_DURATION.observe(time.perf_counter() - started, topic=event.topic)
+        self.processed += 1
+        OUTBOX_EVENTS.inc(topic=event.topic, result="processed")
+
+    def backlog(self) -> dict:
+        """Due events waiting, dead events, and the age of the oldest waiting event in seconds"""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            waiting, oldest = db.query(func.count(OutboxEvent.id), func.min(OutboxEvent.created_at)).filter(
+                OutboxEvent.processed_at.is_(None), OutboxEvent.attempts < self.max_attempts
+            ).one()
+            dead = db.query(func.count(OutboxEvent.id)).filter(
+                OutboxEvent.processed_at.is_(None), OutboxEvent.attempts >= self.max_attempts
+            ).scalar()
+        finally:
+            db.close()
+        return {
+            "waiting": waiting,
+            "dead": dead,
+            "lag_seconds": (now - oldest).total_seconds() if oldest else 0.0,
+        }
+
+    def purge_processed(self, older_than: timedelta, batch_size: int = 5000) -> int:
+        """Delete processed events older than the cutoff, in batches; returns how many were deleted"""
+        cutoff = datetime.utcnow() - older_than
+        deleted = 0
+        db = self.session_factory()
+        try:
+            while True:
+                ids = [event_id for (event_id,) in db.query(OutboxEvent.id).filter(
+                    OutboxEvent.processed_at.isnot(None), OutboxEvent.processed_at < cutoff
+                ).order_by(OutboxEvent.id).limit(batch_size)]
+                if not ids:
+                    break
+                db.query(OutboxEvent).filter(OutboxEvent.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                deleted += len(ids)
+        finally:
+            db.close()
+        return deleted
@@ -0,0 +1,111 @@
+"""
+Denormalized per-user counts stored on UserProfile: shortlisted, locked and
+dream/target/safe universities, open todos and pending documents.
+
+The handlers that insert, delete or change those rows call adjust_counters()
+in the same transaction, which adds the deltas in one UPDATE
+(SET col = col + delta). That is safe under concurrent requests because the
+row lock on the profile serializes the increments. Reading a count is then a
+column on the profile the request already loaded, instead of loading or
+counting the rows.
+
+count_actual() recounts from the source tables. verify_counters.py uses it
+to find and repair profiles that drifted, e.g. after rows were written
+outside the handlers.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models import (
+    DocumentStatus, ShortlistedUniversity, TodoItem, UniversityCategory, UniversityDocument, UserProfile
+)
+
+COUNTERS = (
+    "shortlisted_count", "locked_count", "dream_count", "target_count", "safe_count",
+    "open_todos_count", "pending_documents_count",
+)
+
+CATEGORY_COUNTERS = {
+    UniversityCategory.DREAM: "dream_count",
+    UniversityCategory.TARGET: "target_count",
+    UniversityCategory.SAFE: "safe_count",
+}
+
+
+def shortlist_deltas(categories: Iterable[UniversityCategory], sign: int = 1) -> Dict[str, int]:
+    """Counter deltas for adding (sign=1) or removing (sign=-1) shortlist rows of these categories"""
+    deltas = {"shortlisted_count": 0}
+    for category in categories:
+        deltas["shortlisted_count"] += sign
+        counter = CATEGORY_COUNTERS.get(category)
+        if counter:
+            deltas[counter] = deltas.get(counter, 0) + sign
+    return deltas
+
+
+def adjust_counters(db: Session, user_id: int, **deltas: int):
+    """Add the deltas to the user's counters with one UPDATE, in the current transaction"""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown profile counters: {', '.join(sorted(unknown))}")
+    db.query(UserProfile).filter(UserProfile.user_id == user_id).update(
+        {getattr(UserProfile, name): getattr(UserProfile, name) + delta for name, delta in deltas.items()}
+    )
+
+
+def count_actual(db: Session, user_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """The counters recomputed from the shortlist, todo and document tables"""
+    actual = {user_id: dict.fromkeys(COUNTERS, 0) for user_id in user_ids}
+    if not user_ids:
+        return actual
+
+    shortlist_columns = [
+        func.count(ShortlistedUniversity.id),
+        func.sum(case((ShortlistedUniversity.is_locked == True, 1), else_=0)),
+    ] + [
+        func.sum(case((ShortlistedUniversity.category == category, 1), else_=0))
+        for category in CATEGORY_COUNTERS
+    ]
+    rows = db.query(ShortlistedUniversity.user_id, *shortlist_columns).filter(
+        ShortlistedUniversity.user_id.in_(user_ids)
+    ).group_by(ShortlistedUniversity.user_id)
+    names = ("shortlisted_count", "locked_count") + tuple(CATEGORY_COUNTERS.values())
+    for user_id, *values in rows:
+        actual[user_id].update(zip(names, (int(value or 0) for value in values)))
+
+    rows = db.query(TodoItem.user_id, func.count(TodoItem.id)).filter(
+        TodoItem.user_id.in_(user_ids), TodoItem.is_completed == False
+    ).group_by(TodoItem.user_id)
+    for user_id, count in rows:
+        actual[user_id]["open_todos_count"] = count
+
+    rows = db.query(UniversityDocument.user_id, func.count(UniversityDocument.id)).filter(
+        UniversityDocument.user_id.in_(user_ids), UniversityDocument.status != DocumentStatus.UPLOADED
+    ).group_by(UniversityDocument.user_id)
+    for user_id, count in rows:
+        actual[user_id]["pending_documents_count"] = count
+    return actual
+
+
+def stored_counters(profile: UserProfile) -> Dict[str, int]:
+    return {name: getattr(profile, name) or 0 for name in COUNTERS}
+
+
+def repair_user_counters(db: Session, user_id: int) -> Optional[Dict[str, tuple]]:
+    """Recount one user's counters under the profile row lock and fix them; returns {counter: (stored, actual)}
+    for the ones that were wrong, or None when the user has no profile."""
+    # The lock waits for in-flight adjust_counters() of this user, so the recount sees their rows
+    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).with_for_update().first()
+    if profile is None:
+        return None
+    actual = count_actual(db, [user_id])[user_id]
+    stored = stored_counters(profile)
+    wrong = {name: (stored[name], actual[name]) for name in COUNTERS if stored[name] != actual[name]}
+    for name, (_, value) in wrong.items():
+        setattr(profile, name, value)
+    return wrong
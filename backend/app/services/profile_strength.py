@@ -0,0 +1,76 @@
+"""
+Profile strength engine shared by onboarding, profile updates and the bulk
+recompute command.
+
+calculate_profile_strength scores one profile. calculate_strengths_batch applies
+the same rules column-wise (lists of GPAs and exam statuses), which is what
+recompute_strengths.py feeds it in chunks. Thresholds live here only; after
+changing them, run recompute_strengths.py to refresh the stored values.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from app.models import ExamStatus, ProfileStrength, UserProfile
+
+GPA_STRONG = 3.5
+GPA_AVERAGE = 3.0
+
+STRONG = ProfileStrength.STRONG
+AVERAGE = ProfileStrength.AVERAGE
+WEAK = ProfileStrength.WEAK
+
+
+def _is_completed(status) -> bool:
+    # Accepts the ORM enum, the API enum or the raw stored name
+    value = getattr(status, "value", status)
+    return value is not None and str(value).upper() == ExamStatus.COMPLETED.value
+
+
+def calculate_strengths_batch(
+    gpas: Sequence[Optional[float]],
+    ielts_toefl_statuses: Sequence,
+    gre_gmat_statuses: Sequence,
+) -> Tuple[List[ProfileStrength], List[ProfileStrength], List[ProfileStrength]]:
+    """Academic, exam and overall strength columns for parallel input columns"""
+    academic = [
+        AVERAGE if not gpa
+        else STRONG if gpa >= GPA_STRONG
+        else AVERAGE if gpa >= GPA_AVERAGE
+        else WEAK
+        for gpa in gpas
+    ]
+    
+    exams_completed = [
+        _is_completed(ielts) + _is_completed(gre)
+        for ielts, gre in zip(ielts_toefl_statuses, gre_gmat_statuses)
+    ]
+    exam = [
+        STRONG if completed == 2 else AVERAGE if completed == 1 else WEAK
+        for completed in exams_completed
+    ]
+    
+    overall = [
+        STRONG if a is STRONG and e is STRONG
+        else WEAK if a is WEAK and e is WEAK
+        else AVERAGE
+        for a, e in zip(academic, exam)
+    ]
+    return academic, exam, overall
+
+
+def calculate_profile_strength(profile: UserProfile) -> dict:
+    """Calculate profile strength based on GPA and completed exams"""
+    academic, exam, overall = calculate_strengths_batch(
+        [profile.gpa_percentage], [profile.ielts_toefl_status], [profile.gre_gmat_status]
+    )
+    return {
+        "academic_strength": academic[0],
+        "exam_strength": exam[0],
+        "overall_strength": overall[0]
+    }
+
+
+def apply_profile_strength(profile: UserProfile):
+    strengths = calculate_profile_strength(profile)
+    profile.academic_strength = strengths["academic_strength"]
+    profile.exam_strength = strengths["exam_strength"]
+    profile.overall_strength = strengths["overall_strength"]
@@ -0,0 +1,253 @@
+"""
+Per-user materialized university recommendations.
+
+Recommendations are scored once, when onboarding completes or the profile
+inputs change, and stored in user_recommendations. Catalog changes rescore only
+the affected universities for every user. The API then serves a ranked page
+with one indexed read.
+"""
+import json
+import math
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models import University, UserProfile, UserRecommendation, UniversityCategory
+from app.services.catalog import CompactCatalog, get_catalog
+from app.services.user_events import on_user_change, PROFILE
+
+# Universities up to 20% over the top of the budget are still recommended
+BUDGET_FLEXIBILITY = 1.2
+
+CHANCE_WEIGHTS = {"High": 1.0, "Medium": 0.6, "Low": 0.25}
+COST_WEIGHTS = {"Low": 1.0, "Medium": 0.8, "High": 0.4}
+
+PROFILE_CHUNK_SIZE = 500
+
+
+def score_columns(profile: UserProfile, required_gpas: Sequence[float], required_gres: Sequence[float],
+                  rates: Sequence[float], avg_fees: Sequence[float]) -> Tuple[list, list, list]:
+    """Categories, acceptance chances and cost levels from per-university columns (the only copy of these rules)"""
+    user_gpa = profile.gpa_percentage or 3.0
+    user_gre = profile.gre_gmat_score or 300
+    budget_min = profile.budget_min
+    budget_max = profile.budget_max
+    
+    gpa_diffs = [user_gpa - gpa for gpa in required_gpas]
+    gre_diffs = [user_gre - gre for gre in required_gres]
+    
+    categories = [
+        "dream" if rate < 10 or gpa_diff < -0.2 or gre_diff < -10
+        else "safe" if gpa_diff > 0.3 or gre_diff > 20
+        else "target"
+        for rate, gpa_diff, gre_diff in zip(rates, gpa_diffs, gre_diffs)
+    ]
+    meets = [gpa_diff >= 0 and gre_diff >= 0 for gpa_diff, gre_diff in zip(gpa_diffs, gre_diffs)]
+    chances = [
+        ("Medium" if ok else "Low") if rate < 10
+        else ("High" if ok else "Medium") if rate < 30
+        else "High"
+        for rate, ok in zip(rates, meets)
+    ]
+    cost_levels = [
+        "High" if fee > budget_max else "Low" if fee < budget_min else "Medium"
+        for fee in avg_fees
+    ]
+    return categories, chances, cost_levels
+
+
+def score_universities(profile: UserProfile, universities: List[University]) -> List[dict]:
+    """Category, acceptance chance and cost level for many universities in one pass.
+    
+    The rules themselves live in score_columns; this parses each university's
+    requirements JSON once and feeds them in column by column.
+    """
+    requirements = [json.loads(u.requirements) if u.requirements else {} for u in universities]
+    categories, chances, cost_levels = score_columns(
+        profile,
+        [r.get("gpa", 3.0) for r in requirements],
+        [r.get("gre", 300) for r in requirements],
+        [u.acceptance_rate if u.acceptance_rate is not None else 30.0 for u in universities],
+        [(u.tuition_fee_min + u.tuition_fee_max) / 2 for u in universities],
+    )
+    
+    return [
+        {"category": category, "acceptance_chance": chance, "cost_level": cost}
+        for category, chance, cost in zip(categories, chances, cost_levels)
+    ]
+
+
+def preferred_countries(profile: UserProfile) -> List[str]:
+    if not profile.preferred_countries:
+        return []
+    try:
+        return json.loads(profile.preferred_countries)
+    except ValueError:
+        return [c.strip() for c in profile.preferred_countries.split(",") if c.strip()]
+
+
+def recommendations_key(profile: UserProfile) -> str:
+    """Fingerprint of every profile input the recommendation list depends on"""
+    return json.dumps([
+        sorted(preferred_countries(profile)),
+        profile.field_of_study,
+        profile.gpa_percentage,
+        profile.gre_gmat_score,
+        profile.budget_min,
+        profile.budget_max,
+    ])
+
+
+def is_candidate(profile: UserProfile, countries: set, university: University) -> bool:
+    if countries and university.country not in countries:
+        return False
+    return profile.budget_max is None or university.tuition_fee_min <= profile.budget_max * BUDGET_FLEXIBILITY
+
+
+def candidate_query(db: Session, profile: UserProfile):
+    query = db.query(University)
+    countries = preferred_countries(profile)
+    if countries:
+        query = query.filter(University.country.in_(countries))
+    if profile.budget_max is not None:
+        query = query.filter(University.tuition_fee_min <= profile.budget_max * BUDGET_FLEXIBILITY)
+    return query
+
+
+def fit_score(acceptance_chance: str, cost_level: str, ranking: Optional[int], field_match: bool) -> float:
+    """0-100, higher is a better fit"""
+    if ranking:
+        rank_weight = max(0.0, 1 - math.log10(ranking) / 3)
+    else:
+        rank_weight = 0.3
+    score = (
+        35 * CHANCE_WEIGHTS[acceptance_chance]
+        + 25 * COST_WEIGHTS[cost_level]
+        + 25 * rank_weight
+        + 15 * (1.0 if field_match else 0.0)
+    )
+    return round(score, 2)
+
+
+def build_recommendation_rows(profile: UserProfile, universities: List[University]) -> List[dict]:
+    """Score universities for a profile; 0-100, higher is a better fit"""
+    scores = score_universities(profile, universities)
+    field = (profile.field_of_study or "").lower()
+    rows = []
+    for university, result in zip(universities, scores):
+        field_match = bool(field) and field in (university.fields_offered or "").lower()
+        rows.append({
+            "user_id": profile.user_id,
+            "university_id": university.id,
+            "score": fit_score(result["acceptance_chance"], result["cost_level"], university.ranking, field_match),
+            "category": UniversityCategory[result["category"].upper()],
+            "acceptance_chance": result["acceptance_chance"],
+        })
+    return rows
+
+
+def build_catalog_recommendation_rows(profile: UserProfile, catalog: CompactCatalog) -> List[dict]:
+    """build_recommendation_rows for every candidate in the in-memory catalog; no ORM rows are loaded"""
+    budget_limit = profile.budget_max * BUDGET_FLEXIBILITY if profile.budget_max is not None else None
+    indexes = catalog.candidates(preferred_countries(profile), budget_limit)
+    categories, chances, cost_levels = score_columns(
+        profile,
+        catalog.take(catalog.required_gpa, indexes),
+        catalog.take(catalog.required_gre, indexes),
+        catalog.take(catalog.acceptance_rate, indexes),
+        [(catalog.tuition_fee_min[i] + catalog.tuition_fee_max[i]) / 2 for i in indexes],
+    )
+    matching_fields = catalog.fields_containing((profile.field_of_study or "").lower())
+    rankings, field_indexes, ids = catalog.ranking, catalog.fields, catalog.ids
+    return [
+        {
+            "user_id": profile.user_id,
+            "university_id": ids[i],
+            "score": fit_score(chance, cost, rankings[i], field_indexes[i] in matching_fields),
+            "category": UniversityCategory[category.upper()],
+            "acceptance_chance": chance,
+        }
+        for i, category, chance, cost in zip(indexes, categories, chances, cost_levels)
+    ]
+
+
+def refresh_user_recommendations(db: Session, profile: UserProfile, catalog: Optional[List[University]] = None) -> int:
+    """Recompute a user's full recommendation list; returns the number of rows stored"""
+    compact = get_catalog(db) if catalog is None else None
+    if compact is not None:
+        rows = build_catalog_recommendation_rows(profile, compact)
+    elif catalog is not None:
+        countries = set(preferred_countries(profile))
+        rows = build_recommendation_rows(profile, [u for u in catalog if is_candidate(profile, countries, u)])
+    else:
+        rows = build_recommendation_rows(profile, candidate_query(db, profile).all())
+    
+    db.execute(delete(UserRecommendation).where(UserRecommendation.user_id == profile.user_id))
+    if rows:
+        db.execute(insert(UserRecommendation), rows)
+    profile.recommendations_key = recommendations_key(profile)
+    return len(rows)
+
+
+def refresh_recommendations_for_universities(db: Session, university_ids: Iterable[int]) -> int:
+    """Rescore only the given (new or changed) universities for every onboarded user"""
+    university_ids = list(university_ids)
+    if not university_ids:
+        return 0
+    universities = db.query(University).filter(University.id.in_(university_ids)).all()
+    
+    stored = 0
+    last_id = 0
+    while True:
+        profiles = db.query(UserProfile).filter(
+            UserProfile.onboarding_completed == True,
+            UserProfile.id > last_id
+        ).order_by(UserProfile.id).limit(PROFILE_CHUNK_SIZE).all()
+        if not profiles:
+            break
+        last_id = profiles[-1].id
+        
+        user_ids = [p.user_id for p in profiles]
+        db.execute(delete(UserRecommendation).where(
+            UserRecommendation.user_id.in_(user_ids),
+            UserRecommendation.university_id.in_(university_ids)
+        ))
+        rows = []
+        for profile in profiles:
+            countries = set(preferred_countries(profile))
+            candidates = [u for u in universities if is_candidate(profile, countries, u)]
+            rows.extend(build_recommendation_rows(profile, candidates))
+        if rows:
+            db.execute(insert(UserRecommendation), rows)
+        stored += len(rows)
+    return stored
+
+
+@on_user_change(PROFILE)
+def _refresh_on_profile_change(db: Session, user_id: int, kinds: set):
+    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    # Stage changes also report PROFILE; only rescore when a scoring input changed
+    if profile and profile.onboarding_completed and profile.recommendations_key != recommendations_key(profile):
+        refresh_user_recommendations(db, profile)
+
+
+def get_recommendation_page(db: Session, profile: UserProfile, offset: int = 0, limit: int = 50,
+                            country: Optional[str] = None, field: Optional[str] = None) -> list:
+    """(UserRecommendation, University) pairs, best first"""
+    if profile.recommendations_key is None:
+        # Profiles onboarded before materialization existed
+        refresh_user_recommendations(db, profile)
+        db.commit()
+    
+    query = db.query(UserRecommendation, University).join(
+        University, University.id == UserRecommendation.university_id
+    ).filter(UserRecommendation.user_id == profile.user_id)
+    if country:
+        query = query.filter(University.country == country)
+    if field:
+        query = query.filter(University.fields_offered.contains(field))
+    
+    return query.order_by(
+        UserRecommendation.score.desc(), UserRecommendation.university_id
+    ).offset(offset).limit(limit).all()
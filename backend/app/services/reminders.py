@@ -0,0 +1,270 @@
+"""
+Deadline reminders for open todos and documents that are not uploaded yet.
+
+DeadlineScheduler keeps the reminders that fire within the next `horizon` in a
+heap ordered by fire time (due_date minus each configured lead). Deadlines
+reach the heap from two indexed queries, never from a scan of all rows:
+
+- the window: every `horizon` the scheduler range-scans the next stretch of
+  due dates (ix_todo_items_open_due / ix_university_documents_due_date), in
+  keyset pages of batch_size rows;
+- catch-up: rows inserted or updated since the last tick (updated_at range on
+  ix_todo_items_updated / ix_university_documents_updated) whose deadline falls
+  inside the window that is already loaded. This is how a due date that is set
+  or moved into the window, or a todo that is reopened, gets its reminders.
+
+updated_at is stamped by the writers' clocks, so the catch-up range starts
+update_overlap before the previous scan to pick up transactions that committed
+after it; rows read twice this way are only handled once.
+
+Memory is bounded by how many deadlines fall within the window, whatever the
+table size. When a reminder comes due, its item is checked again (still open,
+same due date) and the reminder is written to outbox_events in one multi-row
+INSERT per batch; reminders for a deadline that has moved are dropped as stale. Each event's dedupe_key names the item, due date and lead,
+so a restarted scheduler that reloads the same deadlines stores nothing
+twice. Deadlines that passed while the scheduler was stopped, or more than a
+horizon ago, are not loaded; a reminder whose lead has already begun (e.g. the 24 hour reminder of a todo
+created 2 hours before it is due) is sent at once, with late_seconds set.
+
+Time comes from a clock object, so tests drive the scheduler with FakeClock
+instead of waiting.
+"""
+import heapq
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.metrics import REMINDERS, REMINDERS_SCHEDULED
+from app.models import DocumentStatus, OutboxEvent, TodoItem, UniversityDocument
+from app.services.outbox import outbox_handler
+
+logger = logging.getLogger(__name__)
+
+REMINDER_TOPIC = "deadline_reminder"
+
+TODO = "todo"
+DOCUMENT = "document"
+
+# kind -> (model, WHERE clause for items that still need a reminder)
+SOURCES = {
+    TODO: (TodoItem, TodoItem.is_completed == False),
+    DOCUMENT: (UniversityDocument, UniversityDocument.status != DocumentStatus.UPLOADED),
+}
+
+
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.current = start or datetime(2026, 1, 1)
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance(self, **delta):
+        self.current += timedelta(**delta)
+
+
+def reminder_key(kind: str, item_id: int, due_date: datetime, lead: timedelta) -> str:
+    return f"reminder:{kind}:{item_id}:{due_date.isoformat()}:{int(lead.total_seconds())}"
+
+
+class DeadlineScheduler:
+    """Emits a reminder event `lead` before each deadline, for every lead"""
+
+    def __init__(self, session_factory, clock=None, leads: Sequence[timedelta] = (timedelta(hours=24), timedelta(0)),
+                 horizon: timedelta = timedelta(hours=1), batch_size: int = 1000,
+                 update_overlap: timedelta = timedelta(minutes=1)):
+        self.session_factory = session_factory
+        self.clock = clock or SystemClock()
+        self.leads = tuple(sorted(set(leads), reverse=True))
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.update_overlap = update_overlap
+        # (fire_at, kind, item_id, lead, due_date, user_id)
+        self._heap: List[tuple] = []
+        self._queued = set()  # (kind, item_id, lead, due_date) in the heap
+        self._window_start: Optional[datetime] = None
+        self._loaded_until: Optional[datetime] = None  # deadlines before this are in the heap or fired
+        self._changed_since: Optional[datetime] = None  # catch-up reads rows with updated_at >= this
+        self._seen: Dict[Tuple[str, int], datetime] = {}  # rows catch-up handled -> their updated_at
+        self.loaded_rows = 0
+        self.emitted = 0
+        self.stale = 0
+        self.duplicates = 0
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def next_fire_at(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    def tick(self) -> int:
+        """Load new deadlines and emit every reminder that is due; returns how many were written"""
+        now = self.clock.now()
+        db = self.session_factory()
+        try:
+            if self._loaded_until is None:
+                self._start(db, now)
+            if now + self.horizon + self.leads[0] > self._loaded_until:
+                self._load_window(db, self._loaded_until, now + 2 * self.horizon + self.leads[0])
+            self._catch_up(db, now)
+            emitted = 0
+            while self._heap and self._heap[0][0] <= now:
+                batch = []
+                while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                    entry = heapq.heappop(self._heap)
+                    self._queued.discard((entry[1], entry[2], entry[3], entry[4]))
+                    batch.append(entry)
+                emitted += self._emit(db, batch, now)
+                db.commit()
+            REMINDERS_SCHEDULED.set(len(self._heap))
+            return emitted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _start(self, db: Session, now: datetime):
+        # Rows changed from here on are picked up by catch-up; everything else by the window
+        self._changed_since = datetime.utcnow() - self.update_overlap
+        self._window_start = now
+        self._loaded_until = now
+
+    def _push(self, kind: str, item_id: int, user_id: int, due_date: datetime):
+        for lead in self.leads:
+            key = (kind, item_id, lead, due_date)
+            if key not in self._queued:
+                self._queued.add(key)
+                heapq.heappush(self._heap, (due_date - lead, kind, item_id, lead, due_date, user_id))
+
+    def _load_window(self, db: Session, start: datetime, end: datetime):
+        """Push every pending deadline in [start, end), paging by (due_date, id)"""
+        for kind, (model, pending) in SOURCES.items():
+            after: Optional[Tuple[datetime, int]] = None
+            while True:
+                query = db.query(model.id, model.user_id, model.due_date).filter(
+                    pending, model.due_date >= start, model.due_date < end
+                )
+                if after:
+                    query = query.filter(or_(
+                        model.due_date > after[0], and_(model.due_date == after[0], model.id > after[1])
+                    ))
+                rows = query.order_by(model.due_date, model.id).limit(self.batch_size).all()
+                for item_id, user_id, due_date in rows:
+                    self._push(kind, item_id, user_id, due_date)
+                self.loaded_rows += len(rows)
+                if len(rows) < self.batch_size:
+                    break
+                after = (rows[-1].due_date, rows[-1].id)
+        self._loaded_until = end
+
+    def _catch_up(self, db: Session, now: datetime):
+        """Push deadlines of rows inserted or updated since the last tick that fall inside the loaded window"""
+        scanned_at = datetime.utcnow()
+        earliest = max(self._window_start, now - self.horizon)
+        for kind, (model, pending) in SOURCES.items():
+            after: Optional[Tuple[datetime, int]] = None
+            while True:
+                # Only the updated_at range in WHERE, so this reads just the changed rows
+                query = db.query(model.id, model.user_id, model.due_date, model.updated_at, pending).filter(
+                    model.updated_at >= self._changed_since
+                )
+                if after:
+                    query = query.filter(or_(
+                        model.updated_at > after[0], and_(model.updated_at == after[0], model.id > after[1])
+                    ))
+                rows = query.order_by(model.updated_at, model.id).limit(self.batch_size).all()
+                for item_id, user_id, due_date, updated_at, is_pending in rows:
+                    if self._seen.get((kind, item_id)) == updated_at:
+                        continue
+                    self._seen[(kind, item_id)] = updated_at
+                    if is_pending and due_date and earliest <= due_date < self._loaded_until:
+                        self._push(kind, item_id, user_id, due_date)
+                self.loaded_rows += len(rows)
+                if len(rows) < self.batch_size:
+                    break
+                after = (rows[-1].updated_at, rows[-1].id)
+
+        self._changed_since = max(self._changed_since, scanned_at - self.update_overlap)
+        for key in [key for key, updated_at in self._seen.items() if updated_at < self._changed_since]:
+            del self._seen[key]
+
+    def _still_pending(self, db: Session, batch: Iterable[tuple]) -> set:
+        """(kind, item_id, due_date) of the batch's items that are still open with the same deadline"""
+        ids_by_kind: Dict[str, List[int]] = {}
+        for _, kind, item_id, _, _, _ in batch:
+            ids_by_kind.setdefault(kind, []).append(item_id)
+        current = set()
+        for kind, ids in ids_by_kind.items():
+            model, pending = SOURCES[kind]
+            # Selected rather than filtered on, so the lookup goes by primary key and not through
+            # the is_completed/due_date index
+            rows = db.query(model.id, model.due_date, pending).filter(model.id.in_(ids))
+            current.update((kind, item_id, due_date) for item_id, due_date, is_pending in rows if is_pending)
+        return current
+
+    def _emit(self, db: Session, batch: List[tuple], now: datetime) -> int:
+        current = self._still_pending(db, batch)
+        kinds, rows = [], []
+        for fire_at, kind, item_id, lead, due_date, user_id in batch:
+            if (kind, item_id, due_date) not in current:
+                # Completed, uploaded, deleted or rescheduled since it was loaded
+                REMINDERS.inc(kind=kind, result="stale")
+                self.stale += 1
+                continue
+            kinds.append(kind)
+            rows.append({
+                "topic": REMINDER_TOPIC,
+                "user_id": user_id,
+                "dedupe_key": reminder_key(kind, item_id, due_date, lead),
+                "payload": json.dumps({
+                    "kind": kind,
+                    "id": item_id,
+                    "due_date": due_date.isoformat(),
+                    "lead_hours": lead.total_seconds() / 3600,
+                    "late_seconds": round((now - fire_at).total_seconds()),
+                }),
+                "created_at": now,
+            })
+        if not rows:
+            return 0
+
+        insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = insert(OutboxEvent).values(rows).on_conflict_do_nothing(index_elements=[OutboxEvent.dedupe_key])
+        written = set(db.execute(statement.returning(OutboxEvent.dedupe_key)).scalars())
+        for kind, row in zip(kinds, rows):
+            REMINDERS.inc(kind=kind, result="emitted" if row["dedupe_key"] in written else "duplicate")
+        self.emitted += len(written)
+        self.duplicates += len(rows) - len(written)
+        return len(written)
+
+
+@outbox_handler(REMINDER_TOPIC)
+def deliver_reminder(db: Session, user_id: int, payload: dict):
+    # There is no email/push channel yet; the outbox worker records the reminder in its log
+    logger.info(f"Reminder for user {user_id}: {payload['kind']} {payload['id']} due {payload['due_date']}")
+
+
+def scheduler_from_settings(session_factory, clock=None) -> DeadlineScheduler:
+    from app.config import get_settings
+    settings = get_settings()
+    return DeadlineScheduler(
+        session_factory,
+        clock=clock,
+        leads=[timedelta(hours=hours) for hours in settings.reminder_lead_hours],
+        horizon=timedelta(minutes=settings.reminder_horizon_minutes),
+        batch_size=settings.reminder_batch_size,
+    )
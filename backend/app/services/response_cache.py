@@ -0,0 +1,345 @@
+"""
+Semantic response cache for LLM counselor answers.
+
+Questions are embedded with a CPU-only hashing vectorizer (word unigrams plus
+character trigrams), so "visa requirements for Canada?" and "what do I need for
+a Canadian visa" land close to each other without any model download.
+Entries are partitioned by (intent, profile bucket) and looked up with a
+nearest-neighbour scan inside that partition; questions without a templated
+intent are partitioned by a keyword topic instead.
+"""
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.models import UserProfile
+
+VECTOR_DIMENSIONS = 4096
+
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "we", "you", "your", "is", "are", "am",
+    "do", "does", "did", "what", "which", "how", "when", "where", "who", "why",
+    "for", "to", "of", "in", "on", "at", "and", "or", "can", "could", "should",
+    "would", "will", "be", "it", "this", "that", "there", "about", "need",
+    "please", "tell", "know", "get", "have", "has", "with",
+}
+
+# Demonyms and aliases collapse onto one country token. Country tokens are
+# also "anchors": a cached answer is only reused for the same set of countries.
+COUNTRY_ALIASES = {
+    "canada": "canada", "canadian": "canada",
+    "usa": "usa", "us": "usa", "america": "usa", "american": "usa",
+    "uk": "uk", "britain": "uk", "british": "uk", "england": "uk", "english": "uk",
+    "germany": "germany", "german": "germany",
+    "australia": "australia", "australian": "australia",
+    "netherlands": "netherlands", "dutch": "netherlands", "holland": "netherlands",
+    "france": "france", "french": "france",
+    "sweden": "sweden", "swedish": "sweden",
+    "ireland": "ireland", "irish": "ireland",
+    "zealand": "new_zealand",
+}
+
+# Profile fields that must never be stored in a shared cache entry.
+# Values are swapped for placeholders on write and re-rendered on read.
+PERSONAL_FIELDS = ("full_name", "email", "gpa", "budget_min", "budget_max",
+                   "ielts_toefl_score", "gre_gmat_score")
+
+# Free-form questions that match no templated intent are still partitioned by
+# topic, so a visa answer is never served for a funding question. First match wins.
+QUESTION_TOPICS = (
+    ("visa", {"visa", "permit", "immigration", "embassy", "biometric"}),
+    ("funding", {"scholarship", "funding", "loan", "grant", "assistantship", "fund"}),
+    ("exams", {"ielts", "toefl", "gre", "gmat", "pte", "duolingo", "exam", "test", "score"}),
+    ("documents", {"sop", "lor", "essay", "recommendation", "resume", "cv", "transcript"}),
+    ("costs", {"cost", "fee", "tuition", "expense", "living", "rent", "afford", "budget"}),
+    ("careers", {"job", "career", "work", "internship", "salary", "employment"}),
+    ("deadlines", {"deadline", "intake", "timeline", "date", "apply", "application"}),
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_question(text: str) -> List[str]:
+    """Lowercase, tokenize and drop stopwords and trivial plurals"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in COUNTRY_ALIASES:
+            tokens.append(COUNTRY_ALIASES[token])
+            continue
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def question_anchors(text: str) -> frozenset:
+    return frozenset(t for t in normalize_question(text) if t in COUNTRY_ALIASES.values())
+
+
+def question_topic(text: str) -> str:
+    """Coarse topic of a free-form question, used as the intent when none is given"""
+    tokens = set(normalize_question(text))
+    for topic, keywords in QUESTION_TOPICS:
+        if tokens & keywords:
+            return topic
+    return "general"
+
+
+def _bucket_index(feature: str) -> Tuple[int, float]:
+    # crc32 keeps vectors stable across processes (hash() is randomized)
+    h = zlib.crc32(feature.encode("utf-8"))
+    sign = 1.0 if h & 0x80000000 else -1.0
+    return h % VECTOR_DIMENSIONS, sign
+
+
+def embed_question(text: str) -> Dict[int, float]:
+    """Hashing-trick embedding as a sparse, L2-normalised {index: weight} dict"""
+    counts: Dict[int, float] = {}
+    for token in normalize_question(text):
+        features = ["w:" + token]
+        padded = f"^{token}$"
+        features.extend("c:" + padded[i:i + 3] for i in range(len(padded) - 2))
+        for feature in features:
+            index, sign = _bucket_index(feature)
+            counts[index] = counts.get(index, 0.0) + sign
+
+    # Sublinear term frequency, then normalise
+    vector = {i: math.copysign(1 + math.log(abs(v)), v) for i, v in counts.items() if v}
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if not norm:
+        return {}
+    return {i: v / norm for i, v in vector.items()}
+
+
+def cosine_similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(i, 0.0) for i, v in a.items())
+
+
+def _budget_band(amount: Optional[float]) -> str:
+    if amount is None:
+        return "unknown"
+    if amount < 15000:
+        return "low"
+    if amount < 30000:
+        return "mid"
+    if amount < 50000:
+        return "high"
+    return "premium"
+
+
+def bucket_fields(profile: UserProfile) -> Dict[str, str]:
+    """The coarse profile attributes every user in a bucket shares"""
+    countries = profile.preferred_countries or ""
+    countries = ",".join(sorted(c.strip(' "[]').lower() for c in countries.split(",") if c.strip(' "[]')))
+    return {
+        "degree": (profile.intended_degree or "").lower(),
+        "field": (profile.field_of_study or "").lower(),
+        "countries": countries,
+        "budget": _budget_band(profile.budget_max),
+        "strength": profile.overall_strength.value if profile.overall_strength else "unknown",
+    }
+
+
+def profile_bucket(profile: UserProfile) -> str:
+    """Coarse, non-identifying profile key; answers are only shared inside it"""
+    return "|".join(bucket_fields(profile).values())
+
+
+def personal_values(user, profile: UserProfile) -> Dict[str, List[str]]:
+    """String renderings of personalised fields, longest first per field"""
+    raw = {
+        "full_name": user.full_name,
+        "email": user.email,
+        "gpa": profile.gpa_percentage,
+        "budget_min": profile.budget_min,
+        "budget_max": profile.budget_max,
+        "ielts_toefl_score": profile.ielts_toefl_score,
+        "gre_gmat_score": profile.gre_gmat_score,
+    }
+    values = {}
+    for field in PERSONAL_FIELDS:
+        value = raw.get(field)
+        if value in (None, ""):
+            continue
+        if isinstance(value, float):
+            renderings = {f"{value:,.0f}", f"{value:,}", str(value)}
+            if value.is_integer():
+                renderings.add(str(int(value)))
+        else:
+            renderings = {str(value)}
+        # Short renderings ("3", "7") would match unrelated text
+        values[field] = sorted((r for r in renderings if len(r) >= 3), key=len, reverse=True)
+    return values
+
+
+def redact_answer(answer: str, values: Dict[str, List[str]]) -> str:
+    for field, renderings in values.items():
+        for rendering in renderings:
+            answer = answer.replace(rendering, "{{" + field + "}}")
+    return answer
+
+
+def render_answer(template: str, values: Dict[str, List[str]]) -> Optional[str]:
+    """Fill placeholders with the requesting user's values; None if one is missing"""
+    for field in PERSONAL_FIELDS:
+        placeholder = "{{" + field + "}}"
+        if placeholder not in template:
+            continue
+        if not values.get(field):
+            return None
+        template = template.replace(placeholder, values[field][0])
+    return template
+
+
+class _Entry:
+    __slots__ = ("vector", "anchors", "answer", "created_at", "hits")
+
+    def __init__(self, vector: Dict[int, float], anchors: frozenset, answer: str, created_at: float):
+        self.vector = vector
+        self.anchors = anchors
+        self.answer = answer
+        self.created_at = created_at
+        self.hits = 0
+
+
+class SemanticResponseCache:
+    """LRU + TTL cache of redacted answers keyed by (intent, profile bucket)"""
+
+    def __init__(self, max_entries: int = 2000, ttl_seconds: int = 86400,
+                 similarity_threshold: float = 0.68, max_entries_per_bucket: int = 256):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_bucket = max_entries_per_bucket
+        self._buckets: Dict[Tuple[str, str], List[_Entry]] = {}
+        # Global recency order for eviction: id(entry) -> (key, entry)
+        self._lru: "OrderedDict[int, Tuple[Tuple[str, str], _Entry]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
+    def lookup(self, intent: str, bucket: str, question: str,
+               values: Dict[str, List[str]]) -> Optional[str]:
+        vector = embed_question(question)
+        anchors = question_anchors(question)
+        key = (intent or question_topic(question), bucket)
+        now = time.time()
+        with self._lock:
+            best, best_score = None, 0.0
+            for entry in list(self._buckets.get(key, ())):
+                if now - entry.created_at > self.ttl_seconds:
+                    self._remove(key, entry)
+                    self.expirations += 1
+                    continue
+                if entry.anchors != anchors:
+                    continue
+                score = cosine_similarity(vector, entry.vector)
+                if score > best_score:
+                    best, best_score = entry, score
+
+            if best is None or best_score < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            answer = render_answer(best.answer, values)
+            if answer is None:
+                self.misses += 1
+                return None
+
+            best.hits += 1
+            self._lru.move_to_end(id(best))
+            self.hits += 1
+            return answer
+
+    def store(self, intent: str, bucket: str, question: str, answer: str,
+              values: Dict[str, List[str]]) -> bool:
+        vector = embed_question(question)
+        if not vector or not answer:
+            self.rejected += 1
+            return False
+
+        anchors = question_anchors(question)
+        template = redact_answer(answer, values)
+        key = (intent or question_topic(question), bucket)
+        with self._lock:
+            entries = self._buckets.setdefault(key, [])
+            # Near-duplicate questions refresh the existing entry instead of piling up
+            for entry in entries:
+                if entry.anchors == anchors and cosine_similarity(vector, entry.vector) >= 0.98:
+                    entry.answer = template
+                    entry.created_at = time.time()
+                    self._lru.move_to_end(id(entry))
+                    return True
+
+            if len(entries) >= self.max_entries_per_bucket:
+                oldest = min(entries, key=lambda e: (e.hits, e.created_at))
+                self._remove(key, oldest)
+                self.evictions += 1
+
+            entry = _Entry(vector, anchors, template, time.time())
+            entries.append(entry)
+            self._lru[id(entry)] = (key, entry)
+            self.stores += 1
+
+            while len(self._lru) > self.max_entries:
+                _, (old_key, old_entry) = self._lru.popitem(last=False)
+                self._buckets[old_key].remove(old_entry)
+                if not self._buckets[old_key]:
+                    del self._buckets[old_key]
+                self.evictions += 1
+        return True
+
+    def _remove(self, key: Tuple[str, str], entry: _Entry):
+        self._lru.pop(id(entry), None)
+        entries = self._buckets.get(key)
+        if entries and entry in entries:
+            entries.remove(entry)
+            if not entries:
+                del self._buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "buckets": len(self._buckets),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected": self.rejected,
+        }
+
+
+_cache: Optional[SemanticResponseCache] = None
+
+
+def get_response_cache() -> SemanticResponseCache:
+    global _cache
+    if _cache is None:
+        from app.config import get_settings
+        settings = get_settings()
+        _cache = SemanticResponseCache(
+            max_entries=settings.counselor_cache_max_entries,
+            ttl_seconds=settings.counselor_cache_ttl_seconds,
+            similarity_threshold=settings.counselor_cache_similarity_threshold,
+        )
+    return _cache
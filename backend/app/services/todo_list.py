@@ -0,0 +1,132 @@
+"""
+Keyset-paginated, filtered todo lists and the due-date summary.
+
+Pages are ordered either newest first (created_at DESC, id DESC) or by due date
+(due_date ASC with undated todos last, then id). The cursor is the sort key of
+the last row of the previous page, so the next page of open todos is a range
+scan of ix_todo_items_user_created / ix_todo_items_user_due from where the
+previous one stopped, however deep the user pages, and the completed todos
+that pile up over time are never read. Category, priority and ai_generated
+filter the rows of that single user's range; a user has at most a few hundred
+todos, so they do not need index columns of their own.
+"""
+import base64
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Session
+
+from app.models import TodoItem
+
+SORT_CREATED = "created"
+SORT_DUE = "due"
+SORTS = (SORT_CREATED, SORT_DUE)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(todo: TodoItem, sort: str) -> str:
+    key = todo.created_at if sort == SORT_CREATED else todo.due_date
+    raw = f"{key.isoformat() if key else ''}|{todo.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        key, todo_id = raw.rsplit("|", 1)
+        return (datetime.fromisoformat(key) if key else None), int(todo_id)
+    except ValueError as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def _after_cursor(sort: str, key: Optional[datetime], todo_id: int):
+    if sort == SORT_CREATED:
+        return or_(TodoItem.created_at < key, and_(TodoItem.created_at == key, TodoItem.id < todo_id))
+    if key is None:
+        # Already in the undated tail
+        return and_(TodoItem.due_date.is_(None), TodoItem.id > todo_id)
+    return or_(
+        TodoItem.due_date > key,
+        and_(TodoItem.due_date == key, TodoItem.id > todo_id),
+        TodoItem.due_date.is_(None),
+    )
+
+
+def todo_conditions(user_id: int, is_completed: Optional[bool] = None, category: Optional[str] = None,
+                    priority: Optional[str] = None, ai_generated: Optional[bool] = None,
+                    due_after: Optional[datetime] = None, due_before: Optional[datetime] = None) -> list:
+    """WHERE clauses selecting the user's todos that match the filters; None means any"""
+    conditions = [TodoItem.user_id == user_id]
+    if is_completed is not None:
+        conditions.append(TodoItem.is_completed == is_completed)
+    if category:
+        conditions.append(TodoItem.category == category)
+    if priority:
+        conditions.append(TodoItem.priority == priority)
+    if ai_generated is not None:
+        conditions.append(TodoItem.ai_generated == ai_generated)
+    if due_after is not None:
+        conditions.append(TodoItem.due_date >= due_after)
+    if due_before is not None:
+        conditions.append(TodoItem.due_date < due_before)
+    return conditions
+
+
+def get_todo_page(db: Session, user_id: int, limit: Optional[int] = 100, cursor: Optional[str] = None,
+                  sort: str = SORT_CREATED, include_completed: bool = False,
+                  category: Optional[str] = None, priority: Optional[str] = None,
+                  ai_generated: Optional[bool] = None, due_after: Optional[datetime] = None,
+                  due_before: Optional[datetime] = None) -> Tuple[List[TodoItem], Optional[str]]:
+    """One page of the user's todos and the cursor of the next page (None on the last page).
+    With limit=None every matching todo is returned as a single page."""
+    query = db.query(TodoItem).filter(*todo_conditions(
+        user_id, is_completed=None if include_completed else False, category=category, priority=priority,
+        ai_generated=ai_generated, due_after=due_after, due_before=due_before
+    ))
+    if cursor:
+        query = query.filter(_after_cursor(sort, *decode_cursor(cursor)))
+
+    if sort == SORT_CREATED:
+        query = query.order_by(TodoItem.created_at.desc(), TodoItem.id.desc())
+    else:
+        query = query.order_by(TodoItem.due_date.asc().nulls_last(), TodoItem.id)
+
+    if limit is None:
+        return query.all(), None
+
+    # One extra row tells whether there is a next page without a COUNT
+    todos = query.limit(limit + 1).all()
+    if len(todos) <= limit:
+        return todos, None
+    todos = todos[:limit]
+    return todos, encode_cursor(todos[-1], sort)
+
+
+def todo_summary(db: Session, user_id: int, now: Optional[datetime] = None) -> dict:
+    """Counts of the user's open todos by due-date bucket, in one aggregate query"""
+    now = now or datetime.utcnow()
+    week_end = now + timedelta(days=7)
+    due = TodoItem.due_date
+    row = db.query(
+        func.count(TodoItem.id),
+        func.sum(case((due < now, 1), else_=0)),
+        func.sum(case((and_(due >= now, due < week_end), 1), else_=0)),
+        func.sum(case((due.is_(None), 1), else_=0)),
+        func.min(case((due >= now, due))),
+    ).filter(
+        TodoItem.user_id == user_id,
+        TodoItem.is_completed == False
+    ).one()
+    open_count, overdue, due_this_week, undated, next_due = row
+    return {
+        "open": open_count,
+        "overdue": int(overdue or 0),
+        "due_this_week": int(due_this_week or 0),
+        "no_due_date": int(undated or 0),
+        "next_due_date": next_due,
+        "as_of": now,
+    }
@@ -1,21 +1,61 @@
-import httpx
 import json
+from types import MappingProxyType
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.metrics import track_upstream
 from app.models import University
+from app.services.data_versions import bump_versions, CATALOG
+from app.services.recommendations import refresh_recommendations_for_universities
 
 # Free Universities API - No key needed!
 UNIVERSITIES_API_BASE = "http://universities.hipolabs.com"
 
+# Read-only reference tables, built once at import (shared by preloaded workers)
+
+# Standardize country names to match profile options
+COUNTRY_MAPPING = MappingProxyType({
+    "United States": "USA",
+    "United Kingdom": "UK",
+    "United States of America": "USA"
+})
+
+# Estimated tuition (min, max) by country (rough estimates)
+TUITION_ESTIMATES = MappingProxyType({
+    "United States": (30000, 60000),
+    "United Kingdom": (20000, 40000),
+    "USA": (30000, 60000),
+    "UK": (20000, 40000),
+    "Canada": (15000, 35000),
+    "Australia": (20000, 45000),
+    "Germany": (0, 3000),
+    "Netherlands": (8000, 20000),
+    "France": (2000, 15000),
+    "Sweden": (0, 2000),
+    "Norway": (0, 1000),
+    "India": (2000, 10000),
+    "China": (3000, 15000),
+    "Japan": (5000, 20000),
+    "Singapore": (15000, 35000),
+    "South Korea": (5000, 18000),
+    "Switzerland": (1000, 8000),
+    "New Zealand": (18000, 35000),
+    "Ireland": (12000, 25000),
+    "Italy": (2000, 12000),
+    "Spain": (1500, 10000)
+})
+
 async def fetch_universities_by_country(country: str, limit: int = 100) -> List[dict]:
     """Fetch universities from free Hipolabs API by country"""
+    # Only the import endpoints use httpx; importing it costs every worker ~100ms at boot
+    import httpx
     try:
         async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.get(
-                f"{UNIVERSITIES_API_BASE}/search",
-                params={"country": country}
-            )
-            response.raise_for_status()
+            with track_upstream("hipolabs", "search_by_country"):
+                response = await client.get(
+                    f"{UNIVERSITIES_API_BASE}/search",
+                    params={"country": country}
+                )
+                response.raise_for_status()
             data = response.json()
             # Limit here to avoid huge responses
             return data[:limit] if limit else data
@@ -25,13 +65,15 @@ async def fetch_universities_by_country(country: str, limit: int = 100) -> List[
 
 async def fetch_universities_by_name(name: str) -> List[dict]:
     """Fetch universities from free Hipolabs API by name"""
+    import httpx
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{UNIVERSITIES_API_BASE}/search",
-                params={"name": name}
-            )
-            response.raise_for_status()
+            with track_upstream("hipolabs", "search_by_name"):
+                response = await client.get(
+                    f"{UNIVERSITIES_API_BASE}/search",
+                    params={"name": name}
+                )
+                response.raise_for_status()
             return response.json()
     except Exception as e:
         print(f"Error fetching universities: {e}")
@@ -40,43 +82,11 @@ async def fetch_universities_by_name(name: str) -> List[dict]:
 def transform_api_data_to_university(api_data: dict, country: str) -> dict:
     """Transform API data to our University model format"""
     
-    # Standardize country names to match profile options
-    country_mapping = {
-        "United States": "USA",
-        "United Kingdom": "UK",
-        "United States of America": "USA"
-    }
-    
-    # Estimate tuition based on country (rough estimates)
-    tuition_estimates = {
-        "United States": (30000, 60000),
-        "United Kingdom": (20000, 40000),
-        "USA": (30000, 60000),
-        "UK": (20000, 40000),
-        "Canada": (15000, 35000),
-        "Australia": (20000, 45000),
-        "Germany": (0, 3000),
-        "Netherlands": (8000, 20000),
-        "France": (2000, 15000),
-        "Sweden": (0, 2000),
-        "Norway": (0, 1000),
-        "India": (2000, 10000),
-        "China": (3000, 15000),
-        "Japan": (5000, 20000),
-        "Singapore": (15000, 35000),
-        "South Korea": (5000, 18000),
-        "Switzerland": (1000, 8000),
-        "New Zealand": (18000, 35000),
-        "Ireland": (12000, 25000),
-        "Italy": (2000, 12000),
-        "Spain": (1500, 10000)
-    }
-    
     # Get standardized country name
     api_country = api_data.get("country", country)
-    standardized_country = country_mapping.get(api_country, api_country)
+    standardized_country = COUNTRY_MAPPING.get(api_country, api_country)
     
-    tuition_min, tuition_max = tuition_estimates.get(country, tuition_estimates.get(standardized_country, (5000, 25000)))
+    tuition_min, tuition_max = TUITION_ESTIMATES.get(country, TUITION_ESTIMATES.get(standardized_country, (5000, 25000)))
     
     # Estimate acceptance rate (varies by country/type)
     acceptance_rate = 30.0  # Default
@@ -141,6 +151,7 @@ async def import_universities_from_api(db: Session, countries: List[str], limit_
         
         print(f"Received {len(api_universities)} universities from API for {api_country}")
         
+        new_universities = []
         for api_uni in api_universities:
             # Transform first to get standardized country name
             uni_data = transform_api_data_to_university(api_uni, api_country)
@@ -157,8 +168,13 @@ async def import_universities_from_api(db: Session, countries: List[str], limit_
             # Create university
             university = University(**uni_data)
             db.add(university)
+            new_universities.append(university)
             imported_count += 1
         
+        db.flush()
+        refresh_recommendations_for_universities(db, [u.id for u in new_universities])
+        if new_universities:
+            bump_versions(db, CATALOG)
         db.commit()
         print(f"Imported {imported_count} new universities from {api_country}")
     
@@ -0,0 +1,69 @@
+"""
+In-process hooks for changes to a user's data.
+
+Handlers call notify_user_change(db, user_id, kind, ...) after mutating a
+user's profile, shortlist or todos. Subscribers registered with
+@on_user_change run either immediately, inside the same transaction, or once
+the session commits (after_commit=True). After-commit subscribers must not
+emit SQL on the session they are given; rolled-back changes never reach them.
+"""
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PROFILE = "profile"
+SHORTLIST = "shortlist"
+TODOS = "todos"
+DOCUMENTS = "documents"
+
+_PENDING_KEY = "pending_user_events"
+
+_in_transaction: List[Tuple[Set[str], Callable]] = []
+_after_commit: List[Tuple[Set[str], Callable]] = []
+
+
+def on_user_change(*kinds: str, after_commit: bool = False):
+    """Register fn(db, user_id, kinds) for the given change kinds"""
+    def decorator(fn):
+        (_after_commit if after_commit else _in_transaction).append((set(kinds), fn))
+        return fn
+    return decorator
+
+
+def notify_user_change(db: Session, user_id: int, *kinds: str):
+    changed = set(kinds)
+    for subscribed, fn in _in_transaction:
+        matched = subscribed & changed
+        if matched:
+            fn(db, user_id, matched)
+
+    if _after_commit:
+        pending: Dict[int, Set[str]] = db.info.setdefault(_PENDING_KEY, defaultdict(set))
+        pending[user_id] |= changed
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for user_id, changed in pending.items():
+        for subscribed, fn in _after_commit:
+            matched = subscribed & changed
+            if not matched:
+                continue
+            try:
+                fn(session, user_id, matched)
+            except Exception as e:
+                # The change is already committed; a failing subscriber must not fail the request
+                logger.error(f"User change subscriber {fn.__name__} failed: {str(e)}", exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,53 @@
+"""
+Helpers for tests that guard the number of SQL statements a route issues.
+
+    with query_budget(8):
+        client.get("/api/dashboard/", headers=headers)
+
+    assert_route_query_budget(client, "GET", "/api/dashboard/", 8, headers=headers)
+
+Statements are counted on every engine and thread for the duration of the
+block (TestClient runs the app in its own thread), so run one request at a time.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.middleware.sql_stats import RequestQueryStats
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _describe(stats: RequestQueryStats, limit: int = 10) -> str:
+    lines = [f"  {count}x {shape[:160]}" for shape, count in stats.shapes.most_common(limit)]
+    return "\n".join(lines)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "block"):
+    """Fail with the most frequent statement shapes when the block runs more than max_queries"""
+    stats = RequestQueryStats()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        stats.record(statement, 0.0)
+
+    event.listen(Engine, "after_cursor_execute", count)
+    try:
+        yield stats
+    finally:
+        event.remove(Engine, "after_cursor_execute", count)
+
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{label} ran {stats.count} SQL statements, budget is {max_queries}:\n{_describe(stats)}"
+        )
+
+
+def assert_route_query_budget(client, method: str, url: str, max_queries: int, **kwargs):
+    """Issue one request through a TestClient and check its statement count; returns the response"""
+    with query_budget(max_queries, label=f"{method} {url}"):
+        response = client.request(method, url, **kwargs)
+    return response
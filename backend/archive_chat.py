@@ -0,0 +1,24 @@
+"""
+Move old counselor chat messages into compressed monthly archives.
+
+Usage: python archive_chat.py [older_than_days]
+Defaults to CHAT_ARCHIVE_AFTER_DAYS (90). Safe to run repeatedly, e.g. from a daily cron.
+"""
+import sys
+import time
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.chat_archive import archive_old_messages
+
+days = int(sys.argv[1]) if len(sys.argv) > 1 else get_settings().chat_archive_after_days
+
+print(f" Archiving chat messages older than {days} days...")
+start = time.perf_counter()
+
+db = SessionLocal()
+try:
+    moved = archive_old_messages(db, days)
+finally:
+    db.close()
+
+print(f" Archived {moved} messages in {time.perf_counter() - start:.1f}s")
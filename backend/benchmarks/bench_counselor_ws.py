@@ -0,0 +1,61 @@
+"""
+Counselor throughput: REST /api/counselor/chat versus the /api/counselor/ws channel.
+
+Both paths generate the same reply and persist the same rows; the WebSocket
+skips the per-message JWT decode, user SELECT and profile reload.
+
+Usage: python -m benchmarks.bench_counselor_ws [messages]
+"""
+import sys
+import time
+
+from benchmarks.common import use_temporary_sqlite, create_app_client, signup_and_login
+
+QUESTIONS = [
+    "How do I choose the right university?",
+    "What are the visa requirements?",
+    "How long does visa processing take?",
+    "How do I compare different universities?",
+]
+
+
+def bench_rest(client, headers, count):
+    start = time.perf_counter()
+    for i in range(count):
+        response = client.post("/api/counselor/chat", json={"message": QUESTIONS[i % len(QUESTIONS)]}, headers=headers)
+        response.raise_for_status()
+    return count / (time.perf_counter() - start)
+
+
+def bench_ws(client, token, count):
+    with client.websocket_connect(f"/api/counselor/ws?token={token}") as ws:
+        ws.receive_json()  # session
+        ws.receive_json()  # history
+        start = time.perf_counter()
+        for i in range(count):
+            ws.send_json({"type": "chat", "message": QUESTIONS[i % len(QUESTIONS)]})
+            while ws.receive_json()["type"] != "conversation":
+                pass
+        return count / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    use_temporary_sqlite()
+    client = create_app_client()
+    headers = signup_and_login(client, "ws-bench@example.com")
+    token = headers["Authorization"].split()[1]
+
+    # Warm up both paths
+    bench_rest(client, headers, 10)
+    bench_ws(client, token, 10)
+
+    rest = bench_rest(client, headers, count)
+    ws = bench_ws(client, token, count)
+    print(f"messages: {count}")
+    print(f"REST      {rest:8.1f} msg/s")
+    print(f"WebSocket {ws:8.1f} msg/s  ({ws / rest:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
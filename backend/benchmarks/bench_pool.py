@@ -0,0 +1,154 @@
+"""
+Connection checkout latency under concurrency for each pooling strategy
+(app/database.py): the old per-checkout pool_pre_ping, the queue pool with
+error-driven reconnects, a small pool behind an external pooler, and no pooling.
+
+By default the database is simulated: SQLite connections wrapped so that every
+statement costs one network round trip (--rtt-ms) and opening a connection
+costs --connect-ms (TLS and auth to a serverless endpoint are slow; a pooler
+close by is faster: --pooler-connect-ms). Pass --url to measure a real Postgres
+instead, e.g. a Neon endpoint and its -pooler endpoint with --pooler-url.
+
+Usage: python -m benchmarks.bench_pool [--threads 4,16,32] [--iterations 200]
+"""
+import argparse
+import sqlite3
+import statistics
+import threading
+import time
+
+from benchmarks.common import use_temporary_sqlite
+
+
+class SlowCursor:
+    def __init__(self, cursor, rtt: float):
+        self._cursor = cursor
+        self._rtt = rtt
+
+    def execute(self, *args, **kwargs):
+        time.sleep(self._rtt)
+        return self._cursor.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SlowConnection:
+    """sqlite3 connection with simulated network latency"""
+
+    def __init__(self, connection, rtt: float):
+        object.__setattr__(self, "_connection", connection)
+        object.__setattr__(self, "_rtt", rtt)
+
+    def cursor(self, *args, **kwargs):
+        return SlowCursor(self._connection.cursor(*args, **kwargs), self._rtt)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection, name, value)
+
+
+def simulated_creator(connect_ms: float, rtt_ms: float):
+    def creator():
+        time.sleep(connect_ms / 1000)
+        return SlowConnection(sqlite3.connect(":memory:", check_same_thread=False), rtt_ms / 1000)
+    return creator
+
+
+def build_engine(strategy: str, args):
+    from sqlalchemy import create_engine
+    from app.database import install_reconnect_handling, pool_options, pooler_connect_args
+
+    behind_pooler = strategy in ("external", "null")
+    url = (args.pooler_url or args.url) if behind_pooler else args.url
+    if strategy == "pre_ping":
+        options = dict(pool_options("queue", args.pool_size, args.max_overflow), pool_pre_ping=True)
+    elif strategy == "queue":
+        options = pool_options("queue", args.pool_size, args.max_overflow)
+    else:
+        options = pool_options(strategy, args.external_pool_size)
+
+    if url:
+        engine = create_engine(url, connect_args=pooler_connect_args(url) if behind_pooler else {}, **options)
+    else:
+        connect_ms = args.pooler_connect_ms if behind_pooler else args.connect_ms
+        engine = create_engine("sqlite://", creator=simulated_creator(connect_ms, args.rtt_ms), **options)
+    if strategy != "null" and strategy != "pre_ping":
+        install_reconnect_handling(engine, ping_idle_seconds=60)
+    return engine
+
+
+def run(engine, threads: int, iterations: int) -> dict:
+    from sqlalchemy import text
+
+    checkouts, totals = [], []
+    lock = threading.Lock()
+
+    def worker():
+        local_checkouts, local_totals = [], []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            with engine.connect() as connection:
+                checked_out = time.perf_counter()
+                connection.execute(text("SELECT 1")).scalar()
+            local_checkouts.append((checked_out - started) * 1000)
+            local_totals.append((time.perf_counter() - started) * 1000)
+        with lock:
+            checkouts.extend(local_checkouts)
+            totals.extend(local_totals)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    checkouts.sort()
+    return {
+        "checkout_p50": statistics.median(checkouts),
+        "checkout_p99": checkouts[int(len(checkouts) * 0.99) - 1],
+        # The pool's wait queue is not fair: a few checkouts wait very long while
+        # most get a just-returned connection at once, so look at the mean too
+        "checkout_mean": statistics.fmean(checkouts),
+        "request_p50": statistics.median(totals),
+        "throughput": len(totals) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", default="4,16,32", help="comma-separated concurrency levels")
+    parser.add_argument("--iterations", type=int, default=200, help="checkouts per thread")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument("--external-pool-size", type=int, default=2)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="simulated round trip per statement")
+    parser.add_argument("--connect-ms", type=float, default=40.0, help="simulated connect time, direct")
+    parser.add_argument("--pooler-connect-ms", type=float, default=4.0, help="simulated connect time, via pooler")
+    parser.add_argument("--url", help="real database URL (direct)")
+    parser.add_argument("--pooler-url", help="real database URL through the external pooler")
+    args = parser.parse_args()
+    use_temporary_sqlite()
+
+    if args.url:
+        print(f"Database: {args.url.split('@')[-1]}")
+    else:
+        print(f"Simulated database: {args.rtt_ms}ms per statement, connect {args.connect_ms}ms "
+              f"direct / {args.pooler_connect_ms}ms via pooler")
+    print(f"{'strategy':<10} {'threads':>7} {'checkout p50':>13} {'p99':>10} {'mean':>10} {'request p50':>12} {'req/s':>8}")
+    for threads in [int(t) for t in args.threads.split(",")]:
+        for strategy in ("pre_ping", "queue", "external", "null"):
+            engine = build_engine(strategy, args)
+            run(engine, threads, 5)  # fill the pool
+            result = run(engine, threads, args.iterations)
+            engine.dispose()
+            print(f"{strategy:<10} {threads:>7} {result['checkout_p50']:>11.2f}ms {result['checkout_p99']:>8.2f}ms "
+                  f"{result['checkout_mean']:>8.2f}ms {result['request_p50']:>10.2f}ms {result['throughput']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
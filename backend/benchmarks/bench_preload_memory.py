@@ -0,0 +1,87 @@
+"""
+Per-worker memory of gunicorn with and without preloading (gunicorn.conf.py).
+
+Generates a SQLite dataset with a large catalog, then starts gunicorn twice,
+GUNICORN_PRELOAD=true and =false, sends each worker some traffic and reads
+/proc/<pid>/smaps_rollup of the master and every worker. RSS counts shared
+copy-on-write pages in every process; PSS divides them between the sharers,
+so the PSS total is what the whole server really uses. Linux only.
+
+Usage: python -m benchmarks.bench_preload_memory [workers] [catalog]
+"""
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BACKEND_DIR, use_temporary_sqlite
+from benchmarks.loadtest import free_port
+
+
+def children(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def run(preload: bool, workers: int) -> dict:
+    import httpx
+    from app.metrics import process_memory
+
+    port = free_port()
+    env = dict(os.environ, GUNICORN_PRELOAD="true" if preload else "false",
+               WEB_CONCURRENCY=str(workers), PORT=str(port), METRICS_ENABLED="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(BACKEND_DIR, "gunicorn.conf.py"),
+         "--pythonpath", BACKEND_DIR, "--log-level", "warning", "main:app"],
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200 and len(children(process.pid)) == workers:
+                    break
+            except (httpx.TransportError, OSError):
+                pass
+            time.sleep(0.5)
+        else:
+            raise RuntimeError("gunicorn did not start")
+        # Give every worker time to finish its lifespan startup, then some traffic
+        time.sleep(3)
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            for _ in range(200 * workers):
+                client.get("/health")
+        return {
+            "master": process_memory(process.pid),
+            "workers": [process_memory(pid) for pid in children(process.pid)],
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    if not sys.platform.startswith("linux"):
+        sys.exit("Needs /proc (Linux)")
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    catalog = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    use_temporary_sqlite()
+
+    from app.database import create_tables
+    from benchmarks.dataset import generate_dataset
+    create_tables()
+    generate_dataset(users=20, catalog=catalog)
+
+    mb = 2 ** 20
+    for preload in (False, True):
+        result = run(preload, workers)
+        print(f"\nGUNICORN_PRELOAD={'true' if preload else 'false'} ({workers} workers, {catalog} universities)")
+        print(f"  {'process':<10} {'rss':>9} {'pss':>9} {'private':>9} {'shared':>9}")
+        for name, memory in [("master", result["master"])] + [(f"worker {i}", m) for i, m in enumerate(result["workers"])]:
+            print(f"  {name:<10} " + " ".join(f"{memory[kind] / mb:>7.1f}MB" for kind in ("rss", "pss", "private", "shared")))
+        processes = [result["master"]] + result["workers"]
+        print(f"  {'total':<10} {sum(m['rss'] for m in processes) / mb:>7.1f}MB {sum(m['pss'] for m in processes) / mb:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
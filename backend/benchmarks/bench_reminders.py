@@ -0,0 +1,89 @@
+"""
+Deadline reminder scheduler over a large todo table.
+
+Seeds N todos with due dates spread over the next --days (a share of them
+completed), then drives DeadlineScheduler with a FakeClock through one
+simulated day, ticking every --tick-seconds. Reported: how many rows the
+scheduler read compared to the table size, the most reminders it held in
+memory, reminders written, and tick latency.
+
+Usage: python -m benchmarks.bench_reminders [--todos 1000000] [--days 60] [--tick-seconds 60]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_temporary_sqlite
+
+
+def seed(todos: int, days: int, start: datetime, users: int = 1000):
+    from sqlalchemy import insert
+    from app.database import SessionLocal
+    from app.models import TodoItem, User
+
+    rng = random.Random(7)
+    # Rows changed before the scheduler starts are the window's job, not catch-up's
+    changed = datetime.utcnow() - timedelta(days=1)
+    db = SessionLocal()
+    db.execute(insert(User), [
+        {"full_name": "Bench User", "email": f"user{i}@bench", "hashed_password": "x"} for i in range(users)
+    ])
+    for offset in range(0, todos, 50000):
+        db.execute(insert(TodoItem), [
+            {
+                "user_id": rng.randint(1, users),
+                "title": "Benchmark task",
+                "priority": "Medium",
+                "category": "Applications",
+                "is_completed": rng.random() < 0.3,
+                "due_date": start + timedelta(seconds=rng.randint(-86400, days * 86400)),
+                "created_at": start,
+                "updated_at": changed,
+            }
+            for _ in range(min(50000, todos - offset))
+        ])
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--todos", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=60, help="due dates are spread over this many days")
+    parser.add_argument("--tick-seconds", type=int, default=60)
+    args = parser.parse_args()
+
+    use_temporary_sqlite()
+    from app.database import SessionLocal, create_tables
+    from app.services.reminders import DeadlineScheduler, FakeClock
+
+    create_tables()
+    start = datetime(2026, 3, 1)
+    began = time.perf_counter()
+    seed(args.todos, args.days, start)
+    print(f" Seeded {args.todos} todos over {args.days} days in {time.perf_counter() - began:.1f}s")
+
+    clock = FakeClock(start)
+    scheduler = DeadlineScheduler(SessionLocal, clock=clock, horizon=timedelta(hours=1))
+    durations = []
+    most_pending = 0
+    for _ in range(86400 // args.tick_seconds):
+        began = time.perf_counter()
+        scheduler.tick()
+        durations.append(time.perf_counter() - began)
+        most_pending = max(most_pending, scheduler.pending())
+        clock.advance(seconds=args.tick_seconds)
+
+    durations.sort()
+    print(f" {len(durations)} ticks over one simulated day")
+    print(f"   rows read:           {scheduler.loaded_rows} of {args.todos} ({scheduler.loaded_rows / args.todos:.1%})")
+    print(f"   most held in memory: {most_pending} reminders")
+    print(f"   reminders written:   {scheduler.emitted}")
+    print(f"   tick p50 / p99 / max: {statistics.median(durations) * 1000:.1f} / "
+          f"{durations[int(len(durations) * 0.99)] * 1000:.1f} / {durations[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
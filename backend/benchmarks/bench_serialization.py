@@ -0,0 +1,199 @@
+"""
+Response serialization CPU: response_model validation + json versus app/serializers.py + orjson.
+
+The ORM rows for each endpoint are loaded once, then rendered repeatedly both
+ways, so the numbers are serialization cost only (process CPU time, no SQL).
+Each pair of payloads is also compared to make sure the fast path returns the
+same JSON as the schema path.
+
+Usage: python -m benchmarks.bench_serialization [iterations]
+"""
+import json
+import sys
+import time
+
+from benchmarks.common import use_temporary_sqlite, create_app_client, signup_and_login
+
+CATALOG_SIZE = 500
+SHORTLIST_SIZE = 12
+LOCKED = 3
+CHAT_TURNS = 100
+
+
+def seed_catalog(db):
+    from app.models import University
+    db.add_all([
+        University(
+            name=f"Benchmark University {i}",
+            country=["USA", "UK", "Canada", "Germany"][i % 4],
+            city="Springfield",
+            ranking=i + 1,
+            acceptance_rate=5 + i % 60,
+            tuition_fee_min=10000 + i * 50,
+            tuition_fee_max=20000 + i * 80,
+            fields_offered=json.dumps(["Computer Science", "Engineering", "Business", "Data Science"]),
+            programs=json.dumps(["MS Computer Science", "MBA", "MS Data Science"]),
+            requirements=json.dumps({"ielts": 6.5, "toefl": 90, "gre": 310, "gpa": 3.0}),
+            description="A research university used for serialization benchmarks. " * 3,
+            website_url=f"https://bench{i}.example.edu",
+        )
+        for i in range(CATALOG_SIZE)
+    ])
+    db.commit()
+
+
+def seed_user_data(client, headers):
+    from app.database import SessionLocal
+    from app.models import User
+    from app.services.chat_persistence import save_chat_turn
+
+    ids = [u["id"] for u in client.get("/api/universities/search", headers=headers).json()[:SHORTLIST_SIZE]]
+    client.post("/api/universities/shortlist/batch", json={"university_ids": ids}, headers=headers).raise_for_status()
+    client.post("/api/universities/lock/batch", json={"university_ids": ids[:LOCKED]}, headers=headers).raise_for_status()
+
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).filter(User.email == "serialize-bench@example.com").scalar()
+        for i in range(CHAT_TURNS):
+            save_chat_turn(db, user_id, [
+                {"role": "user", "message": f"Question {i} about visas and deadlines?"},
+                {"role": "assistant", "message": "Here is a detailed answer. " * 20, "action_type": "info"},
+            ])
+    finally:
+        db.close()
+    return user_id
+
+
+def load_rows(db, user_id):
+    from app.models import User, UserProfile, University, TodoItem, ShortlistedUniversity, UniversityDocument
+    from app.services.chat_archive import get_history_page
+
+    user = db.get(User, user_id)
+    shortlisted = db.query(ShortlistedUniversity, University).join(
+        University, University.id == ShortlistedUniversity.university_id
+    ).filter(ShortlistedUniversity.user_id == user_id).order_by(ShortlistedUniversity.id).all()
+    locked_ids = [s.id for s, _ in shortlisted if s.is_locked]
+    return {
+        "user": user,
+        "profile": db.query(UserProfile).filter(UserProfile.user_id == user_id).one(),
+        "todos": db.query(TodoItem).filter(TodoItem.user_id == user_id, TodoItem.is_completed == False).all(),
+        "shortlisted": shortlisted,
+        "documents": db.query(UniversityDocument).filter(UniversityDocument.shortlisted_university_id.in_(locked_ids)).all(),
+        "universities": db.query(University).all(),
+        "history": list(reversed(get_history_page(db, user_id, limit=200))),
+    }
+
+
+def schema_renderers(rows):
+    """What FastAPI does with response_model: validate from attributes, dump, json.dumps"""
+    from typing import List
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from app.schemas import (
+        DashboardResponse, UserResponse, ProfileResponse, TodoResponse, ShortlistedUniversityResponse,
+        CommittedUniversityData, UniversityDocumentResponse, UniversityResponse, ChatMessageResponse
+    )
+
+    universities = TypeAdapter(List[UniversityResponse])
+    history = TypeAdapter(List[ChatMessageResponse])
+    dashboard = TypeAdapter(DashboardResponse)
+
+    def render_dashboard():
+        todos = [TodoResponse.model_validate(t) for t in rows["todos"]]
+        committed = [
+            CommittedUniversityData(
+                shortlisted_university=ShortlistedUniversityResponse.model_validate(s),
+                tasks=[t for t in todos if u.name in t.title],
+                documents=[UniversityDocumentResponse.model_validate(d) for d in rows["documents"] if d.shortlisted_university_id == s.id]
+            )
+            for s, u in rows["shortlisted"] if s.is_locked
+        ]
+        content = DashboardResponse(
+            user=UserResponse.model_validate(rows["user"]),
+            profile=ProfileResponse.model_validate(rows["profile"]),
+            todos=todos,
+            shortlisted_universities=[ShortlistedUniversityResponse.model_validate(s) for s, _ in rows["shortlisted"]],
+            locked_universities_count=len(committed),
+            committed_universities=committed
+        )
+        # FastAPI validates the returned model against response_model once more
+        return JSONResponse(dashboard.dump_python(dashboard.validate_python(content, from_attributes=True), mode="json")).body
+
+    return {
+        "dashboard": render_dashboard,
+        "search": lambda: JSONResponse(universities.dump_python(
+            universities.validate_python(rows["universities"], from_attributes=True), mode="json")).body,
+        "history": lambda: JSONResponse(history.dump_python(
+            history.validate_python(rows["history"]), mode="json")).body,
+    }
+
+
+def fast_renderers(rows):
+    from fastapi.responses import ORJSONResponse
+    from app.serializers import (
+        serialize_user, serialize_profile, serialize_todo, serialize_shortlisted, serialize_document,
+        serialize_universities, serialize_history_message
+    )
+
+    def render_dashboard():
+        todos = [serialize_todo(t) for t in rows["todos"]]
+        shortlisted = {s.id: serialize_shortlisted(s, u) for s, u in rows["shortlisted"]}
+        committed = [
+            {
+                "shortlisted_university": shortlisted[s.id],
+                "tasks": [t for t in todos if u.name in t["title"]],
+                "documents": [serialize_document(d) for d in rows["documents"] if d.shortlisted_university_id == s.id]
+            }
+            for s, u in rows["shortlisted"] if s.is_locked
+        ]
+        return ORJSONResponse({
+            "user": serialize_user(rows["user"]),
+            "profile": serialize_profile(rows["profile"]),
+            "todos": todos,
+            "shortlisted_universities": list(shortlisted.values()),
+            "locked_universities_count": len(committed),
+            "committed_universities": committed
+        }).body
+
+    return {
+        "dashboard": render_dashboard,
+        "search": lambda: ORJSONResponse(serialize_universities(rows["universities"])).body,
+        "history": lambda: ORJSONResponse([serialize_history_message(m) for m in rows["history"]]).body,
+    }
+
+
+def cpu_per_call(render, iterations):
+    render()
+    start = time.process_time()
+    for _ in range(iterations):
+        render()
+    return (time.process_time() - start) / iterations * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    use_temporary_sqlite()
+    client = create_app_client()
+
+    from app.database import SessionLocal
+    db = SessionLocal()
+    seed_catalog(db)
+    headers = signup_and_login(client, "serialize-bench@example.com")
+    user_id = seed_user_data(client, headers)
+    rows = load_rows(db, user_id)
+
+    before, after = schema_renderers(rows), fast_renderers(rows)
+    print(f"catalog: {CATALOG_SIZE} universities, shortlist: {SHORTLIST_SIZE} ({LOCKED} locked), "
+          f"history: {len(rows['history'])} messages, iterations: {iterations}")
+    print(f"{'endpoint':<10} {'bytes':>8} {'schema+json':>12} {'fast+orjson':>12}")
+    for name in before:
+        if json.loads(before[name]()) != json.loads(after[name]()):
+            raise SystemExit(f"{name}: fast serializer output differs from the response schema")
+        slow = cpu_per_call(before[name], iterations)
+        fast = cpu_per_call(after[name], iterations)
+        print(f"{name:<10} {len(after[name]()):>8} {slow:>9.3f} ms {fast:>9.3f} ms  ({slow / fast:.1f}x)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+SQLite under concurrent reads and writes: the plain engine (rollback journal,
+synchronous=FULL, pooled connections that all write) against the tuned mode
+of app/database.py (WAL, tuned pragmas, one writer connection plus a reader
+pool per process).
+
+Several processes (like gunicorn workers), each with several threads, run a
+mix of todo list reads and todo inserts/updates on one database file for a
+fixed time. Reported: operations per second, latency percentiles per kind and
+operations that failed with "database is locked".
+
+Usage: python -m benchmarks.bench_sqlite [--processes 4] [--threads 8] [--seconds 10] [--write-ratio 0.1]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.common import use_temporary_sqlite
+
+MODES = ("default", "tuned")
+
+
+def make_session_factory(mode: str, path: str, threads: int):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.database import RoutingSession, create_sqlite_engines
+
+    url = f"sqlite:///{path}"
+    if mode == "default":
+        # What USE_SQLITE did before the tuned mode (SQLITE_TUNED=false)
+        engine = create_engine(url, connect_args={"check_same_thread": False},
+                               pool_size=threads, max_overflow=0)
+        return sessionmaker(bind=engine, autoflush=False)
+    writer, reader = create_sqlite_engines(url, readers=threads)
+    return sessionmaker(class_=RoutingSession, bind=writer, reader=reader, autoflush=False)
+
+
+def read_todos(db, user_id: int):
+    from app.models import TodoItem
+    todos = db.query(TodoItem).filter(TodoItem.user_id == user_id).order_by(TodoItem.id.desc()).limit(20).all()
+    return len(todos)
+
+
+def write_todo(db, user_id: int, rng: random.Random):
+    from app.models import TodoItem
+    db.add(TodoItem(user_id=user_id, title="Benchmark task", priority="Medium", category="Applications",
+                    created_at=datetime.utcnow()))
+    todo = db.query(TodoItem).filter(TodoItem.user_id == user_id).first()
+    if todo is not None:
+        todo.is_completed = rng.random() < 0.5
+    db.commit()
+
+
+def worker_process(mode: str, path: str, threads: int, seconds: float, write_ratio: float,
+                   users: int, seed: int, results):
+    make_session = make_session_factory(mode, path, threads)
+    latencies = {"read": [], "write": []}
+    errors = {"locked": 0, "other": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def run(thread_seed: int):
+        rng = random.Random(thread_seed)
+        local = {"read": [], "write": []}
+        local_errors = {"locked": 0, "other": 0}
+        while time.monotonic() < deadline:
+            kind = "write" if rng.random() < write_ratio else "read"
+            user_id = rng.randint(1, users)
+            started = time.perf_counter()
+            db = make_session()
+            try:
+                if kind == "write":
+                    write_todo(db, user_id, rng)
+                else:
+                    read_todos(db, user_id)
+                local[kind].append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                db.rollback()
+                local_errors["locked" if "locked" in str(e) else "other"] += 1
+                if os.getenv("BENCH_VERBOSE"):
+                    print(f"{kind}: {e}")
+            finally:
+                db.close()
+        with lock:
+            for kind in local:
+                latencies[kind].extend(local[kind])
+            for kind in local_errors:
+                errors[kind] += local_errors[kind]
+
+    pool = [threading.Thread(target=run, args=(seed * 1000 + i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put({"latencies": latencies, "errors": errors})
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_mode(mode: str, path: str, args) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker_process,
+                        args=(mode, path, args.threads, args.seconds, args.write_ratio, args.users, i, results))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = {"read": [], "write": []}
+    errors = {"locked": 0, "other": 0}
+    for result in collected:
+        for kind in latencies:
+            latencies[kind].extend(result["latencies"][kind])
+        for kind in errors:
+            errors[kind] += result["errors"][kind]
+    return {"latencies": latencies, "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="threads per process")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+    workdir = use_temporary_sqlite()
+    # Seed with the plain engine, so the file starts out in the default rollback journal mode
+    os.environ["SQLITE_TUNED"] = "false"
+
+    from benchmarks.dataset import generate_dataset
+    from app.database import dispose_engine
+    generate_dataset(users=args.users, catalog=200)
+    dispose_engine()
+
+    print(f"{args.processes} processes x {args.threads} threads, {args.seconds:.0f}s, "
+          f"{args.write_ratio:.0%} writes")
+    print(f"{'mode':<8} {'ops/s':>8} {'read p50':>9} {'p99':>8} {'write p50':>10} {'p99':>8} {'locked':>7} {'other':>6}")
+    for mode in MODES:
+        path = os.path.join(workdir, f"{mode}.db")
+        shutil.copy(os.path.join(workdir, "study_abroad.db"), path)
+        result = run_mode(mode, path, args)
+        reads, writes = result["latencies"]["read"], result["latencies"]["write"]
+        print(f"{mode:<8} {(len(reads) + len(writes)) / args.seconds:>8.0f} "
+              f"{statistics.median(reads) if reads else 0:>7.2f}ms {percentile(reads, 0.99):>6.1f}ms "
+              f"{statistics.median(writes) if writes else 0:>8.2f}ms {percentile(writes, 0.99):>6.1f}ms "
+              f"{result['errors']['locked']:>7} {result['errors']['other']:>6}")
+
+
+if __name__ == "__main__":
+    main()
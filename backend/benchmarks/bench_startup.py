@@ -0,0 +1,98 @@
+"""
+Cold start of one worker: fresh interpreter -> `import main` -> lifespan
+startup -> first request answered. Each run is a separate process, like a
+gunicorn worker booting, so nothing is shared between runs except the OS file
+cache and .pyc files.
+
+Usage: python -m benchmarks.bench_startup [runs] [--importtime]
+
+--importtime also prints the app modules that take longest to import
+(python -X importtime, cumulative microseconds).
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR, use_temporary_sqlite
+
+# Runs in the child process; prints one JSON line with the phase timings in ms
+WORKER = """
+import time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+# Plain ASGI calls: a test client would import httpx and skew the import numbers
+import asyncio
+
+async def boot():
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/health", "raw_path": b"/health", "query_string": b"",
+             "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)}
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        await main.app(scope, receive, send)
+        assert messages[0]["status"] == 200, messages[0]
+        return ready, time.perf_counter()
+
+ready, served = asyncio.run(boot())
+
+import json
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (served - ready) * 1000,
+    "total_ms": (served - started) * 1000,
+}))
+"""
+
+
+def run_worker(extra_args=()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", WORKER],
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR},
+        capture_output=True, text=True, check=True,
+    )
+
+
+def slowest_imports(stderr: str, limit: int = 15):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative), name.strip()))
+    app_rows = [row for row in rows if row[1] == "main" or row[1].startswith("app.")]
+    return sorted(app_rows, reverse=True)[:limit]
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    runs = int(args[0]) if args else 10
+    use_temporary_sqlite()
+
+    # One untimed run creates the SQLite tables and warms the .pyc and file caches
+    run_worker()
+
+    samples = [json.loads(run_worker().stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    print(f"Worker cold start over {runs} runs (median / max, ms)")
+    for phase in ("import_ms", "startup_ms", "first_request_ms", "total_ms"):
+        values = [sample[phase] for sample in samples]
+        print(f"  {phase[:-3]:16s} {statistics.median(values):8.1f} / {max(values):8.1f}")
+
+    if "--importtime" in sys.argv:
+        print("\nSlowest app imports (cumulative ms)")
+        for cumulative, name in slowest_imports(run_worker(["-X", "importtime"]).stderr):
+            print(f"  {cumulative / 1000:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
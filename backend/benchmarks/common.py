@@ -0,0 +1,62 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run in-process against a throwaway SQLite database, so they need no
+.env and never touch the configured Postgres database. Run them from the
+backend directory, e.g. `python -m benchmarks.bench_counselor_ws`.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ONBOARDING_DATA = {
+    "current_education_level": "Bachelor's",
+    "degree_major": "Computer Science",
+    "graduation_year": 2024,
+    "gpa_percentage": 3.6,
+    "intended_degree": "Master's",
+    "field_of_study": "Computer Science",
+    "target_intake_year": 2027,
+    "preferred_countries": ["USA", "UK", "Canada"],
+    "budget_min": 20000,
+    "budget_max": 60000,
+    "funding_plan": "SELF_FUNDED",
+    "ielts_toefl_status": "COMPLETED",
+    "ielts_toefl_score": 7.5,
+    "gre_gmat_status": "IN_PROGRESS",
+    "sop_status": "NOT_STARTED",
+}
+
+
+def use_temporary_sqlite() -> str:
+    """Point the app at a fresh SQLite file; must run before importing app modules"""
+    workdir = tempfile.mkdtemp(prefix="study-abroad-bench-")
+    os.chdir(workdir)
+    os.environ["USE_SQLITE"] = "true"
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./study_abroad.db")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("GEMINI_API_KEY", "unused")
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    return workdir
+
+
+def create_app_client():
+    from fastapi.testclient import TestClient
+    from app.database import create_tables
+    import main
+    # The app only creates tables in its lifespan, which a client used outside `with` never runs
+    create_tables()
+    return TestClient(main.app)
+
+
+def signup_and_login(client, email: str, onboard: bool = True) -> dict:
+    """Create a user (optionally onboarded) and return auth headers"""
+    client.post("/api/auth/signup", json={"full_name": "Bench User", "email": email, "password": "benchmark"})
+    token = client.post("/api/auth/login", json={"email": email, "password": "benchmark"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    if onboard:
+        client.post("/api/onboarding/complete", json=ONBOARDING_DATA, headers=headers)
+    return headers
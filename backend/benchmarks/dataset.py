@@ -0,0 +1,161 @@
+"""
+Deterministic benchmark dataset: users with onboarded profiles, shortlists
+(some locked, with documents), todos and chat history, plus a large
+university catalog. The same seed always produces the same rows.
+
+Rows are written with executemany inserts into a fresh database. Every user
+shares one password, BENCH_PASSWORD, hashed once. Materialized
+recommendations are not generated; they are built lazily on first use.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+BENCH_PASSWORD = "benchmark"
+
+COUNTRIES = ["USA", "UK", "Canada", "Germany", "Australia", "Netherlands", "Ireland", "France"]
+FIELDS = ["Computer Science", "Data Science", "Business", "Engineering", "Economics", "Medicine", "Law", "Design"]
+CITY_PARTS = ["North", "South", "East", "West", "New", "Port", "Lake", "Mount"]
+NAME_PARTS = ["Institute", "University", "College", "Polytechnic", "School"]
+QUESTIONS = [
+    "How do I choose the right university?",
+    "What are the visa requirements?",
+    "How long does visa processing take?",
+    "How do I compare different universities?",
+    "What should I put in my statement of purpose?",
+]
+
+
+def bench_email(index: int) -> str:
+    return f"bench-user-{index}@example.com"
+
+
+def shortlisted_pool(catalog: int) -> int:
+    """Generated shortlists only use university ids up to this one"""
+    return catalog // 2
+
+
+def _university_rows(rng: random.Random, count: int):
+    for i in range(1, count + 1):
+        country = COUNTRIES[i % len(COUNTRIES)]
+        fields = rng.sample(FIELDS, 3)
+        fee_min = rng.randrange(0, 45000, 500)
+        yield {
+            "id": i,
+            "name": f"{rng.choice(CITY_PARTS)} {country} {rng.choice(NAME_PARTS)} {i}",
+            "country": country,
+            "city": f"{rng.choice(CITY_PARTS)}ville",
+            "ranking": i,
+            "acceptance_rate": round(rng.uniform(4, 85), 1),
+            "tuition_fee_min": float(fee_min),
+            "tuition_fee_max": float(fee_min + rng.randrange(5000, 30000, 500)),
+            "fields_offered": json.dumps(fields),
+            "programs": json.dumps([f"MS {field}" for field in fields]),
+            "requirements": json.dumps({"ielts": rng.choice([6.0, 6.5, 7.0]), "gre": rng.choice([0, 300, 315]), "gpa": rng.choice([2.8, 3.0, 3.3])}),
+            "description": f"Generated benchmark university {i} in {country}.",
+            "website_url": f"https://bench-{i}.example.edu",
+        }
+
+
+def generate_dataset(users: int = 200, catalog: int = 50000, seed: int = 42,
+                     shortlist_size: int = 6, locked: int = 2, todos: int = 10, chat_turns: int = 20) -> dict:
+    """Populate the configured (empty) database; returns row counts per table"""
+    from app.auth_utils import get_password_hash
+    from app.database import Base, SessionLocal, engine
+    from app.models import (
+        User, UserProfile, University, ShortlistedUniversity, TodoItem, ChatMessage, UniversityDocument,
+        UserStage, ExamStatus, FundingType, ProfileStrength, UniversityCategory, DocumentType, DocumentStatus
+    )
+    from app.services.profile_counters import CATEGORY_COUNTERS, COUNTERS
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    counts = {}
+
+    db = SessionLocal()
+    try:
+        universities = list(_university_rows(rng, catalog))
+        for start in range(0, len(universities), 5000):
+            db.execute(insert(University), universities[start:start + 5000])
+        counts["universities"] = len(universities)
+
+        user_rows, profile_rows = [], []
+        shortlist_rows, todo_rows, chat_rows, document_rows = [], [], [], []
+        shortlist_id = 0
+        for user_id in range(1, users + 1):
+            user_rows.append({
+                "id": user_id, "full_name": f"Bench User {user_id}", "email": bench_email(user_id),
+                "hashed_password": password_hash, "created_at": now,
+            })
+            gpa = round(rng.uniform(2.5, 4.0), 2)
+            profile_rows.append({
+                "user_id": user_id, "onboarding_completed": True,
+                "current_stage": UserStage.PREPARING_APPLICATIONS if locked else UserStage.FINALIZING_UNIVERSITIES,
+                "current_education_level": "Bachelor's", "degree_major": rng.choice(FIELDS), "graduation_year": 2024,
+                "gpa_percentage": gpa, "intended_degree": "Master's", "field_of_study": rng.choice(FIELDS),
+                "target_intake_year": 2027, "preferred_countries": json.dumps(rng.sample(COUNTRIES, 3)),
+                "budget_min": 10000.0, "budget_max": float(rng.randrange(20000, 70000, 5000)),
+                "funding_plan": FundingType.SELF_FUNDED, "ielts_toefl_status": ExamStatus.COMPLETED,
+                "ielts_toefl_score": 7.0, "gre_gmat_status": ExamStatus.IN_PROGRESS, "sop_status": ExamStatus.NOT_STARTED,
+                "academic_strength": ProfileStrength.STRONG if gpa >= 3.5 else ProfileStrength.AVERAGE,
+                "exam_strength": ProfileStrength.AVERAGE, "overall_strength": ProfileStrength.AVERAGE,
+                "created_at": now, "updated_at": now,
+            })
+
+            # Denormalized counters (app/services/profile_counters.py), filled in below
+            counters = profile_rows[-1]
+            counters.update(dict.fromkeys(COUNTERS, 0))
+
+            # Only the first half of the catalog, so the shortlist scenario has free universities
+            for position, university_id in enumerate(rng.sample(range(1, shortlisted_pool(catalog) + 1), shortlist_size)):
+                shortlist_id += 1
+                is_locked = position < locked
+                category = rng.choice(list(UniversityCategory))
+                counters["shortlisted_count"] += 1
+                counters["locked_count"] += is_locked
+                counters[CATEGORY_COUNTERS[category]] += 1
+                shortlist_rows.append({
+                    "id": shortlist_id, "user_id": user_id, "university_id": university_id,
+                    "category": category, "is_locked": is_locked,
+                    "fit_reason": "Matches your field and budget", "risk_factors": None,
+                    "acceptance_chance": rng.choice(["Low", "Medium", "High"]), "cost_level": "Medium",
+                    "created_at": now, "locked_at": now if is_locked else None,
+                })
+                if is_locked:
+                    for document_type in (DocumentType.SOP, DocumentType.RESUME, DocumentType.TRANSCRIPTS):
+                        counters["pending_documents_count"] += 1
+                        document_rows.append({
+                            "user_id": user_id, "shortlisted_university_id": shortlist_id,
+                            "document_type": document_type, "status": DocumentStatus.DRAFTING,
+                            "due_date": now + timedelta(days=60), "created_at": now, "updated_at": now,
+                        })
+
+            for i in range(todos):
+                is_completed = rng.random() < 0.3
+                counters["open_todos_count"] += not is_completed
+                todo_rows.append({
+                    "user_id": user_id, "title": f"Benchmark task {i}", "description": "Generated task",
+                    "priority": rng.choice(["High", "Medium", "Low"]), "category": "Applications",
+                    "is_completed": is_completed, "due_date": now + timedelta(days=rng.randrange(1, 120)),
+                    "ai_generated": True, "created_at": now,
+                })
+
+            for i in range(chat_turns):
+                created_at = now - timedelta(minutes=chat_turns - i)
+                chat_rows.append({"user_id": user_id, "role": "user", "message": rng.choice(QUESTIONS), "created_at": created_at})
+                chat_rows.append({"user_id": user_id, "role": "assistant",
+                                  "message": "Here is what you should know. " * 25, "created_at": created_at})
+
+        for model, rows in ((User, user_rows), (UserProfile, profile_rows), (ShortlistedUniversity, shortlist_rows),
+                            (UniversityDocument, document_rows), (TodoItem, todo_rows), (ChatMessage, chat_rows)):
+            for start in range(0, len(rows), 5000):
+                db.execute(insert(model), rows[start:start + 5000])
+            counts[model.__tablename__] = len(rows)
+        db.commit()
+    finally:
+        db.close()
+    return counts
@@ -0,0 +1,252 @@
+"""
+Reproducible load test for the API.
+
+Generates a seeded SQLite dataset (benchmarks/dataset.py), then drives each
+scenario in benchmarks/scenarios.py with a pool of worker threads, either
+in-process through the ASGI app or against a real uvicorn server. Results
+(throughput, p50/p95/p99 latency, status codes) are written as JSON and can be
+compared with a stored baseline; the exit code is 1 when a scenario regressed
+by more than --tolerance.
+
+Usage:
+    python -m benchmarks.loadtest --output results.json
+    python -m benchmarks.loadtest --mode uvicorn --workers 2 --baseline benchmarks/baselines/local.json
+    python -m benchmarks.loadtest --users 50 --catalog 5000 --requests 100 --scenarios search,dashboard_polling
+
+Baselines are machine-specific: record one with --save-baseline on the machine
+that will run the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from benchmarks.common import BACKEND_DIR, use_temporary_sqlite
+
+DEFAULT_TOLERANCE = 0.15
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(client, ctx, scenario, requests: int, concurrency: int) -> dict:
+    latencies = []
+    statuses = Counter()
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            try:
+                status_code = scenario(client, ctx, i)
+            except Exception as e:
+                status_code = type(e).__name__
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed_ms)
+                statuses[str(status_code)] += 1
+                if not isinstance(status_code, int) or status_code >= 400:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(wall, 3),
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+        "status_counts": dict(statuses),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions of results against baseline"""
+    regressions = []
+    for key in ("mode", "workers", "users", "catalog", "requests", "concurrency"):
+        if baseline.get("meta", {}).get(key) != results["meta"][key]:
+            print(f"Warning: baseline {key}={baseline.get('meta', {}).get(key)} differs from this run ({results['meta'][key]})")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']:.1f} -> {current['throughput_rps']:.1f} req/s")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class UvicornServer:
+    """uvicorn serving main:app from the current (dataset) directory"""
+
+    def __init__(self, workers: int):
+        self.port = free_port()
+        self.workers = workers
+        self.process = None
+
+    def __enter__(self):
+        import httpx
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+             "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"],
+            env=os.environ.copy(),
+        )
+        base_url = f"http://127.0.0.1:{self.port}"
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {self.process.returncode}")
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                time.sleep(0.2)
+        else:
+            raise RuntimeError("uvicorn did not start within 60s")
+        self.client = httpx.Client(base_url=base_url, timeout=60, limits=httpx.Limits(max_connections=256))
+        return self.client
+
+    def __exit__(self, *exc):
+        self.client.close()
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against a generated SQLite dataset")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (uvicorn mode)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--catalog", type=int, default=50000, help="number of universities")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="iterations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads")
+    parser.add_argument("--scenarios", default="", help="comma-separated subset (default: all)")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--save-baseline", help="also write results to this baseline file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative regression")
+    args = parser.parse_args()
+    # Resolve before use_temporary_sqlite() changes into the dataset directory
+    for name in ("output", "baseline", "save_baseline"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    use_temporary_sqlite()
+
+    from benchmarks.dataset import generate_dataset
+    from benchmarks.scenarios import SCENARIOS, Context
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()] or list(SCENARIOS)
+    unknown = [name for name in selected if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+
+    started = time.perf_counter()
+    counts = generate_dataset(users=args.users, catalog=args.catalog, seed=args.seed)
+    print(f"Generated dataset in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(f"{table}={count}" for table, count in counts.items()))
+
+    ctx = Context(args.users, args.catalog)
+    if args.mode == "uvicorn":
+        server = UvicornServer(args.workers)
+    else:
+        from benchmarks.common import create_app_client
+        server = create_app_client()
+
+    results = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "uvicorn" else 1,
+            "users": args.users,
+            "catalog": args.catalog,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": {},
+    }
+
+    with server as client:
+        for name in selected:
+            scenario = SCENARIOS[name]
+            # Warm-up: first-use work (lazy recommendations, caches) is not what we measure
+            for i in range(min(args.users, 20)):
+                scenario(client, ctx, i)
+            stats = run_scenario(client, ctx, scenario, args.requests, args.concurrency)
+            results["scenarios"][name] = stats
+            print(f"{name:18s} {stats['throughput_rps']:8.1f} req/s  p50 {stats['p50_ms']:8.2f}  "
+                  f"p95 {stats['p95_ms']:8.2f}  p99 {stats['p99_ms']:8.2f} ms  errors {stats['errors']}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            print(f"Wrote {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Load-test scenarios. Each one is a function run(client, ctx, i) performing one
+iteration (a request, or a short flow of requests timed as a unit) and
+returning the final HTTP status code. Iterations are spread over users by
+index, so concurrent workers rarely act as the same user.
+"""
+import threading
+
+from benchmarks.dataset import BENCH_PASSWORD, QUESTIONS, COUNTRIES, CITY_PARTS, bench_email, shortlisted_pool
+
+FLOW_SHORTLIST_SIZE = 3
+
+
+class Context:
+    """Dataset shape and per-user auth headers shared by all workers"""
+
+    def __init__(self, users: int, catalog: int):
+        self.users = users
+        self.catalog = catalog
+        self.headers = {}
+        self.etags = {}
+        self._lock = threading.Lock()
+
+    def user_for(self, i: int) -> int:
+        return i % self.users + 1
+
+    def auth(self, user_id: int) -> dict:
+        headers = self.headers.get(user_id)
+        if headers is None:
+            # Minted directly: logging every user in would make setup cost a bcrypt hash per user
+            from app.auth_utils import create_access_token
+            from datetime import timedelta
+            token = create_access_token({"sub": bench_email(user_id), "uid": user_id}, timedelta(hours=6))
+            headers = self.headers[user_id] = {"Authorization": f"Bearer {token}"}
+        return headers
+
+    def etag(self, key):
+        with self._lock:
+            return self.etags.get(key)
+
+    def store_etag(self, key, etag):
+        if etag:
+            with self._lock:
+                self.etags[key] = etag
+
+
+def login_storm(client, ctx: Context, i: int) -> int:
+    """POST /api/auth/login; dominated by password hashing"""
+    response = client.post("/api/auth/login", json={"email": bench_email(ctx.user_for(i)), "password": BENCH_PASSWORD})
+    return response.status_code
+
+
+def dashboard_polling(client, ctx: Context, i: int) -> int:
+    """GET /api/dashboard/ revalidating with the last ETag, as the frontend poller does"""
+    user_id = ctx.user_for(i)
+    headers = dict(ctx.auth(user_id))
+    etag = ctx.etag(("dashboard", user_id))
+    if etag:
+        headers["If-None-Match"] = etag
+    response = client.get("/api/dashboard/", headers=headers)
+    ctx.store_etag(("dashboard", user_id), response.headers.get("etag"))
+    return response.status_code
+
+
+def counselor_chat(client, ctx: Context, i: int) -> int:
+    """POST /api/counselor/chat with a rotating question"""
+    response = client.post(
+        "/api/counselor/chat",
+        json={"message": QUESTIONS[i % len(QUESTIONS)]},
+        headers=ctx.auth(ctx.user_for(i)),
+    )
+    return response.status_code
+
+
+def search(client, ctx: Context, i: int) -> int:
+    """GET /api/universities/search with name, country and ranking filters"""
+    params = {"name": CITY_PARTS[i % len(CITY_PARTS)], "country": COUNTRIES[(i // len(CITY_PARTS)) % len(COUNTRIES)]}
+    if i % 2:
+        params["max_ranking"] = ctx.catalog // 10
+    response = client.get("/api/universities/search", params=params, headers=ctx.auth(ctx.user_for(i)))
+    return response.status_code
+
+
+def shortlist_flow(client, ctx: Context, i: int) -> int:
+    """Shortlist three universities, lock one, unlock it and remove all three again"""
+    headers = ctx.auth(ctx.user_for(i))
+    free = ctx.catalog - shortlisted_pool(ctx.catalog)
+    start = shortlisted_pool(ctx.catalog) + 1 + (i * FLOW_SHORTLIST_SIZE) % max(free - FLOW_SHORTLIST_SIZE, 1)
+    university_ids = list(range(start, start + FLOW_SHORTLIST_SIZE))
+
+    steps = [
+        lambda: client.post("/api/universities/shortlist/batch", json={"university_ids": university_ids}, headers=headers),
+        lambda: client.post("/api/universities/lock/batch", json={"university_ids": university_ids[:1]}, headers=headers),
+        lambda: client.post(f"/api/universities/unlock/{university_ids[0]}", headers=headers),
+    ] + [
+        (lambda university_id=university_id: client.delete(f"/api/universities/shortlist/{university_id}", headers=headers))
+        for university_id in university_ids
+    ]
+    for step in steps:
+        response = step()
+        if response.status_code >= 400:
+            return response.status_code
+    return response.status_code
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "dashboard_polling": dashboard_polling,
+    "counselor_chat": counselor_chat,
+    "search": search,
+    "shortlist_flow": shortlist_flow,
+}
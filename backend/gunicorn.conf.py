@@ -0,0 +1,21 @@
+"""
+gunicorn settings (gunicorn -c gunicorn.conf.py main:app).
+
+The app and its read-only reference data (app/preload.py) are loaded once in
+the master and shared copy-on-write by the forked workers. Set
+GUNICORN_PRELOAD=false to have every worker import the app and load its own
+copy instead, e.g. to compare memory with benchmarks/bench_preload_memory.py.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before the first fork
+    if preload_app:
+        from app.preload import preload_reference_data
+        preload_reference_data()
@@ -1,17 +1,67 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, onboarding, dashboard, counselor, universities, profile, todos
-from app.database import engine, Base
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from app.api import auth, onboarding, dashboard, counselor, universities, profile, todos, debug
+from app.config import get_settings
+from app.database import create_tables, dispose_engine, get_engine, use_sqlite
+from app.metrics import SnapshotWriter, collect, render_text
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.sql_stats import SQLStatsMiddleware, route_stats
+from app.preload import load_reference_data
+from app.services.chat_persistence import shutdown_write_behind
+from app.services import data_versions  # register user change handlers
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+settings = get_settings()
+
+metrics_writer = SnapshotWriter(settings.metrics_dir, settings.metrics_flush_interval_seconds) if settings.metrics_dir else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module opens no connections: the engine is built per worker at startup
+    get_engine()
+    if use_sqlite:
+        # Local development database; shared databases are migrated with `alembic upgrade head`
+        create_tables()
+    # Catalog and templates; already in memory when gunicorn preloaded them before fork
+    load_reference_data()
+    if metrics_writer:
+        metrics_writer.start()
+    yield
+    # Drain any chat turns still queued for write-behind persistence
+    shutdown_write_behind()
+    if metrics_writer:
+        metrics_writer.stop()
+    dispose_engine()
 
 app = FastAPI(
     title="Study Abroad Platform API",
     description="AI-powered study abroad planning platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Per-request query counts, N+1 warnings and per-route histograms
+app.add_middleware(
+    SQLStatsMiddleware,
+    debug_headers=settings.sql_debug,
+    n_plus_one_threshold=settings.sql_n_plus_one_threshold
 )
 
+# Latency, status and in-flight metrics per route template
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Per-request profiling (X-Profile: 1 plus X-Admin-Token); absent unless ADMIN_TOKEN is set
+if settings.admin_token:
+    app.add_middleware(ProfilingMiddleware, admin_token=settings.admin_token)
+
+# Compress large JSON responses (brotli when installed, else gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
 # CORS middleware - Allow all origins for now
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +79,7 @@ app.include_router(counselor.router, prefix="/api/counselor", tags=["AI Counselo
 app.include_router(universities.router, prefix="/api/universities", tags=["Universities"])
 app.include_router(profile.router, prefix="/api/profile", tags=["Profile"])
 app.include_router(todos.router, prefix="/api/todos", tags=["To-Do List"])
+app.include_router(debug.router, prefix="/debug", tags=["Debug"], include_in_schema=False)
 
 @app.get("/")
 async def root():
@@ -37,3 +88,15 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+if settings.metrics_enabled:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics():
+        """Prometheus text format; merged across workers when METRICS_DIR is set"""
+        return PlainTextResponse(render_text(collect(settings.metrics_dir)), media_type="text/plain; version=0.0.4")
+
+if settings.sql_debug:
+    @app.get("/debug/sql-stats")
+    async def sql_stats():
+        """Query count and DB time histograms per route since startup"""
+        return route_stats()
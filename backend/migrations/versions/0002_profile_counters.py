@@ -0,0 +1,47 @@
+"""profile counters
+
+Denormalized shortlist/todo/document counts on user_profiles, backfilled from
+the source tables (app/services/profile_counters.py keeps them current).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 14:02:11.406318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = {
+    'shortlisted_count': "SELECT COUNT(*) FROM shortlisted_universities s WHERE s.user_id = user_profiles.user_id",
+    'locked_count': "SELECT COUNT(*) FROM shortlisted_universities s WHERE s.user_id = user_profiles.user_id AND s.is_locked = true",
+    'dream_count': "SELECT COUNT(*) FROM shortlisted_universities s WHERE s.user_id = user_profiles.user_id AND s.category = 'DREAM'",
+    'target_count': "SELECT COUNT(*) FROM shortlisted_universities s WHERE s.user_id = user_profiles.user_id AND s.category = 'TARGET'",
+    'safe_count': "SELECT COUNT(*) FROM shortlisted_universities s WHERE s.user_id = user_profiles.user_id AND s.category = 'SAFE'",
+    'open_todos_count': "SELECT COUNT(*) FROM todo_items t WHERE t.user_id = user_profiles.user_id AND t.is_completed = false",
+    'pending_documents_count': "SELECT COUNT(*) FROM university_documents d WHERE d.user_id = user_profiles.user_id AND d.status != 'UPLOADED'",
+}
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('user_profiles', schema=None) as batch_op:
+        for name in COUNTERS:
+            batch_op.add_column(sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE user_profiles SET " + ", ".join(f"{name} = ({query})" for name, query in COUNTERS.items())
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user_profiles', schema=None) as batch_op:
+        for name in reversed(list(COUNTERS)):
+            batch_op.drop_column(name)
@@ -0,0 +1,31 @@
+"""todo list indexes
+
+Composite indexes behind the keyset-paginated todo list and the due-date
+summary (app/services/todo_list.py).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 16:41:27.190254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_todo_items_user_created', 'todo_items', ['user_id', 'is_completed', 'created_at', 'id'], unique=False)
+    op.create_index('ix_todo_items_user_due', 'todo_items', ['user_id', 'is_completed', 'due_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todo_items_user_due', table_name='todo_items')
+    op.drop_index('ix_todo_items_user_created', table_name='todo_items')
@@ -0,0 +1,48 @@
+"""deadline reminders
+
+outbox_events for the reminders written by remind_deadlines.py, and due-date
+indexes that let the scheduler range-scan upcoming deadlines of all users.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 18:12:45.031877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('dedupe_key', sa.String(length=255), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('dedupe_key', name='uq_outbox_events_dedupe_key')
+    )
+    op.create_index('ix_outbox_events_id', 'outbox_events', ['id'], unique=False)
+    op.create_index('ix_outbox_events_processed_at_id', 'outbox_events', ['processed_at', 'id'], unique=False)
+    op.create_index('ix_todo_items_open_due', 'todo_items', ['is_completed', 'due_date', 'id'], unique=False)
+    op.create_index('ix_university_documents_due_date', 'university_documents', ['due_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_university_documents_due_date', table_name='university_documents')
+    op.drop_index('ix_todo_items_open_due', table_name='todo_items')
+    op.drop_index('ix_outbox_events_processed_at_id', table_name='outbox_events')
+    op.drop_index('ix_outbox_events_id', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,35 @@
+"""outbox retries
+
+Attempt count, next-attempt time and last error on outbox_events, for the
+outbox worker (app/services/outbox.py).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 20:27:03.514962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('outbox_events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('available_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('outbox_events', schema=None) as batch_op:
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('available_at')
+        batch_op.drop_column('attempts')
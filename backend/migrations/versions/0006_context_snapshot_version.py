@@ -0,0 +1,32 @@
+"""context snapshot version
+
+The user data version a counselor context snapshot was built from, so the
+snapshot is rebuilt on read instead of inside every profile, shortlist and
+todo write (app/services/context_snapshot.py).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 22:41:17.208344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('counselor_context_snapshots', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('counselor_context_snapshots', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,40 @@
+"""reminder catch-up
+
+updated_at on todo_items, and (updated_at, id) indexes on todo_items and
+university_documents, so the reminder scheduler can pick up rows whose due
+date changed since its last tick (app/services/reminders.py).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 23:18:52.640113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('todo_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_todo_items_updated', ['updated_at', 'id'], unique=False)
+
+    with op.batch_alter_table('university_documents', schema=None) as batch_op:
+        batch_op.create_index('ix_university_documents_updated', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('university_documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_university_documents_updated')
+
+    with op.batch_alter_table('todo_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_todo_items_updated')
+        batch_op.drop_column('updated_at')
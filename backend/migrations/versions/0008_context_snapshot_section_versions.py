@@ -0,0 +1,41 @@
+"""context snapshot section versions
+
+One data version per counselor context snapshot section instead of one per
+snapshot, so a read rebuilds only the sections whose data changed
+(app/services/context_snapshot.py). Existing snapshots are dropped: they
+were built against the user counter and are rebuilt on the next read.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-20 10:12:36.481027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DELETE FROM counselor_context_snapshots")
+    with op.batch_alter_table('counselor_context_snapshots', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('shortlist_version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('todos_version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.drop_column('data_version')
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM counselor_context_snapshots")
+    with op.batch_alter_table('counselor_context_snapshots', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.drop_column('todos_version')
+        batch_op.drop_column('shortlist_version')
+        batch_op.drop_column('profile_version')
@@ -0,0 +1,73 @@
+"""
+Outbox worker: runs the side effects the API leaves in outbox_events
+(application packages for locked universities, initial todos, deadline
+reminders) in batches, with retries. See app/services/outbox.py.
+
+Usage: python outbox_worker.py [--once]
+Set OUTBOX_WORKER=true for the web processes too, otherwise they keep running
+these side effects inline and never enqueue them. Several workers can run
+against Postgres; with SQLite run one.
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.metrics import OUTBOX_DEAD, OUTBOX_LAG, OUTBOX_WAITING, SnapshotWriter
+from app.services.outbox import OutboxWorker
+import app.api.onboarding  # noqa: F401  register the outbox handlers
+import app.api.universities  # noqa: F401
+import app.services.reminders  # noqa: F401
+
+# Backlog gauges and the purge of old processed events run this often, not every batch
+HOUSEKEEPING_SECONDS = 15.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain the transactional outbox")
+    parser.add_argument("--once", action="store_true", help="drain what is due now and exit")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    worker = OutboxWorker(SessionLocal, batch_size=settings.outbox_batch_size, max_attempts=settings.outbox_max_attempts)
+    # With METRICS_DIR set, the app's /metrics includes this process's outbox metrics
+    metrics_writer = SnapshotWriter(settings.metrics_dir, settings.metrics_flush_interval_seconds) if settings.metrics_dir else None
+    if metrics_writer:
+        metrics_writer.start()
+
+    print(f" Draining the outbox in batches of {settings.outbox_batch_size}...")
+    next_housekeeping = 0.0
+    try:
+        while True:
+            try:
+                claimed = worker.drain_once()
+                if (args.once and not claimed) or (not args.once and time.monotonic() >= next_housekeeping):
+                    backlog = worker.backlog()
+                    OUTBOX_WAITING.set(backlog["waiting"])
+                    OUTBOX_DEAD.set(backlog["dead"])
+                    OUTBOX_LAG.set(backlog["lag_seconds"])
+                    purged = worker.purge_processed(timedelta(days=settings.outbox_retention_days))
+                    print(f" Processed {worker.processed}, failed {worker.failed}, waiting {backlog['waiting']}, "
+                          f"dead {backlog['dead']}, lag {backlog['lag_seconds']:.1f}s" +
+                          (f", purged {purged}" if purged else ""))
+                    next_housekeeping = time.monotonic() + HOUSEKEEPING_SECONDS
+            except Exception as e:
+                print(f" Outbox batch failed: {str(e)}")
+                claimed = 0
+            if args.once and not claimed:
+                break
+            # A full batch means more is probably waiting
+            if claimed < settings.outbox_batch_size:
+                time.sleep(settings.outbox_poll_seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if metrics_writer:
+            metrics_writer.stop()
+
+    print(f" Stopped after processing {worker.processed} events ({worker.failed} failed attempts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Rebuild the materialized recommendation list of every onboarded user.
+
+Usage: python rebuild_recommendations.py [--workers N] [--chunk-size N]
+User ids are split into chunks and scored in a process pool; each worker loads
+the university catalog once and reuses it for all of its chunks.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.database import SessionLocal, engine
+from app.models import University, UserProfile
+from app.services.data_versions import bump_versions, user_scope
+from app.services.recommendations import refresh_user_recommendations
+
+_catalog = None
+
+
+def _init_worker():
+    # Connections inherited from the parent process must not be shared
+    engine.dispose(close=False)
+
+
+def rebuild_chunk(user_ids):
+    global _catalog
+    db = SessionLocal()
+    try:
+        if _catalog is None:
+            _catalog = db.query(University).all()
+            for university in _catalog:
+                db.expunge(university)
+        profiles = db.query(UserProfile).filter(UserProfile.user_id.in_(user_ids)).all()
+        rows = sum(refresh_user_recommendations(db, profile, catalog=_catalog) for profile in profiles)
+        bump_versions(db, *(user_scope(profile.user_id) for profile in profiles))
+        db.commit()
+        return len(profiles), rows
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user_ids = [user_id for (user_id,) in db.query(UserProfile.user_id).filter(
+        UserProfile.onboarding_completed == True
+    ).order_by(UserProfile.user_id)]
+    db.close()
+    engine.dispose()
+
+    chunks = [user_ids[i:i + args.chunk_size] for i in range(0, len(user_ids), args.chunk_size)]
+    print(f" Rebuilding recommendations for {len(user_ids)} users in {len(chunks)} chunks ({args.workers} workers)...")
+
+    start = time.perf_counter()
+    users_done = rows_done = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        for future in as_completed(pool.submit(rebuild_chunk, chunk) for chunk in chunks):
+            users, rows = future.result()
+            users_done += users
+            rows_done += rows
+
+    elapsed = time.perf_counter() - start
+    print(f" Rebuilt {rows_done} recommendations for {users_done} users in {elapsed:.1f}s "
+          f"({users_done / elapsed if elapsed else 0:.0f} users/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Recompute academic/exam/overall strength for every profile.
+
+Usage: python recompute_strengths.py [--workers N] [--chunk-size N]
+Run after changing the thresholds in app/services/profile_strength.py.
+Profiles are read in id-ordered chunks, scored column-wise in a process pool,
+and written back with one UPDATE ... FROM (VALUES ...) per chunk as soon as it
+is scored. At most two chunks per worker are in flight, so memory does not grow
+with the table.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, get_engine
+from app.models import UserProfile
+from app.services.data_versions import bump_versions, user_change_scopes
+from app.services.profile_strength import calculate_strengths_batch
+from app.services.user_events import PROFILE
+
+
+def score_chunk(chunk):
+    ids, user_ids, gpas, ielts, gre = chunk
+    academic, exam, overall = calculate_strengths_batch(gpas, ielts, gre)
+    return ids, user_ids, [a.name for a in academic], [e.name for e in exam], [o.name for o in overall]
+
+
+def build_update(size: int, dialect: str):
+    values = ", ".join(f"(:id{i}, :a{i}, :e{i}, :o{i})" for i in range(size))
+    # Postgres stores these as a native enum type; SQLite stores plain strings
+    cast = (lambda col: f"CAST(v.{col} AS profilestrength)") if dialect == "postgresql" else (lambda col: f"v.{col}")
+    return text(f"""
+        WITH v(id, academic, exam, overall) AS (VALUES {values})
+        UPDATE user_profiles
+        SET academic_strength = {cast('academic')},
+            exam_strength = {cast('exam')},
+            overall_strength = {cast('overall')}
+        FROM v
+        WHERE user_profiles.id = v.id
+    """)
+
+
+def read_chunks(db, chunk_size):
+    last_id = 0
+    while True:
+        rows = db.query(
+            UserProfile.id, UserProfile.user_id, UserProfile.gpa_percentage, UserProfile.ielts_toefl_status, UserProfile.gre_gmat_status
+        ).filter(UserProfile.id > last_id).order_by(UserProfile.id).limit(chunk_size).all()
+        # Writes happen elsewhere; don't hold a read transaction open across the whole run
+        db.commit()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        ids, user_ids, gpas, ielts, gre = (list(column) for column in zip(*rows))
+        yield ids, user_ids, gpas, [s.name if s else None for s in ielts], [s.name if s else None for s in gre]
+
+
+def write_chunk(writer, scored) -> int:
+    """Apply one scored chunk in its own transaction on the writer engine"""
+    ids, user_ids, academic, exam, overall = scored
+    params = {}
+    for i, values in enumerate(zip(ids, academic, exam, overall)):
+        params.update({f"id{i}": values[0], f"a{i}": values[1], f"e{i}": values[2], f"o{i}": values[3]})
+    with Session(bind=writer) as db, db.begin():
+        db.execute(build_update(len(ids), writer.dialect.name), params)
+        # Cached dashboards and counselor profile sections of these users are now stale
+        bump_versions(db, *(scope for user_id in user_ids for scope in user_change_scopes(user_id, PROFILE)))
+    return len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Chunks are read through the routed session (the reader in tuned SQLite mode) and
+    # written on an explicit writer session, never through read routing
+    writer = get_engine()
+    db = SessionLocal()
+    updated = 0
+    start = time.perf_counter()
+    print(f" Recomputing profile strengths ({args.workers} workers, chunks of {args.chunk_size})...")
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            # Executor.map would read every chunk up front; submit only a bounded window instead
+            chunks = read_chunks(db, args.chunk_size)
+            window = 2 * args.workers
+            in_flight = set()
+            exhausted = False
+            while True:
+                while not exhausted and len(in_flight) < window:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                    else:
+                        in_flight.add(pool.submit(score_chunk, chunk))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    updated += write_chunk(writer, future.result())
+                    elapsed = time.perf_counter() - start
+                    print(f"   {updated} profiles ({updated / elapsed:.0f}/s)")
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    print(f" Recomputed {updated} profiles in {elapsed:.1f}s ({updated / elapsed if elapsed else 0:.0f} profiles/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Deadline reminder worker: writes a deadline_reminder event to outbox_events
+REMINDER_LEAD_HOURS before each open todo and pending document is due.
+
+Usage: python remind_deadlines.py [--once]
+Run one instance next to the app (e.g. a Procfile worker). It sleeps until
+the next reminder is due, or REMINDER_POLL_SECONDS at most, which is also how
+quickly newly created deadlines are noticed. See app/services/reminders.py.
+"""
+import argparse
+import time
+from datetime import datetime
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.metrics import SnapshotWriter
+from app.services.reminders import scheduler_from_settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit deadline reminders into the outbox")
+    parser.add_argument("--once", action="store_true", help="load deadlines, emit what is due now and exit")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    scheduler = scheduler_from_settings(SessionLocal)
+    # With METRICS_DIR set, the app's /metrics includes this process's reminder counters
+    metrics_writer = SnapshotWriter(settings.metrics_dir, settings.metrics_flush_interval_seconds) if settings.metrics_dir else None
+    if metrics_writer:
+        metrics_writer.start()
+
+    print(f" Scheduling reminders {', '.join(f'{hours:g}h' for hours in settings.reminder_lead_hours)} before deadlines...")
+    try:
+        while True:
+            try:
+                emitted = scheduler.tick()
+                if emitted:
+                    print(f" Emitted {emitted} reminders ({scheduler.pending()} scheduled)")
+            except Exception as e:
+                print(f" Reminder tick failed: {str(e)}")
+            if args.once:
+                break
+
+            wait = settings.reminder_poll_seconds
+            next_fire = scheduler.next_fire_at()
+            if next_fire is not None:
+                wait = min(wait, max((next_fire - datetime.utcnow()).total_seconds(), 0.0))
+            time.sleep(wait)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if metrics_writer:
+            metrics_writer.stop()
+
+    print(f" Stopped after emitting {scheduler.emitted} reminders")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Summarize a running server's /metrics without a Prometheus server.
+
+Usage: python show_metrics.py [url]
+Defaults to http://localhost:8000/metrics. Prints per-route request counts with
+p50/p95 latency estimated from the histogram buckets, pool state, per-worker
+memory and cache hit rates.
+"""
+import re
+import sys
+from collections import defaultdict
+
+import requests
+
+SAMPLE_RE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse(text):
+    for line in text.splitlines():
+        match = SAMPLE_RE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            yield name, dict(LABEL_RE.findall(labels or "")), float(value)
+
+
+def quantile(buckets, q):
+    """Upper bound of the bucket holding the q-th observation"""
+    total = buckets[-1][1] if buckets else 0
+    for bound, count in buckets:
+        if total and count >= q * total:
+            return bound
+    return float("nan")
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000/metrics"
+    samples = list(parse(requests.get(url, timeout=10).text))
+
+    buckets = defaultdict(list)
+    counts, values = {}, defaultdict(dict)
+    for name, labels, value in samples:
+        if name == "http_request_duration_seconds_bucket":
+            bound = float("inf") if labels["le"] == "+Inf" else float(labels["le"])
+            buckets[(labels["method"], labels["route"])].append((bound, value))
+        elif name == "http_request_duration_seconds_count":
+            counts[(labels["method"], labels["route"])] = value
+        else:
+            values[name][tuple(sorted(labels.items()))] = value
+
+    print(f"{'route':<50} {'requests':>9} {'p50':>8} {'p95':>8}")
+    for key in sorted(counts, key=counts.get, reverse=True):
+        route_buckets = sorted(buckets[key])
+        print(f"{key[0] + ' ' + key[1]:<50} {counts[key]:>9.0f} "
+              f"{quantile(route_buckets, 0.5) * 1000:>6.0f}ms {quantile(route_buckets, 0.95) * 1000:>6.0f}ms")
+
+    print()
+    for name in ("http_requests_in_flight", "db_pool_size", "db_pool_checked_out", "db_pool_overflow",
+                 "db_pool_checkout_timeouts_total", "websocket_connections"):
+        for labels, value in values.get(name, {}).items():
+            print(f"{name}{dict(labels) or ''}: {value:g}")
+
+    memory = defaultdict(dict)
+    for labels, value in values.get("process_memory_bytes", {}).items():
+        labels = dict(labels)
+        memory[labels["pid"]][labels["kind"]] = value
+    if memory:
+        print()
+        print(f"{'worker pid':<12} {'rss':>9} {'pss':>9} {'private':>9} {'shared':>9}")
+        for pid, kinds in sorted(memory.items()):
+            print(f"{pid:<12} " + " ".join(f"{kinds.get(kind, 0) / 2**20:>7.1f}MB" for kind in ("rss", "pss", "private", "shared")))
+
+    print()
+    hits, misses = values.get("cache_hits_total", {}), values.get("cache_misses_total", {})
+    for labels, hit in hits.items():
+        miss = misses.get(labels, 0)
+        rate = hit / (hit + miss) if hit + miss else 0.0
+        print(f"cache {dict(labels)['cache']:<20} hit rate {rate:6.1%} ({hit:.0f} hits, {miss:.0f} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Local stand-in for a streaming read replica when developing with SQLite.
+
+Copies the primary database (./study_abroad.db, USE_SQLITE=true) into the
+replica file every few seconds with SQLite's online backup, so the replica
+lags behind like a real one. Run the app with
+
+    USE_SQLITE=true DATABASE_REPLICA_URL=sqlite:///./replica.db uvicorn main:app
+
+and this script next to it to see read-only endpoints served from the copy,
+and a user's own reads stay on the primary right after they write.
+
+Usage: python sync_sqlite_replica.py [--replica replica.db] [--interval 2] [--once]
+"""
+import argparse
+import sqlite3
+import time
+
+
+def sync(primary_path: str, replica_path: str):
+    source = sqlite3.connect(f"file:{primary_path}?mode=ro", uri=True)
+    target = sqlite3.connect(replica_path, timeout=30)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy the SQLite primary into a replica file periodically")
+    parser.add_argument("--primary", default="study_abroad.db")
+    parser.add_argument("--replica", default="replica.db")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between copies (the replication lag)")
+    parser.add_argument("--once", action="store_true", help="copy once and exit")
+    args = parser.parse_args()
+
+    while True:
+        started = time.perf_counter()
+        sync(args.primary, args.replica)
+        print(f"Synced {args.primary} -> {args.replica} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Tests run in-process against a throwaway SQLite database, like the benchmarks
+(benchmarks/common.py), so they need no .env and never touch Postgres.
+
+Run from the backend directory: python -m pytest tests
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.common import use_temporary_sqlite  # noqa: E402
+
+# Before any app module is imported, so the engine points at the temporary database
+use_temporary_sqlite()
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def database():
+    from app.database import create_tables
+    create_tables()
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    from benchmarks.common import create_app_client
+    client = create_app_client()
+    client.get("/api/universities/seed")
+    return client
+
+
+@pytest.fixture(scope="session")
+def headers(client):
+    """An onboarded user"""
+    from benchmarks.common import signup_and_login
+    return signup_and_login(client, "tests@example.com")
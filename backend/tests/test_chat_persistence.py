@@ -0,0 +1,45 @@
+import uuid
+
+import pytest
+
+from app.database import SessionLocal
+from app.models import ChatMessage, User
+from app.services.chat_persistence import ChatWriteBehindQueue, build_chat_rows
+
+
+@pytest.fixture
+def user_ids(database):
+    db = SessionLocal()
+    users = [User(full_name="Chat Test", email=f"chat-{uuid.uuid4().hex}@example.com", hashed_password="x")
+             for _ in range(2)]
+    db.add_all(users)
+    db.commit()
+    ids = [user.id for user in users]
+    db.close()
+    yield ids
+    db = SessionLocal()
+    db.query(ChatMessage).filter(ChatMessage.user_id.in_(ids)).delete()
+    db.query(User).filter(User.id.in_(ids)).delete()
+    db.commit()
+    db.close()
+
+
+def turn(user_id: int, text):
+    return build_chat_rows(user_id, [{"role": "user", "message": text}, {"role": "assistant", "message": "reply"}])
+
+
+def test_failed_batch_falls_back_to_turn_by_turn_inserts(user_ids):
+    first, second = user_ids
+    queue = ChatWriteBehindQueue(SessionLocal)
+
+    # message is NOT NULL, so the middle turn fails the batch insert
+    queue._flush([turn(first, "hello"), turn(second, None), turn(second, "still here")])
+
+    assert queue.flushed_rows == 4
+    assert queue.failed_rows == 2
+    db = SessionLocal()
+    saved = db.query(ChatMessage.user_id, ChatMessage.message).filter(
+        ChatMessage.user_id.in_(user_ids), ChatMessage.role == "user"
+    ).order_by(ChatMessage.id).all()
+    db.close()
+    assert [tuple(row) for row in saved] == [(first, "hello"), (second, "still here")]
@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app.database import SessionLocal
+from app.models import CounselorContextSnapshot, TodoItem, User, UserProfile
+from app.services import context_snapshot
+from app.services.context_snapshot import get_user_context_snapshot
+from app.services.user_events import TODOS, notify_user_change
+
+
+@pytest.fixture
+def user_id(database):
+    db = SessionLocal()
+    user = User(full_name="Snapshot Test", email=f"snapshot-{uuid.uuid4().hex}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(UserProfile(user_id=user.id, onboarding_completed=True, intended_degree="Masters",
+                       field_of_study="Computer Science"))
+    db.commit()
+    user_id = user.id
+    db.close()
+    yield user_id
+    db = SessionLocal()
+    db.query(CounselorContextSnapshot).filter(CounselorContextSnapshot.user_id == user_id).delete()
+    db.query(TodoItem).filter(TodoItem.user_id == user_id).delete()
+    db.query(UserProfile).filter(UserProfile.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def read_snapshot(user_id: int, commits: list) -> str:
+    db = SessionLocal()
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+    try:
+        return get_user_context_snapshot(db, db.get(User, user_id))
+    finally:
+        db.close()
+
+
+def test_only_stale_sections_are_rebuilt_outside_the_callers_session(user_id):
+    commits = []
+    assert "Intended Degree: Masters in Computer Science" in read_snapshot(user_id, commits)
+    built = context_snapshot.snapshot_stats()["sections_built"]
+
+    db = SessionLocal()
+    db.add(TodoItem(user_id=user_id, title="Book IELTS", priority="High", category="Exams"))
+    notify_user_change(db, user_id, TODOS)
+    db.commit()
+    db.close()
+
+    context = read_snapshot(user_id, commits)
+    assert "Book IELTS (High priority)" in context
+    assert context_snapshot.snapshot_stats()["sections_built"] == built + 1
+
+    read_snapshot(user_id, commits)
+    assert context_snapshot.snapshot_stats()["sections_built"] == built + 1
+    assert commits == []
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import RoutingSession, create_sqlite_engines
+
+
+def make_session_factory():
+    path = os.path.join(tempfile.mkdtemp(prefix="study-abroad-routing-"), "routing.db")
+    writer, reader = create_sqlite_engines(f"sqlite:///{path}", readers=2)
+    with writer.begin() as connection:
+        connection.execute(text("CREATE TABLE scores (id INTEGER PRIMARY KEY, score INTEGER NOT NULL)"))
+    return sessionmaker(class_=RoutingSession, bind=writer, reader=reader, autoflush=False), writer, reader
+
+
+def test_text_dml_runs_on_the_writer():
+    SessionLocal, writer, reader = make_session_factory()
+    db = SessionLocal()
+    try:
+        # The reader's connections are query_only; DML routed there fails with "readonly database"
+        db.execute(text("INSERT INTO scores (id, score) VALUES (1, 10), (2, 20)"))
+        db.execute(text("""
+            WITH v(id, score) AS (VALUES (1, 11), (2, 21))
+            UPDATE scores SET score = v.score FROM v WHERE scores.id = v.id
+        """))
+        db.commit()
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    try:
+        select = text("SELECT score FROM scores ORDER BY id")
+        assert db.get_bind(clause=select) is reader
+        assert db.execute(select).scalars().all() == [11, 21]
+        assert db.get_bind(clause=text("DELETE FROM scores")) is writer
+    finally:
+        db.close()
@@ -0,0 +1,31 @@
+import pytest
+
+from app.api.universities import APPLICATION_PACKAGE
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import OutboxEvent, User
+
+
+@pytest.fixture
+def outbox_worker(monkeypatch):
+    monkeypatch.setattr(get_settings(), "outbox_worker", True)
+
+
+def test_retried_lock_enqueues_one_application_package(client, outbox_worker):
+    from benchmarks.common import signup_and_login
+    headers = signup_and_login(client, "outbox-tests@example.com")
+    recommendations = client.get("/api/universities/recommendations", headers=headers).json()
+    ids = [university["id"] for university in recommendations[:2]]
+    for university_id in ids:
+        client.post("/api/universities/shortlist", json={"university_id": university_id, "category": "TARGET"},
+                    headers=headers)
+
+    for university_ids in (ids, list(reversed(ids))):
+        response = client.post("/api/universities/lock/batch", json={"university_ids": university_ids}, headers=headers)
+        assert response.status_code == 200, response.text
+
+    db = SessionLocal()
+    user_id = db.query(User.id).filter(User.email == "outbox-tests@example.com").scalar()
+    events = db.query(OutboxEvent).filter(OutboxEvent.user_id == user_id, OutboxEvent.topic == APPLICATION_PACKAGE).all()
+    db.close()
+    assert len(events) == 1
@@ -0,0 +1,39 @@
+"""
+Statement budgets for hot read routes. The user has several locked
+universities, with their application tasks and documents, so a query per row
+(N+1) would push a route over its budget.
+"""
+import pytest
+
+from app.testing import QueryBudgetExceeded, assert_route_query_budget, query_budget
+
+LOCKED_UNIVERSITIES = 5
+
+
+@pytest.fixture(scope="module")
+def locked_headers(client, headers):
+    recommendations = client.get("/api/universities/recommendations", headers=headers).json()
+    ids = [university["id"] for university in recommendations[:LOCKED_UNIVERSITIES]]
+    for university_id in ids:
+        client.post("/api/universities/shortlist", json={"university_id": university_id, "category": "TARGET"},
+                    headers=headers)
+    response = client.post("/api/universities/lock/batch", json={"university_ids": ids}, headers=headers)
+    assert response.status_code == 200, response.text
+    return headers
+
+
+@pytest.mark.parametrize("url, budget", [
+    ("/api/dashboard/", 6),
+    ("/api/todos/", 2),
+    ("/api/todos/summary", 2),
+    ("/api/universities/shortlisted", 3),
+])
+def test_route_stays_within_query_budget(client, locked_headers, url, budget):
+    response = assert_route_query_budget(client, "GET", url, budget, headers=locked_headers)
+    assert response.status_code == 200, response.text
+
+
+def test_query_budget_reports_the_repeated_statements(client, locked_headers):
+    with pytest.raises(QueryBudgetExceeded, match="budget is 1"):
+        with query_budget(1, label="GET /api/dashboard/"):
+            client.get("/api/dashboard/", headers=locked_headers)
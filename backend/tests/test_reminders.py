@@ -0,0 +1,95 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models import OutboxEvent, TodoItem, User
+from app.services.reminders import DeadlineScheduler, FakeClock
+
+START = datetime(2026, 3, 1)
+
+
+@pytest.fixture
+def user_id(database):
+    db = SessionLocal()
+    user = User(full_name="Reminder Test", email=f"reminders-{uuid.uuid4().hex}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+    yield user_id
+    db = SessionLocal()
+    db.query(OutboxEvent).filter(OutboxEvent.user_id == user_id).delete()
+    db.query(TodoItem).filter(TodoItem.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def add_todo(user_id: int, due_date=None) -> int:
+    db = SessionLocal()
+    todo = TodoItem(user_id=user_id, title="Reminder test task", priority="High", category="Applications",
+                    due_date=due_date)
+    db.add(todo)
+    db.commit()
+    todo_id = todo.id
+    db.close()
+    return todo_id
+
+
+def update_todo(todo_id: int, **values):
+    # Through the ORM, like the API, so updated_at moves
+    db = SessionLocal()
+    todo = db.get(TodoItem, todo_id)
+    for name, value in values.items():
+        setattr(todo, name, value)
+    db.commit()
+    db.close()
+
+
+def run_until(scheduler: DeadlineScheduler, clock: FakeClock, until: datetime):
+    while clock.now() < until:
+        clock.advance(minutes=30)
+        scheduler.tick()
+
+
+def test_reminders_follow_both_leads_and_due_date_changes(user_id):
+    clock = FakeClock(START)
+    scheduler = DeadlineScheduler(SessionLocal, clock=clock, horizon=timedelta(hours=1))
+    scheduler.tick()
+
+    # 24h reminder at +6h, deadline reminder at +30h
+    add_todo(user_id, START + timedelta(hours=30))
+    # Both leads come due inside the window loaded at start; the 24h ones fire late, at once
+    rescheduled = add_todo(user_id, START + timedelta(hours=10))
+    completed = add_todo(user_id, START + timedelta(hours=8))
+    # An existing row that only gets its due date later
+    undated = add_todo(user_id)
+    scheduler.tick()
+
+    run_until(scheduler, clock, START + timedelta(hours=1))
+    update_todo(undated, due_date=START + timedelta(hours=20))
+    run_until(scheduler, clock, START + timedelta(hours=2))
+    update_todo(rescheduled, due_date=START + timedelta(hours=14))
+    run_until(scheduler, clock, START + timedelta(hours=3))
+    update_todo(completed, is_completed=True, completed_at=START + timedelta(hours=3))
+    run_until(scheduler, clock, START + timedelta(hours=31))
+
+    # 2 for the +30h todo, 2 for the one dated later, 3 for the rescheduled one
+    # (24h for both due dates, deadline for the new one), 1 for the completed one
+    assert scheduler.emitted == 8
+    # The deadline reminders of the old due date and of the completed todo
+    assert scheduler.stale == 2
+    assert scheduler.duplicates == 0
+    assert scheduler.pending() == 0
+
+    db = SessionLocal()
+    assert db.query(OutboxEvent).filter(OutboxEvent.user_id == user_id).count() == 8
+    db.close()
+
+    # A restarted scheduler reloads the +30h deadline; both of its reminders are already in the outbox
+    restarted = DeadlineScheduler(SessionLocal, clock=FakeClock(START + timedelta(hours=30)),
+                                  horizon=timedelta(hours=1))
+    assert restarted.tick() == 0
+    assert restarted.duplicates == 2
@@ -0,0 +1,38 @@
+import pytest
+
+from app.database import SessionLocal
+from app.models import TodoItem, User
+
+EMAIL = "todo-list-tests@example.com"
+TODO_COUNT = 120
+
+
+@pytest.fixture(scope="module")
+def todo_headers(client):
+    from benchmarks.common import signup_and_login
+    headers = signup_and_login(client, EMAIL, onboard=False)
+    db = SessionLocal()
+    user_id = db.query(User.id).filter(User.email == EMAIL).scalar()
+    db.add_all([TodoItem(user_id=user_id, title=f"Task {i}", priority="Low", category="General")
+                for i in range(TODO_COUNT)])
+    db.commit()
+    db.close()
+    return headers
+
+
+def test_unpaginated_request_returns_every_todo(client, todo_headers):
+    response = client.get("/api/todos/", headers=todo_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == TODO_COUNT
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_cursor_pages_cover_the_same_todos(client, todo_headers):
+    response = client.get("/api/todos/", params={"limit": 100}, headers=todo_headers)
+    first = response.json()
+    assert len(first) == 100
+
+    response = client.get("/api/todos/", params={"cursor": response.headers["X-Next-Cursor"]}, headers=todo_headers)
+    second = response.json()
+    assert "X-Next-Cursor" not in response.headers
+    assert len({todo["id"] for todo in first + second}) == TODO_COUNT
@@ -0,0 +1,71 @@
+"""
+Check the denormalized counters on user_profiles against the source tables.
+
+Usage: python verify_counters.py [--repair] [--chunk-size N]
+Profiles are compared in id-ordered chunks with three grouped COUNT queries
+per chunk. Without --repair, mismatches are listed and the exit status is 1.
+With --repair, each wrong profile is recounted under its row lock and fixed
+(app/services/profile_counters.py), so it is safe to run while serving.
+"""
+import argparse
+import sys
+import time
+
+from app.database import SessionLocal
+from app.models import UserProfile
+from app.services.data_versions import bump_versions, user_scope
+from app.services.profile_counters import COUNTERS, count_actual, repair_user_counters
+
+
+def read_chunks(db, chunk_size):
+    last_id = 0
+    while True:
+        rows = db.query(UserProfile.id, UserProfile.user_id, *(getattr(UserProfile, name) for name in COUNTERS)).filter(
+            UserProfile.id > last_id
+        ).order_by(UserProfile.id).limit(chunk_size).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield {user_id: dict(zip(COUNTERS, values)) for _, user_id, *values in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repair", action="store_true", help="fix the profiles whose counters are wrong")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    checked = wrong = repaired = 0
+    start = time.perf_counter()
+    print(f" Verifying profile counters (chunks of {args.chunk_size})...")
+
+    try:
+        for stored in read_chunks(db, args.chunk_size):
+            actual = count_actual(db, list(stored))
+            db.rollback()
+            checked += len(stored)
+            for user_id, counters in stored.items():
+                diff = {name: (counters[name], actual[user_id][name]) for name in COUNTERS if counters[name] != actual[user_id][name]}
+                if not diff:
+                    continue
+                wrong += 1
+                print(f"   user {user_id}: " + ", ".join(f"{name} {old} -> {new}" for name, (old, new) in diff.items()))
+                if args.repair:
+                    # Recounted under the row lock: the first comparison may have raced a request
+                    if repair_user_counters(db, user_id):
+                        bump_versions(db, user_scope(user_id))
+                        repaired += 1
+                    db.commit()
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    print(f" Checked {checked} profiles in {elapsed:.1f}s: {wrong} with wrong counters" +
+          (f", {repaired} repaired" if args.repair else ""))
+    if wrong and not args.repair:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
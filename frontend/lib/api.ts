@@ -60,9 +60,12 @@ export const universitiesAPI = {
 export const todosAPI = {
   getAll: (includeCompleted = false) =>
     api.get('/todos', { params: { include_completed: includeCompleted } }),
+  getSummary: () => api.get('/todos/summary'),
   create: (data: any) => api.post('/todos', data),
   update: (id: number, data: any) => api.patch(`/todos/${id}`, data),
   delete: (id: number) => api.delete(`/todos/${id}`),
+  bulkUpdate: (data: any) => api.patch('/todos/bulk', data),
+  bulkDelete: (data: any) => api.delete('/todos/bulk', { data }),
 };
 
 // Counselor API
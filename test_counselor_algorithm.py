@@ -31,7 +31,8 @@ class MockProfile:
 
 # Test the response generation
 def test_algorithm():
-    from backend.app.api.counselor import detect_question_type, generate_personalized_response
+    from backend.app.api.counselor import detect_question_type
+    from backend.app.services.counselor_responses import generate_personalized_response
     
     user = MockUser()
     profile = MockProfile()